@@ -1 +0,0 @@
-"""Pacote core contendo funções principais do sistema."""
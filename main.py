@@ -3,20 +3,29 @@
 import os
 import time
 
-from core.index import organizar_arquivos
+from dotenv import load_dotenv
+
+from models import _extrair_texto_do_pdf
+from models._extracao_antecipada import ExtracaoAntecipada, pdfs_antecipaveis
+from models._indice_chassis_persistente import configurar_pdfs_orfaos
+from models._interrupcao import instalar_tratamento_sinais
+from models._monitorar_diretorio import MonitorDiretorio
+from models._organizar_arquivos import inventario_atual, organizar_arquivos
+from models._processar_pdf_em_lote import configurar_motor_extracao
+from models._registro_operacoes import configurar_reprocessamento
 from utils.postTeams import post_teams_message
 
 
-if __name__ == "__main__":
-    start = time.time()
-    home = os.path.expanduser("~")
-    pasta_nf = os.path.join(home, "Downloads", "NF_FLASH")
+def processar_diretorio(pasta_nf, alterados=None):
+    """Organiza o diretório uma vez e envia os erros para o Teams.
 
-    mensagem_erro = []
-    if os.path.isdir(pasta_nf):
-        mensagem_erro = organizar_arquivos(pasta_nf, mensagem_erro)
-    else:
-        print(f"Diretório não encontrado: {pasta_nf}")
+    Args:
+        pasta_nf: Diretório de entrada
+        alterados: Caminhos novos ou alterados desde a execução anterior
+                   (só no monitoramento)
+    """
+    start = time.time()
+    mensagem_erro = organizar_arquivos(pasta_nf, [], alterados)
 
     fim = time.time()
     duracao = fim - start
@@ -32,3 +41,109 @@ if __name__ == "__main__":
             "grupo": "teste",
         }
         post_teams_message(params)
+
+
+def processar_lote(pasta_nf, motor, antecipacao, alterados=None):
+    """Organiza um lote do monitoramento e prepara o próximo.
+
+    Um erro no lote vai para o console e para o Teams sem derrubar o
+    monitoramento; a organização seguinte examina o diretório inteiro.
+
+    Args:
+        pasta_nf: Diretório de entrada
+        motor: MotorExtracao da execução
+        antecipacao: ExtracaoAntecipada do monitoramento
+        alterados: Caminhos novos ou alterados do lote (None no primeiro)
+    """
+    try:
+        if alterados is not None:
+            motor.esquecer_pdfs(alterados)
+        processar_diretorio(pasta_nf, alterados)
+        # O próximo lote encontra os processos prontos e as NFs que
+        # continuam no diretório já extraídas
+        motor.aquecer()
+        inventario = inventario_atual(pasta_nf)
+        antecipacao.agendar(pdfs_antecipaveis(inventario, alterados))
+        # PDFs já organizados não precisam continuar em memória
+        _extrair_texto_do_pdf.esquecer_pdfs([
+            caminho for caminho in list(_extrair_texto_do_pdf.vereditos_pdf)
+            if caminho not in inventario
+        ])
+    except Exception as e:
+        print(
+            f"\033[31mErro ao organizar o lote: "
+            f"{type(e).__name__}: {e}\033[m"
+        )
+        post_teams_message({
+            "mensagem_erro": [
+                f"Erro ao organizar o diretório {pasta_nf}: "
+                f"<b>{type(e).__name__}: {e}</b>. O monitoramento continua."
+            ],
+            "grupo": "teste",
+        })
+
+
+def monitorar_diretorio(pasta_nf, motor):
+    """Fica rodando e organiza o diretório a cada lote de arquivos novos.
+
+    O interpretador, o PyMuPDF, os caches em memória e o pool de extração
+    continuam carregados entre um lote e outro. Só os .txt que ainda estão
+    no diretório (os que ainda não foram organizados) são avaliados; PDFs
+    alterados têm os resultados em memória descartados antes do lote, e só
+    os arquivos alterados passam de novo pela triagem. Alertas já enviados
+    ao Teams não se repetem enquanto o arquivo continuar igual, e um erro
+    em um lote não encerra o monitoramento. As NFs que sobram esperando o
+    .txt são extraídas em segundo plano.
+
+    Args:
+        pasta_nf: Diretório de entrada
+        motor: MotorExtracao da execução
+    """
+    with MonitorDiretorio(
+        pasta_nf,
+        tempo_estabilidade=float(os.getenv("MONITORAMENTO_ESTABILIDADE", "5")),
+        usar_inotify=os.getenv("MONITORAMENTO_POLLING", "0") != "1",
+    ) as monitor, ExtracaoAntecipada(
+        os.path.join(pasta_nf, "_Cache"), motor.tempo_limite,
+        motor.limite_memoria_mb,
+    ) as antecipacao:
+        print(
+            f"👀Monitorando {pasta_nf} ({monitor.backend}). "
+            f"Ctrl+C para encerrar.\n"
+        )
+        processar_lote(pasta_nf, motor, antecipacao)
+        while True:
+            alterados = monitor.esperar_lote()
+            if alterados is None:
+                break
+            print(f"\n📥{len(alterados)} arquivo(s) novo(s) ou alterado(s).")
+            processar_lote(pasta_nf, motor, antecipacao, alterados)
+    print("Monitoramento encerrado.")
+
+
+if __name__ == "__main__":
+    home = os.path.expanduser("~")
+    pasta_nf = os.path.join(home, "Downloads", "NF_FLASH")
+
+    load_dotenv()
+    # SIGINT/SIGTERM terminam a operação em andamento antes de sair
+    instalar_tratamento_sinais()
+    motor = configurar_motor_extracao(
+        backend=os.getenv("EXTRACAO_BACKEND", "processos"),
+        max_workers=int(os.getenv("EXTRACAO_WORKERS", "0")) or None,
+        tempo_limite=int(os.getenv("EXTRACAO_TEMPO_LIMITE", "120")),
+        limite_memoria_mb=int(os.getenv("EXTRACAO_MEMORIA_MB", "2048")),
+    )
+    configurar_pdfs_orfaos(
+        int(os.getenv("PDF_ORFAO_DIAS", "30")),
+        mover_para_lixo=os.getenv("PDF_ORFAO_LIXO", "0") == "1",
+    )
+    configurar_reprocessamento(os.getenv("REPROCESSAR_REMESSAS", "0") == "1")
+
+    if not os.path.isdir(pasta_nf):
+        print(f"Diretório não encontrado: {pasta_nf}")
+    elif os.getenv("MODO_MONITORAMENTO", "0") == "1":
+        monitorar_diretorio(pasta_nf, motor)
+    else:
+        processar_diretorio(pasta_nf)
+    motor.fechar()
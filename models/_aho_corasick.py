@@ -0,0 +1,189 @@
+"""Módulo com o autômato de Aho-Corasick usado para localizar chassis."""
+
+import re
+from collections import deque
+
+try:
+    import ahocorasick  # pyahocorasick, opcional: implementação em C
+except ImportError:
+    ahocorasick = None
+
+# Abaixo desta quantidade de chassis a busca por substring (em C) é mais
+# rápida que percorrer o texto em Python; veja o benchmark no fim do módulo
+MINIMO_PADROES_AUTOMATO = 100
+
+
+class AutomatoChassis:
+    """Autômato que procura vários chassis em uma única passada pelo texto.
+
+    É montado uma vez por conjunto de chassis e pode ser reutilizado em
+    qualquer quantidade de textos. A busca diferencia maiúsculas de
+    minúsculas, como o operador `in` que ele substitui.
+
+    Na implementação em Python puro as transições são pré-calculadas para
+    todo o alfabeto dos chassis (sem voltar pelos links de falha durante a
+    busca). Como qualquer caractere fora desse alfabeto leva o autômato de
+    volta à raiz, só os trechos do texto formados por caracteres do alfabeto
+    e com pelo menos o tamanho do menor chassi precisam ser percorridos.
+    """
+
+    def __init__(self, padroes, usar_extensao=True,
+                 minimo_padroes=MINIMO_PADROES_AUTOMATO):
+        """Monta o autômato.
+
+        Args:
+            padroes: Chassis a serem procurados
+            usar_extensao: Se False, ignora o pyahocorasick mesmo instalado
+            minimo_padroes: Abaixo desta quantidade de chassis a versão em
+                            Python puro procura um chassi por vez
+        """
+        self.padroes = frozenset(p for p in padroes if p)
+        self._nativo = None
+        self._por_substring = False
+        if not self.padroes:
+            return
+        if usar_extensao and ahocorasick is not None:
+            self._nativo = ahocorasick.Automaton()
+            for padrao in self.padroes:
+                self._nativo.add_word(padrao, padrao)
+            self._nativo.make_automaton()
+            return
+        if len(self.padroes) < minimo_padroes:
+            self._por_substring = True
+            return
+        self._montar()
+
+    def procurar(self, texto, procurados=None):
+        """Localiza a primeira ocorrência de cada chassi no texto.
+
+        Args:
+            texto: Texto onde os chassis serão procurados
+            procurados: Subconjunto dos chassis que ainda interessam; a busca
+                        para quando todos forem encontrados
+
+        Returns:
+            Dicionário {chassi: posição da primeira ocorrência no texto}
+        """
+        faltando = set(self.padroes if procurados is None else procurados)
+        faltando &= self.padroes
+        encontrados = {}
+        if not faltando or not texto:
+            return encontrados
+
+        if self._nativo is not None:
+            for fim, padrao in self._nativo.iter(texto):
+                if padrao in faltando:
+                    encontrados[padrao] = fim - len(padrao) + 1
+                    faltando.discard(padrao)
+                    if not faltando:
+                        break
+            return encontrados
+
+        if self._por_substring:
+            for padrao in faltando:
+                posicao = texto.find(padrao)
+                if posicao >= 0:
+                    encontrados[padrao] = posicao
+            return encontrados
+
+        transicoes = self._transicoes
+        saidas = self._saidas
+        for trecho in self._trechos.finditer(texto):
+            estado = 0
+            inicio = trecho.start()
+            for deslocamento, caractere in enumerate(trecho.group()):
+                estado = transicoes[estado].get(caractere, 0)
+                if saidas[estado]:
+                    for padrao in saidas[estado]:
+                        if padrao in faltando:
+                            encontrados[padrao] = (
+                                inicio + deslocamento - len(padrao) + 1
+                            )
+                            faltando.discard(padrao)
+                    if not faltando:
+                        return encontrados
+        return encontrados
+
+    def _montar(self):
+        """Monta a trie, os links de falha e a tabela de transições."""
+        transicoes = [{}]
+        saidas = [()]
+        for padrao in self.padroes:
+            estado = 0
+            for caractere in padrao:
+                proximo = transicoes[estado].get(caractere)
+                if proximo is None:
+                    proximo = len(transicoes)
+                    transicoes[estado][caractere] = proximo
+                    transicoes.append({})
+                    saidas.append(())
+                estado = proximo
+            saidas[estado] = (padrao,)
+
+        # Busca em largura: o link de falha de um estado é sempre mais raso,
+        # então as transições dele já estão completas quando são copiadas
+        falhas = [0] * len(transicoes)
+        fila = deque(transicoes[0].values())
+        while fila:
+            estado = fila.popleft()
+            saidas[estado] = saidas[estado] + saidas[falhas[estado]]
+            for caractere, proximo in list(transicoes[estado].items()):
+                falhas[proximo] = transicoes[falhas[estado]].get(caractere, 0)
+                fila.append(proximo)
+            for caractere, destino in transicoes[falhas[estado]].items():
+                transicoes[estado].setdefault(caractere, destino)
+
+        alfabeto = "".join(sorted({c for p in self.padroes for c in p}))
+        menor = min(len(p) for p in self.padroes)
+        self._transicoes = transicoes
+        self._saidas = saidas
+        self._trechos = re.compile(f"[{re.escape(alfabeto)}]{{{menor},}}")
+
+
+if __name__ == "__main__":
+    # Compara o autômato com a busca por substring, um chassi por vez:
+    #   python -m models._aho_corasick
+    import random
+    import string
+    import timeit
+
+    aleatorio = random.Random(0)
+    caracteres = string.ascii_uppercase + string.digits
+
+    def gerar_chassi():
+        return "".join(aleatorio.choice(caracteres) for _ in range(17))
+
+    palavras = (
+        "NOTA FISCAL ELETRONICA VALOR TOTAL DO PRODUTO 2023 R$ 150.000,00 "
+        "veiculo novo cor branca modelo ano fabricacao CNPJ 12.345.678/0001-90"
+    ).split()
+
+    for quantidade in (10, 50, 200, 1000):
+        chassis = {gerar_chassi() for _ in range(quantidade)}
+        presentes = aleatorio.sample(sorted(chassis), max(1, quantidade // 10))
+        texto = " ".join(aleatorio.choice(palavras) for _ in range(40000))
+        texto += " " + " ".join(presentes)
+
+        def montar():
+            return AutomatoChassis(
+                chassis, usar_extensao=False, minimo_padroes=0
+            )
+
+        automato = montar()
+        esperado = {c for c in chassis if c in texto}
+        assert set(automato.procurar(texto)) == esperado
+
+        rodadas = 5
+        substring = timeit.timeit(
+            lambda: {c for c in chassis if c in texto}, number=rodadas
+        ) / rodadas
+        montagem = timeit.timeit(montar, number=1)
+        busca = timeit.timeit(
+            lambda: automato.procurar(texto), number=rodadas
+        ) / rodadas
+        print(
+            f"{quantidade:>5} chassis, {len(texto) // 1024} KB: "
+            f"substring {substring * 1000:.2f} ms | "
+            f"autômato {busca * 1000:.2f} ms "
+            f"(montagem {montagem * 1000:.2f} ms)"
+        )
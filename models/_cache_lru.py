@@ -0,0 +1,130 @@
+"""Módulo com um cache LRU em memória limitado por bytes."""
+
+import sys
+import threading
+from collections import OrderedDict
+
+
+def medir_tamanho(valor):
+    """Estima quantos bytes um valor ocupa na memória.
+
+    Conjuntos, tuplas e dicionários são medidos junto com os itens que contêm.
+
+    Args:
+        valor: Valor a ser medido
+
+    Returns:
+        Tamanho aproximado em bytes
+    """
+    tamanho = sys.getsizeof(valor)
+    if isinstance(valor, (set, frozenset, tuple, list)):
+        tamanho += sum(medir_tamanho(item) for item in valor)
+    elif isinstance(valor, dict):
+        tamanho += sum(
+            medir_tamanho(chave) + medir_tamanho(item)
+            for chave, item in valor.items()
+        )
+    return tamanho
+
+
+class CacheLRU:
+    """Cache LRU seguro para threads, limitado por um orçamento de bytes.
+
+    Quando o total ultrapassa o limite, as entradas usadas há mais tempo são
+    descartadas. Mantém contadores de acertos, falhas e despejos.
+    """
+
+    def __init__(self, limite_bytes, medir=medir_tamanho):
+        """Cria o cache.
+
+        Args:
+            limite_bytes: Quantidade máxima de bytes mantida no cache
+            medir: Função que estima o tamanho em bytes de um valor
+        """
+        self.limite_bytes = limite_bytes
+        self._medir = medir
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.despejos = 0
+
+    def obter(self, chave, padrao=None):
+        """Busca um valor e o marca como usado recentemente.
+
+        Args:
+            chave: Chave da entrada
+            padrao: Valor retornado se a chave não estiver no cache
+
+        Returns:
+            Valor guardado ou o padrão
+        """
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            if entrada is None:
+                self.falhas += 1
+                return padrao
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return entrada[0]
+
+    def gravar(self, chave, valor):
+        """Guarda um valor, despejando as entradas mais antigas se preciso.
+
+        Valores maiores que o limite inteiro do cache não são guardados.
+
+        Args:
+            chave: Chave da entrada
+            valor: Valor a ser guardado
+        """
+        tamanho = self._medir(valor)
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior[1]
+            if tamanho > self.limite_bytes:
+                return
+            self._entradas[chave] = (valor, tamanho)
+            self.bytes_usados += tamanho
+            while self.bytes_usados > self.limite_bytes:
+                _, (_, tamanho_removido) = self._entradas.popitem(last=False)
+                self.bytes_usados -= tamanho_removido
+                self.despejos += 1
+
+    def remover(self, chave):
+        """Remove uma entrada do cache, se existir."""
+        with self._lock:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior[1]
+
+    def clear(self):
+        """Esvazia o cache, mantendo os contadores."""
+        with self._lock:
+            self._entradas.clear()
+            self.bytes_usados = 0
+
+    def estatisticas(self):
+        """Retorna os contadores do cache.
+
+        Returns:
+            Dicionário com entradas, bytes usados, acertos, falhas e despejos
+        """
+        with self._lock:
+            return {
+                "entradas": len(self._entradas),
+                "bytes_usados": self.bytes_usados,
+                "limite_bytes": self.limite_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "despejos": self.despejos,
+            }
+
+    def __contains__(self, chave):
+        with self._lock:
+            return chave in self._entradas
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entradas)
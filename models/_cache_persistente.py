@@ -0,0 +1,213 @@
+"""Módulo com o cache em disco dos textos extraídos de PDFs."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+# Tamanho dos blocos lidos para calcular o hash do conteúdo do arquivo
+TAMANHO_BLOCO_HASH = 1024 * 1024
+
+# Versão do formato das entradas; bancos de outra versão são recriados
+VERSAO_CACHE = 2
+
+# Entrada válida do cache: texto, veredito de texto codificado, nº de páginas
+# e as medidas da classificação do texto
+EntradaCachePdf = namedtuple(
+    "EntradaCachePdf",
+    [
+        "texto", "codificado", "paginas", "percentual_reconhecido",
+        "caractere_substituicao",
+    ],
+)
+
+
+def calcular_hash_arquivo(caminho):
+    """Calcula o hash do conteúdo de um arquivo.
+
+    Args:
+        caminho: Caminho do arquivo
+
+    Returns:
+        String hexadecimal com o hash BLAKE2b do conteúdo
+    """
+    resumo = hashlib.blake2b(digest_size=16)
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(TAMANHO_BLOCO_HASH), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+class CachePdfPersistente:
+    """Cache em SQLite do texto extraído dos PDFs, mantido entre execuções.
+
+    Cada entrada é identificada pelo caminho do PDF e validada pelo tamanho,
+    data de modificação e hash do conteúdo. Entradas de arquivos alterados
+    ou que não existem mais são descartadas automaticamente. Para arquivos
+    do inventário da execução, tamanho, data e hash vêm do inventário em vez
+    de uma nova consulta ao disco.
+    """
+
+    def __init__(self, caminho_banco, inventario=None):
+        """Abre (ou cria) o banco do cache.
+
+        Args:
+            caminho_banco: Caminho do arquivo SQLite
+            inventario: Dicionário {caminho: TriagemArquivo} da execução
+        """
+        os.makedirs(os.path.dirname(caminho_banco), exist_ok=True)
+        self.caminho_banco = caminho_banco
+        self.inventario = inventario or {}
+        self._lock = threading.Lock()
+        # O timeout permite que vários processos de extração usem o mesmo banco
+        self._conexao = sqlite3.connect(
+            caminho_banco, timeout=30, check_same_thread=False
+        )
+        versao = self._conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao != VERSAO_CACHE:
+            self._conexao.execute("DROP TABLE IF EXISTS pdf_textos")
+            self._conexao.execute(f"PRAGMA user_version = {VERSAO_CACHE}")
+        self._conexao.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pdf_textos (
+                caminho TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT NOT NULL,
+                texto BLOB NOT NULL,
+                codificado INTEGER NOT NULL,
+                paginas INTEGER NOT NULL DEFAULT 0,
+                percentual_reconhecido REAL,
+                caractere_substituicao INTEGER NOT NULL DEFAULT 0,
+                atualizado_em REAL NOT NULL
+            )
+            """
+        )
+        self._conexao.commit()
+
+    def obter(self, caminho_pdf):
+        """Busca o texto de um PDF no cache.
+
+        Args:
+            caminho_pdf: Caminho para o arquivo PDF
+
+        Returns:
+            EntradaCachePdf ou None se não houver entrada válida
+        """
+        with self._lock:
+            linha = self._conexao.execute(
+                "SELECT tamanho, mtime_ns, hash, texto, codificado, paginas, "
+                "percentual_reconhecido, caractere_substituicao "
+                "FROM pdf_textos WHERE caminho = ?",
+                (caminho_pdf,),
+            ).fetchone()
+            if linha is None:
+                return None
+
+            tamanho, mtime_ns, hash_salvo, texto, *veredito = linha
+            codificado, paginas, percentual, substituicao = veredito
+            try:
+                tamanho_atual, mtime_atual = self._assinatura(caminho_pdf)
+            except OSError:
+                self._remover(caminho_pdf)
+                return None
+
+            if tamanho_atual != tamanho:
+                self._remover(caminho_pdf)
+                return None
+
+            # Data de modificação diferente não basta: confere o conteúdo
+            if mtime_atual != mtime_ns:
+                if self._hash(caminho_pdf) != hash_salvo:
+                    self._remover(caminho_pdf)
+                    return None
+                self._conexao.execute(
+                    "UPDATE pdf_textos SET mtime_ns = ? WHERE caminho = ?",
+                    (mtime_atual, caminho_pdf),
+                )
+                self._conexao.commit()
+
+            return EntradaCachePdf(
+                zlib.decompress(texto).decode("utf-8"), bool(codificado),
+                paginas, percentual, bool(substituicao),
+            )
+
+    def gravar(self, caminho_pdf, texto, codificado, paginas=0,
+               percentual_reconhecido=None, caractere_substituicao=False):
+        """Grava o texto extraído de um PDF no cache.
+
+        Args:
+            caminho_pdf: Caminho para o arquivo PDF
+            texto: Texto extraído do PDF
+            codificado: True se o texto foi classificado como codificado
+            paginas: Quantidade de páginas do PDF
+            percentual_reconhecido: Percentual de palavras reconhecidas
+            caractere_substituicao: True se o texto tem o caractere U+FFFD
+        """
+        tamanho, mtime_ns = self._assinatura(caminho_pdf)
+        hash_arquivo = self._hash(caminho_pdf)
+        texto_comprimido = zlib.compress(texto.encode("utf-8"))
+        with self._lock:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO pdf_textos "
+                "(caminho, tamanho, mtime_ns, hash, texto, codificado, "
+                "paginas, percentual_reconhecido, caractere_substituicao, "
+                "atualizado_em) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    caminho_pdf, tamanho, mtime_ns, hash_arquivo,
+                    texto_comprimido, int(codificado), paginas,
+                    percentual_reconhecido, int(caractere_substituicao),
+                    time.time(),
+                ),
+            )
+            self._conexao.commit()
+
+    def limpar_ausentes(self):
+        """Remove do cache as entradas de PDFs que não existem mais.
+
+        Returns:
+            Quantidade de entradas removidas
+        """
+        with self._lock:
+            caminhos = [
+                caminho for (caminho,) in
+                self._conexao.execute("SELECT caminho FROM pdf_textos")
+                if caminho not in self.inventario
+                and not os.path.isfile(caminho)
+            ]
+            self._conexao.executemany(
+                "DELETE FROM pdf_textos WHERE caminho = ?",
+                [(caminho,) for caminho in caminhos],
+            )
+            self._conexao.commit()
+        return len(caminhos)
+
+    def fechar(self):
+        """Fecha a conexão com o banco do cache."""
+        with self._lock:
+            self._conexao.close()
+
+    def _assinatura(self, caminho_pdf):
+        """Tamanho e data de modificação (ns), do inventário ou do disco."""
+        arquivo = self.inventario.get(caminho_pdf)
+        if arquivo is not None and arquivo.tamanho is not None:
+            return arquivo.tamanho, arquivo.mtime_ns
+        stat = os.stat(caminho_pdf)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _hash(self, caminho_pdf):
+        """Hash do conteúdo, reaproveitando o calculado pelo inventário."""
+        arquivo = self.inventario.get(caminho_pdf)
+        if arquivo is not None:
+            return arquivo.hash
+        return calcular_hash_arquivo(caminho_pdf)
+
+    def _remover(self, caminho_pdf):
+        """Remove uma entrada do cache (chamar com o lock adquirido)."""
+        self._conexao.execute(
+            "DELETE FROM pdf_textos WHERE caminho = ?", (caminho_pdf,)
+        )
+        self._conexao.commit()
@@ -0,0 +1,42 @@
+"""Módulo para encontrar PDFs com conteúdo idêntico antes da extração."""
+
+
+def agrupar_pdfs_duplicados(arquivos_pdf, triagem):
+    """Agrupa os PDFs que têm exatamente o mesmo conteúdo.
+
+    Só os PDFs que compartilham o mesmo tamanho têm o conteúdo lido para o
+    cálculo do hash, então arquivos de tamanho único não custam nada. O hash
+    fica guardado na triagem e é reaproveitado pelo cache em disco.
+
+    Args:
+        arquivos_pdf: Lista de caminhos para arquivos PDF
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+
+    Returns:
+        Dicionário {representante: [cópias]} só com os grupos que têm
+        cópias. O representante é o primeiro caminho do grupo em ordem
+        alfabética.
+    """
+    por_tamanho = {}
+    for caminho_pdf in arquivos_pdf:
+        por_tamanho.setdefault(triagem[caminho_pdf].tamanho, []).append(
+            caminho_pdf
+        )
+
+    duplicados = {}
+    for candidatos in por_tamanho.values():
+        if len(candidatos) < 2:
+            continue
+        por_hash = {}
+        for caminho_pdf in candidatos:
+            try:
+                hash_arquivo = triagem[caminho_pdf].hash
+            except OSError:
+                continue
+            por_hash.setdefault(hash_arquivo, []).append(caminho_pdf)
+        for grupo in por_hash.values():
+            if len(grupo) > 1:
+                representante, *copias = sorted(grupo)
+                duplicados[representante] = copias
+
+    return duplicados
@@ -0,0 +1,164 @@
+"""Módulo com os estágios da esteira do organizador, ligados por filas limitadas."""
+
+import queue
+import threading
+
+# Itens que cada fila entre dois estágios guarda antes de bloquear quem envia
+LIMITE_FILA_PADRAO = 8
+
+# Marca o fim dos itens de uma fila
+_FIM = object()
+
+
+class EstagioProdutor:
+    """Estágio que aplica uma função a uma sequência em uma thread própria.
+
+    Os resultados são entregues na ordem dos itens por uma fila limitada:
+    quando quem consome fica para trás, a thread para de produzir até haver
+    espaço (backpressure). A thread começa assim que o estágio é criado,
+    então quem cria pode fazer outra coisa enquanto os primeiros itens são
+    preparados. Um erro da função é repassado a quem consome, no item em
+    que ocorreu.
+    """
+
+    def __init__(self, funcao, itens, limite_fila=LIMITE_FILA_PADRAO,
+                 nome="estagio"):
+        """Começa a produzir.
+
+        Args:
+            funcao: Função aplicada a cada item
+            itens: Sequência de itens
+            limite_fila: Resultados prontos guardados antes de bloquear
+            nome: Nome da thread
+        """
+        self._fila = queue.Queue(maxsize=limite_fila)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(
+            target=self._produzir, args=(funcao, list(itens)), name=nome,
+            daemon=True,
+        )
+        self._thread.start()
+
+    def __iter__(self):
+        """Gera tuplas (item, resultado), na ordem dos itens."""
+        while True:
+            entrada = self._fila.get()
+            if entrada is _FIM:
+                return
+            item, resultado, erro = entrada
+            if erro is not None:
+                raise erro
+            yield item, resultado
+
+    def fechar(self):
+        """Para a produção (se ainda houver itens) e espera a thread."""
+        self._parar.set()
+        while self._thread.is_alive():
+            try:
+                self._fila.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def _produzir(self, funcao, itens):
+        """Laço da thread: um item de cada vez, até o fim ou até fechar()."""
+        for item in itens:
+            if self._parar.is_set():
+                break
+            try:
+                entrada = (item, funcao(item), None)
+            except Exception as e:
+                entrada = (item, None, e)
+            if not self._colocar(entrada) or entrada[2] is not None:
+                break
+        self._colocar(_FIM)
+
+    def _colocar(self, entrada):
+        """Põe na fila, esperando espaço; False se o estágio foi fechado."""
+        while not self._parar.is_set():
+            try:
+                self._fila.put(entrada, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+class EstagioConsumidor:
+    """Estágio que processa, em workers próprios, os itens enviados a ele.
+
+    enviar() só põe o item em uma fila limitada e volta; com a fila cheia,
+    espera até algum worker liberar espaço (backpressure). encerrar()
+    espera o fim de todos os itens e devolve os resultados na ordem em que
+    foram enviados.
+    """
+
+    def __init__(self, funcao, workers=1, limite_fila=LIMITE_FILA_PADRAO,
+                 nome="estagio"):
+        """Cria os workers.
+
+        Args:
+            funcao: Função chamada com os argumentos de cada envio
+            workers: Quantidade de threads que processam a fila
+            limite_fila: Itens na fila antes de enviar() bloquear
+            nome: Prefixo do nome das threads
+        """
+        self._funcao = funcao
+        self._fila = queue.Queue(maxsize=limite_fila)
+        self._resultados = {}
+        self._erros = {}
+        self._ordem = []
+        self._threads = [
+            threading.Thread(
+                target=self._consumir, name=f"{nome}_{indice}", daemon=True
+            )
+            for indice in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def enviar(self, chave, *args):
+        """Entrega um item ao estágio.
+
+        Args:
+            chave: Identificação do item nos resultados
+            *args: Argumentos da função do estágio
+        """
+        self._ordem.append(chave)
+        self._fila.put((chave, args))
+
+    def encerrar(self):
+        """Espera o processamento de todos os itens e encerra os workers.
+
+        Returns:
+            Dicionário {chave: resultado}, na ordem dos envios
+
+        Raises:
+            O primeiro erro ocorrido em algum item, na ordem dos envios
+        """
+        for _ in self._threads:
+            self._fila.put(_FIM)
+        for thread in self._threads:
+            thread.join()
+        for chave in self._ordem:
+            if chave in self._erros:
+                raise self._erros[chave]
+        return {chave: self._resultados[chave] for chave in self._ordem}
+
+    def _consumir(self):
+        """Laço de cada worker."""
+        while True:
+            entrada = self._fila.get()
+            if entrada is _FIM:
+                return
+            chave, args = entrada
+            try:
+                self._resultados[chave] = self._funcao(*args)
+            except BaseException as e:
+                self._erros[chave] = e
@@ -0,0 +1,115 @@
+"""Módulo com a extração antecipada dos PDFs que chegam antes do .txt."""
+
+import queue
+import threading
+
+from models._extracao_supervisionada import (
+    LIMITE_MEMORIA_PADRAO_MB,
+    TEMPO_LIMITE_PADRAO,
+    PoolSupervisionado,
+)
+
+
+class ExtracaoAntecipada:
+    """Extrai em segundo plano os PDFs que ainda esperam o seu .txt.
+
+    As NFs costumam chegar minutos antes da remessa. Cada PDF agendado é
+    lido por inteiro, tokenizado e classificado por um processo com
+    prioridade baixa, e o resultado vai para o cache em disco; quando o
+    .txt chega, a análise do PDF é só uma consulta ao cache. Falhas são
+    ignoradas aqui: quem isola o PDF problemático é a extração normal.
+    """
+
+    def __init__(self, diretorio_cache, tempo_limite=TEMPO_LIMITE_PADRAO,
+                 limite_memoria_mb=LIMITE_MEMORIA_PADRAO_MB):
+        """Cria o processo de segundo plano e a thread que o alimenta.
+
+        Args:
+            diretorio_cache: Pasta _Cache do diretório monitorado
+            tempo_limite: Segundos permitidos para extrair cada PDF
+            limite_memoria_mb: Teto de memória do processo, em MB
+        """
+        self._pool = PoolSupervisionado(
+            1, tempo_limite, limite_memoria_mb, diretorio_cache,
+            segundo_plano=True,
+        )
+        self._fila = queue.Queue()
+        self._agendados = set()
+        self._lock = threading.Lock()
+        self.preparados = 0
+        self._thread = threading.Thread(
+            target=self._executar, name="extracao_antecipada", daemon=True
+        )
+        self._thread.start()
+
+    def agendar(self, arquivos_pdf):
+        """Agenda PDFs para extração; os que já estão na fila são ignorados.
+
+        Args:
+            arquivos_pdf: Caminhos dos PDFs
+
+        Returns:
+            Quantidade de PDFs agendados
+        """
+        with self._lock:
+            novos = [c for c in arquivos_pdf if c not in self._agendados]
+            self._agendados.update(novos)
+        for caminho_pdf in novos:
+            self._fila.put(caminho_pdf)
+        return len(novos)
+
+    def fechar(self):
+        """Termina o PDF em andamento e encerra o processo."""
+        with self._lock:
+            self._agendados.clear()
+        self._fila.put(None)
+        self._thread.join()
+        self._pool.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def _executar(self):
+        """Laço da thread: um PDF de cada vez, na ordem de chegada."""
+        while True:
+            caminho_pdf = self._fila.get()
+            if caminho_pdf is None:
+                return
+            with self._lock:
+                if caminho_pdf not in self._agendados:
+                    continue
+            try:
+                resultados, _ = self._pool.analisar([caminho_pdf], None)
+            except Exception as e:
+                # A antecipação é só um adiantamento: a extração normal
+                # continua valendo
+                print(f"[Extração antecipada] {caminho_pdf} - {e}")
+                resultados = []
+            with self._lock:
+                self._agendados.discard(caminho_pdf)
+                self.preparados += len(resultados)
+
+
+def pdfs_antecipaveis(triagem, caminhos=None):
+    """PDFs de nota fiscal do inventário que podem ser extraídos antes.
+
+    Vias negociáveis e PDFs acima do limite de tamanho não são lidos pela
+    extração normal e ficam de fora. Nada aqui consulta o sistema de
+    arquivos: vale o inventário da última organização.
+
+    Args:
+        triagem: Dicionário {caminho: TriagemArquivo} do diretório
+        caminhos: Se informado, só estes caminhos são considerados
+
+    Returns:
+        Lista de caminhos dos PDFs, em ordem de nome
+    """
+    return sorted(
+        caminho for caminho, arquivo in triagem.items()
+        if arquivo.extensao == ".pdf"
+        and not (arquivo.via_negociavel or arquivo.acima_do_limite)
+        and (caminhos is None or caminho in caminhos)
+    )
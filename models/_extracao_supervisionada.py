@@ -0,0 +1,262 @@
+"""Módulo com o pool supervisionado de processos de extração de PDFs."""
+
+import multiprocessing
+import os
+import signal
+import time
+from collections import deque, namedtuple
+from multiprocessing.connection import wait
+
+from models._extrair_texto_do_pdf import (
+    analisar_pdf,
+    configurar_cache_memoria,
+    configurar_cache_persistente,
+    preparar_pdf,
+)
+from models._interrupcao import interrupcao_solicitada
+
+try:
+    import resource  # Indisponível no Windows: lá o teto de memória é ignorado
+except ImportError:
+    resource = None
+
+# Tempo máximo, em segundos, para extrair um único PDF
+TEMPO_LIMITE_PADRAO = 120
+
+# Teto de memória, em MB, de cada processo de extração
+LIMITE_MEMORIA_PADRAO_MB = 2048
+
+# PDF que não pôde ser analisado, com o motivo da falha
+FalhaExtracao = namedtuple("FalhaExtracao", ["caminho", "motivo"])
+
+
+def _executar_worker(conexao, diretorio_cache, limite_memoria_mb,
+                     segundo_plano=False):
+    """Laço principal de um processo de extração.
+
+    Recebe (caminho_pdf, chassis, com_tokens) pela conexão e devolve
+    ("ok", AnalisePdf)
+    ou ("erro", motivo); com chassis None, só prepara o PDF no cache em
+    disco (preparar_pdf). Encerra ao receber None ou após estourar a
+    memória, que é devolvida como ("fatal", motivo) para o pool trocar o
+    processo.
+    """
+    # O Ctrl+C chega a todo o grupo de processos; quem decide parar é o
+    # processo principal, que deixa terminar o PDF em andamento
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource is not None and limite_memoria_mb:
+        limite = limite_memoria_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limite, limite))
+    if diretorio_cache is not None:
+        configurar_cache_persistente(diretorio_cache, limpar_ausentes=False)
+    if segundo_plano:
+        # Só alimenta o cache em disco e cede a CPU para a extração normal
+        configurar_cache_memoria(0)
+        if hasattr(os, "nice"):
+            os.nice(19)
+
+    while True:
+        try:
+            tarefa = conexao.recv()
+        except EOFError:
+            break
+        if tarefa is None:
+            break
+
+        caminho_pdf, chassis, com_tokens = tarefa
+        try:
+            if chassis is None:
+                conexao.send(("ok", preparar_pdf(caminho_pdf)))
+            else:
+                conexao.send(
+                    ("ok", analisar_pdf(caminho_pdf, chassis, com_tokens))
+                )
+        except MemoryError:
+            # O heap pode ter ficado inconsistente: avisa e sai, o pool põe
+            # outro processo no lugar
+            conexao.send(
+                ("fatal", f"memória acima do limite de {limite_memoria_mb}MB")
+            )
+            break
+        except Exception as e:
+            conexao.send(("erro", f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """Processo de extração e a tarefa que ele está executando."""
+
+    def __init__(self, contexto, diretorio_cache, limite_memoria_mb,
+                 segundo_plano=False):
+        self.conexao, conexao_filho = contexto.Pipe()
+        self.processo = contexto.Process(
+            target=_executar_worker,
+            args=(
+                conexao_filho, diretorio_cache, limite_memoria_mb,
+                segundo_plano,
+            ),
+            daemon=True,
+        )
+        self.processo.start()
+        conexao_filho.close()
+        self.tarefa = None
+        self.inicio = None
+
+    def enviar(self, caminho_pdf, chassis, com_tokens=False):
+        """Envia um PDF para o processo analisar."""
+        self.conexao.send((caminho_pdf, chassis, com_tokens))
+        self.tarefa = caminho_pdf
+        self.inicio = time.monotonic()
+
+    def encerrar(self, forcar=False):
+        """Encerra o processo, pedindo com educação ou à força."""
+        if forcar:
+            self.processo.kill()
+        else:
+            try:
+                self.conexao.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        self.processo.join(timeout=5)
+        if self.processo.is_alive():
+            self.processo.kill()
+            self.processo.join()
+        self.conexao.close()
+
+
+class PoolSupervisionado:
+    """Pool de processos que isola PDFs problemáticos.
+
+    Cada PDF tem um tempo limite de extração e cada processo um teto de
+    memória. Um processo que estoura o tempo é encerrado e um que morre
+    (falha no PyMuPDF, falta de memória) é substituído; o PDF em questão é
+    registrado como falha e o restante do lote continua.
+    """
+
+    def __init__(self, max_workers=None, tempo_limite=TEMPO_LIMITE_PADRAO,
+                 limite_memoria_mb=LIMITE_MEMORIA_PADRAO_MB,
+                 diretorio_cache=None, segundo_plano=False):
+        """Cria o pool sem iniciar os processos.
+
+        Args:
+            max_workers: Quantidade de processos (padrão: nº de CPUs)
+            tempo_limite: Segundos permitidos para extrair cada PDF
+            limite_memoria_mb: Teto de memória de cada processo, em MB
+            diretorio_cache: Diretório do cache em disco usado pelos processos
+            segundo_plano: Se True, os processos rodam com prioridade baixa
+                           e sem cache em memória
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.tempo_limite = tempo_limite
+        self.limite_memoria_mb = limite_memoria_mb
+        self.diretorio_cache = diretorio_cache
+        self.segundo_plano = segundo_plano
+        # spawn evita herdar conexões SQLite e threads do processo principal
+        self._contexto = multiprocessing.get_context("spawn")
+        self._workers = []
+
+    def aquecer(self):
+        """Inicia todos os processos antes do primeiro PDF.
+
+        Cada processo paga a importação do PyMuPDF ao nascer; aquecido, o
+        pool já recebe o primeiro lote com os processos prontos.
+        """
+        while len(self._workers) < self.max_workers:
+            self._workers.append(self._novo_worker())
+
+    def analisar(self, arquivos_pdf, chassis, com_tokens=False):
+        """Analisa os PDFs procurando os chassis.
+
+        Args:
+            arquivos_pdf: Lista de caminhos para arquivos PDF
+            chassis: Conjunto de chassis procurados, ou None para só
+                     preparar os PDFs no cache em disco (preparar_pdf)
+            com_tokens: Se True, as análises trazem os tokens candidatos e
+                        os trechos longos (veja analisar_pdf)
+
+        Returns:
+            Tupla (lista de AnalisePdf, lista de FalhaExtracao)
+        """
+        pendentes = deque(arquivos_pdf)
+        resultados = []
+        falhas = []
+        while len(self._workers) < min(self.max_workers, len(pendentes)):
+            self._workers.append(self._novo_worker())
+
+        while pendentes or any(w.tarefa for w in self._workers):
+            if interrupcao_solicitada():
+                # Os PDFs em andamento terminam; os demais ficam para depois
+                pendentes.clear()
+                if not any(w.tarefa for w in self._workers):
+                    break
+            for indice, worker in enumerate(self._workers):
+                if worker.tarefa is None and pendentes:
+                    caminho_pdf = pendentes.popleft()
+                    try:
+                        if not worker.processo.is_alive():
+                            raise BrokenPipeError
+                        worker.enviar(caminho_pdf, chassis, com_tokens)
+                    except (BrokenPipeError, OSError):
+                        # O processo morreu ocioso: troca por um novo
+                        worker.encerrar(forcar=True)
+                        worker = self._workers[indice] = self._novo_worker()
+                        worker.enviar(caminho_pdf, chassis, com_tokens)
+
+            ocupados = [w for w in self._workers if w.tarefa]
+            prazo = min(w.inicio for w in ocupados) + self.tempo_limite
+            prontos = wait(
+                [w.conexao for w in ocupados]
+                + [w.processo.sentinel for w in ocupados],
+                timeout=max(0, prazo - time.monotonic()),
+            )
+
+            for worker in ocupados:
+                substituir = False
+                if worker.conexao in prontos:
+                    try:
+                        status, dado = worker.conexao.recv()
+                    except (EOFError, OSError):
+                        falha = self._motivo_encerramento(worker)
+                    else:
+                        if status == "ok":
+                            resultados.append(dado)
+                            worker.tarefa = None
+                            continue
+                        falha = dado
+                        substituir = status == "fatal"
+                elif worker.processo.sentinel in prontos:
+                    falha = self._motivo_encerramento(worker)
+                elif time.monotonic() - worker.inicio > self.tempo_limite:
+                    falha = f"tempo limite de {self.tempo_limite}s excedido"
+                    substituir = True
+                else:
+                    continue
+
+                falhas.append(FalhaExtracao(worker.tarefa, falha))
+                worker.tarefa = None
+                if substituir or not worker.processo.is_alive():
+                    worker.encerrar(forcar=True)
+                    self._workers[self._workers.index(worker)] = (
+                        self._novo_worker()
+                    )
+
+        return resultados, falhas
+
+    def fechar(self):
+        """Encerra todos os processos do pool."""
+        for worker in self._workers:
+            worker.encerrar()
+        self._workers = []
+
+    def _novo_worker(self):
+        return _Worker(
+            self._contexto, self.diretorio_cache, self.limite_memoria_mb,
+            self.segundo_plano,
+        )
+
+    @staticmethod
+    def _motivo_encerramento(worker):
+        worker.processo.join(timeout=5)
+        return (
+            f"processo de extração encerrado inesperadamente "
+            f"(código {worker.processo.exitcode})"
+        )
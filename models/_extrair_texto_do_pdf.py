@@ -1,16 +1,217 @@
 """Módulo para extrair texto de arquivos PDF."""
 
+import functools
 import os
+import re
+from collections import namedtuple
 
 import fitz  # Biblioteca PyMuPDF para ler arquivos PDF
 
-# Dicionário para armazenar textos já extraídos de PDFs (evita reprocessar o mesmo PDF)
-cache_pdf_textos = {}
+from models._aho_corasick import AutomatoChassis
+from models._cache_lru import CacheLRU
+from models._cache_persistente import CachePdfPersistente
+from models._validar_texto import analisar_texto
+
+# Tamanhos de chassi aceitos em extrair_dados_do_txt
+TAMANHOS_CHASSI = (8, 17, 21)
+
+# Separa o texto de cada página no texto completo do PDF
+SEPARADOR_PAGINA = "\f"
+
+# Blocos alfanuméricos e os separadores que podem partir um chassi no PDF
+# (espaços, quebras de linha e hífens; a quebra de página não entra)
+_RE_BLOCO = re.compile(r"[A-Z0-9]+")
+_RE_QUEBRA_CHASSI = re.compile(r"[ \t\r\n\u00a0\-\u2010\u2011\u2013]{1,3}")
+
+# Orçamento padrão de memória para os textos extraídos
+LIMITE_CACHE_MEMORIA_BYTES = 128 * 1024 * 1024
+
+# Forma compacta de um PDF: os tokens candidatos a chassi, cada um com a
+# página em que aparece primeiro, os trechos longos (extrair_trechos_longos)
+# e o veredito de texto codificado
+PdfCompacto = namedtuple("PdfCompacto", ["tokens", "trechos", "codificado"])
+
+# Resultado da análise de um PDF, sem o texto extraído. Os chassis vêm em um
+# dicionário {chassi: página em que foi encontrado}; tokens traz todos os
+# tokens candidatos a chassi do PDF ({token: página}) e trechos os trechos
+# longos, ambos None se o PDF não foi lido por inteiro
+AnalisePdf = namedtuple(
+    "AnalisePdf", ["caminho", "chassis", "veredito", "tokens", "trechos"],
+    defaults=(None, None),
+)
+
+# Texto de uma página, com o número dela (a partir de 1) e o total do PDF
+PaginaPdf = namedtuple("PaginaPdf", ["numero", "total", "texto"])
+
+# Veredito de texto codificado de cada PDF já extraído, calculado uma vez na
+# extração, com o nº de páginas e as medidas usadas na classificação
+VereditoPdf = namedtuple(
+    "VereditoPdf",
+    ["codificado", "paginas", "percentual_reconhecido", "caractere_substituicao"],
+    defaults=(0, None, False),
+)
+vereditos_pdf = {}
+
+# Cache LRU dos textos já extraídos de PDFs (evita reprocessar o mesmo PDF)
+cache_pdf_textos = CacheLRU(LIMITE_CACHE_MEMORIA_BYTES)
+
+# Se True, o cache em memória guarda só a forma compacta (PdfCompacto); se
+# False, guarda o texto. Nos dois casos os chassis são achados também quando
+# colados a outros caracteres, como na busca por substring
+cache_compacto = True
+
+# Cache em disco, mantido entre execuções (configurado por configurar_cache_persistente)
+cache_persistente = None
+
+
+def configurar_cache_memoria(limite_bytes=LIMITE_CACHE_MEMORIA_BYTES,
+                             compacto=True):
+    """Reconfigura o cache em memória dos textos extraídos.
+
+    Args:
+        limite_bytes: Quantidade máxima de bytes mantida em memória
+        compacto: Se True, depois da verificação de texto codificado guarda
+                  apenas os tokens candidatos a chassi e os trechos longos
+                  em vez do texto. Se False, guarda o texto, o que ocupa
+                  muito mais memória
+
+    Returns:
+        Instância de CacheLRU em uso
+    """
+    global cache_pdf_textos, cache_compacto
+    cache_pdf_textos = CacheLRU(limite_bytes)
+    cache_compacto = compacto
+    return cache_pdf_textos
+
+
+def configurar_cache_persistente(diretorio_cache, limpar_ausentes=True,
+                                 inventario=None):
+    """Ativa o cache em disco dos textos extraídos.
+
+    Args:
+        diretorio_cache: Diretório onde o banco do cache será guardado
+        limpar_ausentes: Se True, remove as entradas de PDFs que não existem mais
+        inventario: Dicionário {caminho: TriagemArquivo} da execução, usado
+                    no lugar de novas consultas ao disco
+
+    Returns:
+        Instância de CachePdfPersistente em uso
+    """
+    global cache_persistente
+    if cache_persistente is not None:
+        cache_persistente.fechar()
+    cache_persistente = CachePdfPersistente(
+        os.path.join(diretorio_cache, "pdf_textos.sqlite3"), inventario
+    )
+    if limpar_ausentes:
+        removidas = cache_persistente.limpar_ausentes()
+        if removidas:
+            print(f"Cache de PDFs: {removidas} entrada(s) de arquivos removidos.")
+    return cache_persistente
+
+
+def normalizar_chassi(chassi):
+    """Normaliza um chassi: maiúsculo, sem espaços, quebras de linha e hífens.
+
+    Args:
+        chassi: Chassi como veio do .txt ou do PDF
+
+    Returns:
+        Chassi normalizado, no mesmo formato dos tokens candidatos
+    """
+    return re.sub(r"[\s\-\u2010\u2011\u2013]", "", chassi.upper())
+
+
+def extrair_tokens_candidatos(texto):
+    """Reduz um texto aos tokens com formato de chassi.
+
+    Além dos blocos alfanuméricos com um dos tamanhos de chassi aceitos,
+    junta blocos vizinhos separados só por espaços, quebras de linha ou
+    hífens (chassi partido no PDF) quando o resultado tem um dos tamanhos
+    aceitos e contém algum dígito.
+
+    Args:
+        texto: Texto extraído do PDF (páginas separadas por SEPARADOR_PAGINA)
+
+    Returns:
+        Dicionário {token normalizado: página em que aparece primeiro}
+    """
+    tokens = {}
+    maior = max(TAMANHOS_CHASSI)
+    for numero, pagina in enumerate(texto.split(SEPARADOR_PAGINA), start=1):
+        pagina = pagina.upper()
+        blocos = list(_RE_BLOCO.finditer(pagina))
+        for indice, bloco in enumerate(blocos):
+            token = bloco.group()
+            if len(token) in TAMANHOS_CHASSI:
+                tokens.setdefault(token, numero)
+            fim = bloco.end()
+            for proximo in blocos[indice + 1:]:
+                if len(token) + len(proximo.group()) > maior:
+                    break
+                separador = (fim, proximo.start())
+                if not _RE_QUEBRA_CHASSI.fullmatch(pagina, *separador):
+                    break
+                token += proximo.group()
+                fim = proximo.end()
+                if len(token) in TAMANHOS_CHASSI and any(
+                    c.isdigit() for c in token
+                ):
+                    tokens.setdefault(token, numero)
+    return tokens
+
+
+def extrair_trechos_longos(texto):
+    """Reduz um texto aos blocos alfanuméricos maiores que o menor chassi.
+
+    Um chassi colado a outros caracteres (por exemplo, os 8 últimos de um
+    chassi de 17) não vira token candidato, mas continua dentro de um
+    desses blocos; é neles que a busca por substring é refeita.
+
+    Args:
+        texto: Texto extraído do PDF (páginas separadas por SEPARADOR_PAGINA)
+
+    Returns:
+        Blocos em maiúsculas, um por linha, com SEPARADOR_PAGINA entre as
+        páginas (a página de uma posição é contada como no texto original)
+    """
+    menor = min(TAMANHOS_CHASSI)
+    return SEPARADOR_PAGINA.join(
+        "\n".join(
+            bloco for bloco in _RE_BLOCO.findall(pagina.upper())
+            if len(bloco) > menor
+        )
+        for pagina in texto.split(SEPARADOR_PAGINA)
+    )
+
+
+def iterar_paginas_pdf(caminho_pdf):
+    """Gera o texto das páginas de um PDF, uma de cada vez.
+
+    As páginas só são lidas conforme são consumidas, então quem parar de
+    iterar não paga a extração do restante do documento. O arquivo é lido
+    de uma vez e aberto da memória: aberto pelo caminho, o PyMuPDF consulta
+    o arquivo três vezes no disco (existe, é arquivo, tamanho) antes de ler.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+
+    Yields:
+        PaginaPdf com o número da página, o total de páginas e o texto
+    """
+    with open(caminho_pdf, "rb") as f:
+        conteudo = f.read()
+    with fitz.open(stream=conteudo, filetype="pdf") as pdf:
+        for numero, pagina in enumerate(pdf, start=1):
+            yield PaginaPdf(numero, pdf.page_count, pagina.get_text())
 
 
 def extrair_texto_do_pdf(caminho_pdf):
     """Extrai texto de um arquivo PDF.
 
+    No modo compacto o cache em memória não guarda o texto, então o texto
+    é lido novamente do cache em disco ou do próprio PDF.
+
     Args:
         caminho_pdf: Caminho para o arquivo PDF
 
@@ -18,18 +219,379 @@ def extrair_texto_do_pdf(caminho_pdf):
         String contendo o texto extraído do PDF
     """
     # Se já tiver o texto no cache, retorna direto
-    if caminho_pdf in cache_pdf_textos:
-        return cache_pdf_textos[caminho_pdf]
+    entrada = cache_pdf_textos.obter(caminho_pdf)
+    if isinstance(entrada, str):
+        return entrada
+    return _extrair_texto(caminho_pdf)
+
+
+def procurar_chassis_no_pdf(caminho_pdf, chassis):
+    """Procura os chassis no conteúdo de um PDF.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+        chassis: Conjunto de chassis procurados
+
+    Returns:
+        Dicionário {chassi: página} com os chassis encontrados no PDF
+    """
+    conteudo = _conteudo_em_cache(caminho_pdf)
+    if conteudo is None:
+        conteudo = _extrair_texto(caminho_pdf)
+    return _localizar_chassis(conteudo, chassis)
+
 
-    texto_completo = ""
+def analisar_pdf(caminho_pdf, chassis, com_tokens=False):
+    """Procura os chassis em um PDF e devolve só o resumo da análise.
+
+    Se o PDF ainda não estiver em cache, as páginas são lidas uma a uma e a
+    leitura para assim que todos os chassis procurados forem encontrados.
+    Nesse caso o veredito de texto codificado considera só as páginas lidas
+    e o texto parcial não é guardado em cache. Erros ao abrir ou ler o PDF
+    são propagados para quem chamou.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+        chassis: Conjunto de chassis procurados
+        com_tokens: Se True, a análise também traz os tokens candidatos e
+                    os trechos longos do PDF (pedidos pelo índice
+                    persistente); senão, eles não saem do processo
+
+    Returns:
+        AnalisePdf com os chassis encontrados (e suas páginas) e o
+        VereditoPdf do PDF
+    """
+    conteudo = _conteudo_em_cache(caminho_pdf)
+    if conteudo is None:
+        analise = _analisar_paginas(caminho_pdf, chassis)
+        if com_tokens:
+            return analise
+        return analise._replace(tokens=None, trechos=None)
+
+    encontrados = _localizar_chassis(conteudo, chassis)
+    if not com_tokens:
+        return AnalisePdf(
+            caminho_pdf, encontrados, obter_veredito(caminho_pdf)
+        )
+    if isinstance(conteudo, PdfCompacto):
+        tokens, trechos = conteudo.tokens, conteudo.trechos
+    else:
+        tokens = extrair_tokens_candidatos(conteudo)
+        trechos = extrair_trechos_longos(conteudo)
+    return AnalisePdf(
+        caminho_pdf, encontrados, obter_veredito(caminho_pdf), tokens, trechos
+    )
+
+
+def preparar_pdf(caminho_pdf):
+    """Extrai e classifica o PDF inteiro, se ele ainda não estiver em disco.
+
+    Usado na extração antecipada, antes de o .txt chegar: depois dela, a
+    busca dos chassis é só uma consulta ao cache. Só o cache em disco é
+    consultado, porque é ele que as próximas análises vão encontrar. Erros
+    ao abrir ou ler o PDF são propagados para quem chamou.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+
+    Returns:
+        AnalisePdf sem chassis, com o VereditoPdf do PDF
+    """
+    entrada = None
+    if cache_persistente is not None:
+        entrada = cache_persistente.obter(caminho_pdf)
+    if entrada is not None:
+        veredito = VereditoPdf(*entrada[1:])
+    else:
+        _ler_pdf_inteiro(caminho_pdf)
+        veredito = vereditos_pdf[caminho_pdf]
+    return AnalisePdf(caminho_pdf, {}, veredito)
+
+
+def registrar_veredito(caminho_pdf, codificado, paginas=0,
+                       percentual_reconhecido=None,
+                       caractere_substituicao=False):
+    """Registra o veredito de um PDF analisado fora deste processo.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+        codificado: True se o texto do PDF parece codificado
+        paginas: Quantidade de páginas do PDF
+        percentual_reconhecido: Percentual de palavras reconhecidas no texto
+        caractere_substituicao: True se o texto tem o caractere U+FFFD
+    """
+    vereditos_pdf[caminho_pdf] = VereditoPdf(
+        codificado, paginas, percentual_reconhecido, caractere_substituicao
+    )
+
+
+def obter_veredito(caminho_pdf):
+    """Devolve o veredito de texto codificado de um PDF.
+
+    O veredito é calculado uma única vez, quando o texto é extraído, e fica
+    guardado para os demais .txt da execução e no cache em disco para as
+    próximas execuções.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+
+    Returns:
+        VereditoPdf do PDF
+    """
+    veredito = vereditos_pdf.get(caminho_pdf)
+    if veredito is None:
+        _extrair_texto(caminho_pdf)
+        veredito = vereditos_pdf.get(caminho_pdf)
+    if veredito is None:
+        # Não foi possível ler o PDF: tratado como texto ilegível
+        veredito = VereditoPdf(True)
+    return veredito
+
+
+def esquecer_pdfs(caminhos):
+    """Descarta o que está em memória sobre PDFs alterados ou removidos.
+
+    O cache em memória e os vereditos são identificados só pelo caminho;
+    num processo que fica rodando, um PDF novo com o nome de um antigo não
+    pode aproveitar o resultado do antigo. O cache em disco se valida
+    sozinho (tamanho, data e hash) e não é tocado.
+
+    Args:
+        caminhos: Caminhos dos PDFs
+    """
+    for caminho in caminhos:
+        cache_pdf_textos.remover(caminho)
+        vereditos_pdf.pop(caminho, None)
+
+
+def pdf_codificado(caminho_pdf):
+    """Indica se o texto de um PDF parece codificado ou ilegível.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+
+    Returns:
+        True se o texto extraído parece codificado, False caso contrário
+    """
+    return obter_veredito(caminho_pdf).codificado
+
+
+def _conteudo_em_cache(caminho_pdf):
+    """Busca o texto (ou a forma compacta) na memória e depois no disco.
+
+    Returns:
+        Texto, PdfCompacto ou None se o PDF ainda não foi extraído
+    """
+    entrada = cache_pdf_textos.obter(caminho_pdf)
+    if entrada is not None:
+        return entrada
+    if cache_persistente is not None:
+        entrada = cache_persistente.obter(caminho_pdf)
+        if entrada is not None:
+            return _guardar_em_memoria(
+                caminho_pdf, entrada.texto, VereditoPdf(*entrada[1:])
+            )
+    return None
+
+
+def _localizar_chassis(conteudo, chassis):
+    """Localiza os chassis em um texto completo ou na forma compacta.
+
+    Returns:
+        Dicionário {chassi: página} com os chassis encontrados
+    """
+    if isinstance(conteudo, PdfCompacto):
+        return localizar_tokens(conteudo.tokens, conteudo.trechos, chassis)
+
+    posicoes = _automato_para(chassis).procurar(conteudo)
+    return {
+        chassi: conteudo.count(SEPARADOR_PAGINA, 0, posicao) + 1
+        for chassi, posicao in posicoes.items()
+    }
+
+
+def localizar_tokens(tokens, trechos, chassis):
+    """Cruza os chassis procurados com os tokens candidatos de um PDF.
+
+    Os chassis que não são token são procurados como substring nos trechos
+    longos do PDF (chassi colado a outros caracteres).
+
+    Args:
+        tokens: Dicionário {token: página} do PDF
+        trechos: Trechos longos do PDF (extrair_trechos_longos), ou None
+        chassis: Conjunto de chassis procurados
+
+    Returns:
+        Dicionário {chassi: página} com os chassis encontrados
+    """
+    encontrados = {}
+    faltando = {}
+    for chassi in chassis:
+        normalizado = normalizar_chassi(chassi)
+        pagina = tokens.get(normalizado)
+        if pagina is not None:
+            encontrados[chassi] = pagina
+        elif normalizado:
+            faltando.setdefault(normalizado, []).append(chassi)
+    if faltando and trechos:
+        posicoes = _automato_para(faltando).procurar(trechos)
+        for normalizado, posicao in posicoes.items():
+            pagina = trechos.count(SEPARADOR_PAGINA, 0, posicao) + 1
+            for chassi in faltando[normalizado]:
+                encontrados[chassi] = pagina
+    return encontrados
+
+
+def _automato_para(chassis):
+    """Devolve o autômato do conjunto de chassis, montado uma vez só."""
+    return _montar_automato(frozenset(chassis))
+
+
+@functools.lru_cache(maxsize=4)
+def _montar_automato(chassis):
+    return AutomatoChassis(chassis)
+
+
+def _analisar_paginas(caminho_pdf, chassis):
+    """Analisa um PDF página a página, parando quando não faltar chassi.
+
+    Returns:
+        AnalisePdf do PDF
+    """
+    automato = None if cache_compacto else _automato_para(chassis)
+    pendentes = set(chassis)
+    encontrados = {}
+    tokens = {}
+    trechos = []
+    textos = []
+    total = 0
+    completo = True
     try:
-        # Abre o PDF
-        with fitz.open(caminho_pdf) as pdf:
-            # Percorre todas as páginas
-            for pagina in pdf:
-                texto_completo += pagina.get_text() + "\n"
-        # Armazena no cache
-        cache_pdf_textos[caminho_pdf] = texto_completo
+        paginas = iterar_paginas_pdf(caminho_pdf)
+        try:
+            for pagina in paginas:
+                total = pagina.total
+                textos.append(pagina.texto + SEPARADOR_PAGINA)
+                if cache_compacto:
+                    tokens_pagina = extrair_tokens_candidatos(pagina.texto)
+                    for token in tokens_pagina:
+                        tokens.setdefault(token, pagina.numero)
+                    trechos_pagina = extrair_trechos_longos(pagina.texto)
+                    trechos.append(trechos_pagina + SEPARADOR_PAGINA)
+                    achados = localizar_tokens(
+                        tokens_pagina, trechos_pagina, pendentes
+                    )
+                else:
+                    achados = automato.procurar(pagina.texto, pendentes)
+                for chassi in achados:
+                    encontrados[chassi] = pagina.numero
+                    pendentes.discard(chassi)
+                if not pendentes and pagina.numero < pagina.total:
+                    completo = False
+                    break
+        finally:
+            paginas.close()
     except Exception as e:
+        # A falha sobe para o motor de extração, que isola o PDF
         print(f"[Erro PDF] {os.path.basename(caminho_pdf)} - {e}")
+        raise
+
+    texto = "".join(textos)
+    veredito = _classificar_texto(texto, total)
+    if completo:
+        if cache_compacto:
+            trechos = "".join(trechos)
+        else:
+            tokens = extrair_tokens_candidatos(texto)
+            trechos = extrair_trechos_longos(texto)
+        _guardar_em_memoria(caminho_pdf, texto, veredito, tokens, trechos)
+        if cache_persistente is not None:
+            cache_persistente.gravar(caminho_pdf, texto, *veredito)
+    else:
+        registrar_veredito(caminho_pdf, *veredito)
+        tokens = trechos = None
+    return AnalisePdf(caminho_pdf, encontrados, veredito, tokens, trechos)
+
+
+def _extrair_texto(caminho_pdf):
+    """Extrai o texto do PDF e o guarda nos caches.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+
+    Returns:
+        String contendo o texto extraído do PDF
+    """
+    # Tenta o cache em disco de execuções anteriores
+    if cache_persistente is not None:
+        entrada = cache_persistente.obter(caminho_pdf)
+        if entrada is not None:
+            _guardar_em_memoria(
+                caminho_pdf, entrada.texto, VereditoPdf(*entrada[1:])
+            )
+            return entrada.texto
+
+    try:
+        return _ler_pdf_inteiro(caminho_pdf)
+    except Exception as e:
+        print(f"[Erro PDF] {os.path.basename(caminho_pdf)} - {e}")
+    return ""
+
+
+def _ler_pdf_inteiro(caminho_pdf):
+    """Lê todas as páginas, classifica o texto e o guarda nos caches.
+
+    Erros ao abrir ou ler o PDF são propagados.
+
+    Returns:
+        String contendo o texto extraído do PDF
+    """
+    # Junta as páginas de uma vez, em vez de concatenar uma a uma
+    paginas = 0
+    textos = []
+    for pagina in iterar_paginas_pdf(caminho_pdf):
+        textos.append(pagina.texto + SEPARADOR_PAGINA)
+        paginas = pagina.total
+    texto_completo = "".join(textos)
+    veredito = _classificar_texto(texto_completo, paginas)
+    # Armazena nos caches
+    _guardar_em_memoria(caminho_pdf, texto_completo, veredito)
+    if cache_persistente is not None:
+        cache_persistente.gravar(caminho_pdf, texto_completo, *veredito)
     return texto_completo
+
+
+def _classificar_texto(texto, paginas):
+    """Classifica o texto extraído de um PDF (uma vez por extração).
+
+    Returns:
+        VereditoPdf do texto
+    """
+    analise = analisar_texto(texto)
+    return VereditoPdf(
+        analise.codificado, paginas, analise.percentual_reconhecido,
+        analise.caractere_substituicao,
+    )
+
+
+def _guardar_em_memoria(caminho_pdf, texto, veredito, tokens=None,
+                        trechos=None):
+    """Guarda o texto ou a sua forma compacta no cache em memória.
+
+    Args:
+        tokens: Tokens candidatos já extraídos do texto, se houver
+        trechos: Trechos longos já extraídos do texto, se houver
+
+    Returns:
+        O que foi guardado: PdfCompacto ou o próprio texto
+    """
+    registrar_veredito(caminho_pdf, *veredito)
+    conteudo = texto
+    if cache_compacto:
+        if tokens is None:
+            tokens = extrair_tokens_candidatos(texto)
+        if trechos is None:
+            trechos = extrair_trechos_longos(texto)
+        conteudo = PdfCompacto(tokens, trechos, veredito.codificado)
+    cache_pdf_textos.gravar(caminho_pdf, conteudo)
+    return conteudo
@@ -0,0 +1,77 @@
+"""Módulo com um filtro de Bloom para descartar chassis ausentes do índice."""
+
+import hashlib
+import math
+
+# Taxa de falsos positivos usada para dimensionar o filtro
+TAXA_FALSOS_POSITIVOS = 0.01
+
+
+class FiltroBloom:
+    """Conjunto probabilístico: "não está" é certo, "está" pode ser engano.
+
+    Usa um vetor de bits dimensionado pela capacidade e pela taxa de falsos
+    positivos, com k posições por chave derivadas de um único hash BLAKE2b
+    (h1 + i * h2). Chaves não podem ser removidas: quem remove itens do
+    conjunto original reconstrói o filtro.
+    """
+
+    def __init__(self, capacidade, taxa_falsos_positivos=TAXA_FALSOS_POSITIVOS,
+                 bits=None, hashes=None, quantidade=0):
+        """Cria um filtro vazio (ou a partir de bits já gravados).
+
+        Args:
+            capacidade: Quantidade de chaves prevista
+            taxa_falsos_positivos: Taxa desejada de falsos positivos
+            bits: Conteúdo gravado por para_bytes, para reabrir o filtro
+            hashes: Quantidade de posições por chave do filtro gravado
+            quantidade: Quantidade de chaves do filtro gravado
+        """
+        self.capacidade = max(1, capacidade)
+        if bits is None:
+            tamanho = math.ceil(
+                -self.capacidade * math.log(taxa_falsos_positivos)
+                / math.log(2) ** 2
+            )
+            bits = bytearray((tamanho + 7) // 8)
+            hashes = max(1, round(len(bits) * 8 / self.capacidade * math.log(2)))
+        self._bits = bytearray(bits)
+        self._tamanho = len(self._bits) * 8
+        self.hashes = hashes
+        self.quantidade = quantidade
+
+    def adicionar(self, chave):
+        """Acrescenta uma chave ao filtro.
+
+        Args:
+            chave: Texto da chave
+        """
+        for posicao in self._posicoes(chave):
+            self._bits[posicao >> 3] |= 1 << (posicao & 7)
+        self.quantidade += 1
+
+    def __contains__(self, chave):
+        return all(
+            self._bits[posicao >> 3] & (1 << (posicao & 7))
+            for posicao in self._posicoes(chave)
+        )
+
+    @property
+    def cheio(self):
+        """True se já recebeu mais chaves do que a capacidade prevista."""
+        return self.quantidade > self.capacidade
+
+    def para_bytes(self):
+        """Conteúdo do vetor de bits, para gravar em disco.
+
+        Returns:
+            bytes do vetor
+        """
+        return bytes(self._bits)
+
+    def _posicoes(self, chave):
+        """As k posições da chave no vetor de bits."""
+        resumo = hashlib.blake2b(chave.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(resumo[:8], "little")
+        h2 = int.from_bytes(resumo[8:], "little") | 1
+        return [(h1 + i * h2) % self._tamanho for i in range(self.hashes)]
@@ -0,0 +1,100 @@
+"""Módulo para indexar os chassis encontrados nos arquivos PDF."""
+
+from models._extracao_supervisionada import FalhaExtracao
+from models._extrair_texto_do_pdf import registrar_veredito, vereditos_pdf
+from models._processar_pdf_em_lote import processar_pdf_em_lote
+
+
+def indexar_chassis_pdf(arquivos_pdf, chassis, falhas=None, duplicados=None,
+                        indice_persistente=None):
+    """Monta um índice invertido de chassi para os PDFs que o contêm.
+
+    Cada PDF é lido uma única vez, procurando de uma vez todos os chassis
+    esperados na execução, em vez de uma varredura por arquivo .txt. PDFs
+    com conteúdo idêntico são lidos uma vez só e o resultado é repassado
+    para todas as cópias. Com o índice persistente, os PDFs já indexados em
+    execuções anteriores são resolvidos só por consulta ao índice e os
+    demais entram nele depois de lidos.
+
+    Args:
+        arquivos_pdf: Lista de caminhos para arquivos PDF
+        chassis: Conjunto com todos os chassis esperados na execução
+        falhas: Lista onde são registrados os PDFs que não puderam ser
+                analisados (FalhaExtracao)
+        duplicados: Dicionário {representante: [cópias]} gerado por
+                    agrupar_pdfs_duplicados
+        indice_persistente: IndiceChassisPersistente da execução, se houver
+
+    Returns:
+        Dicionário {chassi: {caminho do PDF: página em que foi encontrado}}
+    """
+    indice = {}
+    if not arquivos_pdf or not chassis:
+        return indice
+    if falhas is None:
+        falhas = []
+    duplicados = duplicados or {}
+
+    copias = {copia for grupo in duplicados.values() for copia in grupo}
+    a_ler = [pdf for pdf in arquivos_pdf if pdf not in copias]
+    indexados = set()
+    if indice_persistente is not None:
+        indexados = indice_persistente.indexados(a_ler)
+        a_ler = [pdf for pdf in a_ler if pdf not in indexados]
+
+    falhas_lote = []
+    # Tokens e trechos só voltam dos workers quando vão para o índice
+    analises = [] if indice_persistente is not None else None
+    resultados = processar_pdf_em_lote(
+        a_ler,
+        [{"CHASSI": chassi} for chassi in chassis],
+        falhas_lote,
+        analises,
+    )
+    if indice_persistente is not None:
+        indice_persistente.indexar(analises + [
+            analise._replace(caminho=copia)
+            for analise in analises
+            for copia in duplicados.get(analise.caminho, [])
+        ])
+        for analise in indice_persistente.resolver(indexados, chassis):
+            registrar_veredito(analise.caminho, *analise.veredito)
+            resultados.append((analise.caminho, analise.chassis))
+
+    for caminho_pdf, chassis_encontrados in resultados:
+        veredito = vereditos_pdf.get(caminho_pdf)
+        for caminho in [caminho_pdf, *duplicados.get(caminho_pdf, [])]:
+            if caminho != caminho_pdf and veredito is not None:
+                registrar_veredito(caminho, *veredito)
+            for chassi, pagina in chassis_encontrados.items():
+                indice.setdefault(chassi, {})[caminho] = pagina
+
+    for caminho_pdf, motivo in falhas_lote:
+        falhas.append(FalhaExtracao(caminho_pdf, motivo))
+        falhas.extend(
+            FalhaExtracao(copia, motivo)
+            for copia in duplicados.get(caminho_pdf, [])
+        )
+
+    return indice
+
+
+def resolver_chassis(indice, arquivos_pdf, chassis_data):
+    """Resolve os chassis de um .txt consultando o índice invertido.
+
+    Args:
+        indice: Índice gerado por indexar_chassis_pdf
+        arquivos_pdf: Lista de caminhos dos PDFs ainda disponíveis
+        chassis_data: Lista de dicionários contendo informações de chassis
+
+    Returns:
+        Lista de tuplas (caminho_pdf, {chassi: página}), uma por PDF
+        disponível, no mesmo formato de processar_pdf_em_lote
+    """
+    encontrados = {caminho_pdf: {} for caminho_pdf in arquivos_pdf}
+    for chassi in {d["CHASSI"] for d in chassis_data}:
+        for caminho_pdf, pagina in indice.get(chassi, {}).items():
+            if caminho_pdf in encontrados:
+                encontrados[caminho_pdf][chassi] = pagina
+
+    return list(encontrados.items())
@@ -0,0 +1,383 @@
+"""Módulo com o índice em disco dos chassis dos PDFs que esperam um .txt."""
+
+import os
+import sqlite3
+import time
+
+from models._extrair_texto_do_pdf import (
+    AnalisePdf,
+    VereditoPdf,
+    localizar_tokens,
+    normalizar_chassi,
+)
+from models._filtro_bloom import FiltroBloom
+
+# Banco do índice, dentro da pasta _Cache
+NOME_INDICE = "indice_chassis.sqlite3"
+
+# Versão do formato do índice; bancos de outra versão são recriados
+VERSAO_INDICE = 3
+
+# Dias que um PDF de NF pode ficar sem remessa antes de ser relatado e sair
+# do índice (0 desativa)
+DIAS_PDF_ORFAO_PADRAO = 30
+
+# Capacidade mínima do filtro de Bloom, em tokens
+_CAPACIDADE_MINIMA_FILTRO = 1024
+
+# Configuração em uso (definida por configurar_pdfs_orfaos)
+dias_pdf_orfao = DIAS_PDF_ORFAO_PADRAO
+mover_pdfs_orfaos = False
+
+
+def configurar_pdfs_orfaos(dias=DIAS_PDF_ORFAO_PADRAO, mover_para_lixo=False):
+    """Define o tratamento dos PDFs de NF que nenhum .txt usa.
+
+    Args:
+        dias: Dias sem nenhum .txt que use o PDF até ele ser relatado e
+              sair do índice (0 desativa)
+        mover_para_lixo: Se True, o PDF relatado também vai para o Lixo;
+                         senão, continua no diretório
+    """
+    global dias_pdf_orfao, mover_pdfs_orfaos
+    dias_pdf_orfao = dias
+    mover_pdfs_orfaos = mover_para_lixo
+
+
+class IndiceChassisPersistente:
+    """Índice chassi → PDF, mantido entre execuções.
+
+    Guarda, para cada PDF de NF lido por inteiro e ainda no diretório, os
+    tokens candidatos a chassi (com a página), os trechos longos, o
+    veredito de texto codificado e quando ele foi visto pela primeira vez.
+    Um .txt novo é resolvido por consulta ao índice, sem abrir os PDFs já
+    indexados nem o cache de textos. Um filtro de Bloom, gravado junto,
+    descarta sem consulta à tabela de tokens os chassis que não são token
+    de nenhum PDF (o caso comum); esses ainda são procurados como
+    substring nos trechos longos, que são poucos e curtos.
+
+    Ao abrir, saem do índice os PDFs que não estão mais no diretório (já
+    organizados) ou que mudaram de tamanho ou data. PDFs descartados por
+    envelhecimento perdem os tokens mas continuam registrados, com a data
+    em que foram vistos, para não serem indexados nem relatados de novo. O
+    filtro é gravado na mesma transação dos tokens: uma execução que cai
+    no meio nunca deixa um PDF indexado com chassis que o filtro
+    desconhece.
+    """
+
+    def __init__(self, diretorio_cache, inventario):
+        """Abre (ou cria) o índice e descarta as entradas desatualizadas.
+
+        Args:
+            diretorio_cache: Pasta _Cache da execução
+            inventario: Dicionário {caminho: TriagemArquivo} da execução
+        """
+        os.makedirs(diretorio_cache, exist_ok=True)
+        self.caminho_banco = os.path.join(diretorio_cache, NOME_INDICE)
+        self.inventario = inventario
+        self._conexao = sqlite3.connect(self.caminho_banco, timeout=30)
+        versao = self._conexao.execute("PRAGMA user_version").fetchone()[0]
+        if versao != VERSAO_INDICE:
+            self._conexao.executescript(
+                """
+                DROP TABLE IF EXISTS pdfs;
+                DROP TABLE IF EXISTS tokens;
+                DROP TABLE IF EXISTS trechos;
+                DROP TABLE IF EXISTS filtro;
+                """
+            )
+            self._conexao.execute(f"PRAGMA user_version = {VERSAO_INDICE}")
+        self._conexao.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pdfs (
+                caminho TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                codificado INTEGER NOT NULL,
+                paginas INTEGER NOT NULL,
+                percentual_reconhecido REAL,
+                caractere_substituicao INTEGER NOT NULL,
+                visto_em REAL NOT NULL,
+                descartado_em REAL
+            );
+            CREATE TABLE IF NOT EXISTS tokens (
+                token TEXT NOT NULL,
+                caminho TEXT NOT NULL,
+                pagina INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tokens_token ON tokens (token);
+            CREATE INDEX IF NOT EXISTS tokens_caminho ON tokens (caminho);
+            CREATE TABLE IF NOT EXISTS trechos (
+                caminho TEXT PRIMARY KEY,
+                texto TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS filtro (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                capacidade INTEGER NOT NULL,
+                hashes INTEGER NOT NULL,
+                quantidade INTEGER NOT NULL,
+                bits BLOB NOT NULL
+            );
+            """
+        )
+        self._conexao.commit()
+
+        removidos = self._remover_desatualizados()
+        linha = self._conexao.execute(
+            "SELECT capacidade, hashes, quantidade, bits FROM filtro"
+        ).fetchone()
+        if removidos or linha is None:
+            with self._conexao:
+                self._reconstruir_filtro()
+        else:
+            capacidade, hashes, quantidade, bits = linha
+            self._filtro = FiltroBloom(
+                capacidade, bits=bits, hashes=hashes, quantidade=quantidade
+            )
+
+    def indexados(self, caminhos):
+        """Separa os PDFs que já estão no índice.
+
+        Args:
+            caminhos: Caminhos dos PDFs
+
+        Returns:
+            Conjunto dos caminhos indexados
+        """
+        caminhos = set(caminhos)
+        return {
+            caminho for (caminho,) in self._conexao.execute(
+                "SELECT caminho FROM pdfs WHERE descartado_em IS NULL"
+            )
+            if caminho in caminhos
+        }
+
+    def indexar(self, analises):
+        """Acrescenta ao índice os PDFs que foram lidos por inteiro.
+
+        A data em que o PDF foi visto pela primeira vez é mantida quando ele
+        é indexado de novo.
+
+        Args:
+            analises: Lista de AnalisePdf (as sem tokens e as de PDFs
+                      descartados por envelhecimento são ignoradas)
+        """
+        agora = time.time()
+        descartados = {
+            caminho for (caminho,) in self._conexao.execute(
+                "SELECT caminho FROM pdfs WHERE descartado_em IS NOT NULL"
+            )
+        }
+        with self._conexao:
+            for analise in analises:
+                arquivo = self.inventario.get(analise.caminho)
+                if (analise.tokens is None or analise.trechos is None
+                        or arquivo is None or analise.caminho in descartados):
+                    continue
+                # Tokens que já estão no índice (inclusive os deste PDF, se
+                # ele for indexado de novo) já foram contados no filtro
+                novos = [
+                    token for token in analise.tokens
+                    if self._conexao.execute(
+                        "SELECT 1 FROM tokens WHERE token = ? LIMIT 1",
+                        (token,),
+                    ).fetchone() is None
+                ]
+                self._conexao.execute(
+                    "DELETE FROM tokens WHERE caminho = ?", (analise.caminho,)
+                )
+                self._conexao.execute(
+                    "INSERT OR REPLACE INTO trechos VALUES (?, ?)",
+                    (analise.caminho, analise.trechos),
+                )
+                self._conexao.execute(
+                    "INSERT INTO pdfs VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL) "
+                    "ON CONFLICT (caminho) DO UPDATE SET "
+                    "tamanho = excluded.tamanho, mtime_ns = excluded.mtime_ns, "
+                    "codificado = excluded.codificado, "
+                    "paginas = excluded.paginas, "
+                    "percentual_reconhecido = excluded.percentual_reconhecido, "
+                    "caractere_substituicao = excluded.caractere_substituicao",
+                    (
+                        analise.caminho, arquivo.tamanho, arquivo.mtime_ns,
+                        *analise.veredito, agora,
+                    ),
+                )
+                self._conexao.executemany(
+                    "INSERT INTO tokens VALUES (?, ?, ?)",
+                    [
+                        (token, analise.caminho, pagina)
+                        for token, pagina in analise.tokens.items()
+                    ],
+                )
+                for token in novos:
+                    self._filtro.adicionar(token)
+            if self._filtro.cheio:
+                self._reconstruir_filtro()
+            else:
+                self._gravar_filtro()
+
+    def resolver(self, caminhos, chassis):
+        """Procura os chassis nos PDFs indexados, só com consultas ao índice.
+
+        Args:
+            caminhos: Caminhos dos PDFs indexados a considerar
+            chassis: Conjunto de chassis procurados
+
+        Returns:
+            Lista de AnalisePdf (sem tokens), uma por PDF
+        """
+        encontrados = {caminho: {} for caminho in caminhos}
+        if not encontrados:
+            return []
+        for chassi in chassis:
+            token = normalizar_chassi(chassi)
+            if token not in self._filtro:
+                continue
+            for caminho, pagina in self._conexao.execute(
+                "SELECT caminho, pagina FROM tokens WHERE token = ?", (token,)
+            ):
+                if caminho in encontrados:
+                    encontrados[caminho][chassi] = pagina
+
+        # Chassi colado a outros caracteres: não é token, mas está nos trechos
+        for caminho, trechos in self._conexao.execute(
+            "SELECT caminho, texto FROM trechos"
+        ):
+            if caminho in encontrados and trechos:
+                for chassi, pagina in localizar_tokens(
+                    {}, trechos, chassis
+                ).items():
+                    encontrados[caminho].setdefault(chassi, pagina)
+
+        vereditos = {
+            caminho: VereditoPdf(bool(codificado), paginas, percentual,
+                                 bool(substituicao))
+            for caminho, codificado, paginas, percentual, substituicao
+            in self._conexao.execute(
+                "SELECT caminho, codificado, paginas, percentual_reconhecido, "
+                "caractere_substituicao FROM pdfs WHERE descartado_em IS NULL"
+            )
+            if caminho in encontrados
+        }
+        return [
+            AnalisePdf(caminho, chassis_pdf, vereditos[caminho])
+            for caminho, chassis_pdf in encontrados.items()
+        ]
+
+    def orfaos(self, caminhos, dias):
+        """PDFs indexados há mais de `dias` dias sem que nenhum .txt os use.
+
+        Args:
+            caminhos: Caminhos dos PDFs que continuam sem remessa
+            dias: Idade mínima, em dias
+
+        Returns:
+            Lista de tuplas (caminho, dias desde que foi visto), do mais
+            antigo para o mais novo
+        """
+        caminhos = set(caminhos)
+        agora = time.time()
+        limite = agora - dias * 86400
+        return [
+            (caminho, int((agora - visto_em) // 86400))
+            for caminho, visto_em in self._conexao.execute(
+                "SELECT caminho, visto_em FROM pdfs WHERE visto_em <= ? "
+                "AND descartado_em IS NULL ORDER BY visto_em",
+                (limite,),
+            )
+            if caminho in caminhos
+        ]
+
+    def descartar(self, caminhos):
+        """Tira do índice os tokens de PDFs envelhecidos.
+
+        O PDF continua registrado (com a data em que foi visto) enquanto
+        estiver no diretório: não volta ao índice nem é relatado de novo.
+        Se o .txt dele chegar depois, o PDF é lido pela extração normal.
+
+        Args:
+            caminhos: Caminhos dos PDFs
+        """
+        caminhos = [(caminho,) for caminho in caminhos]
+        if not caminhos:
+            return
+        with self._conexao:
+            self._conexao.executemany(
+                "DELETE FROM tokens WHERE caminho = ?", caminhos
+            )
+            self._conexao.executemany(
+                "DELETE FROM trechos WHERE caminho = ?", caminhos
+            )
+            self._conexao.executemany(
+                "UPDATE pdfs SET descartado_em = ? WHERE caminho = ?",
+                [(time.time(), caminho) for (caminho,) in caminhos],
+            )
+            self._reconstruir_filtro()
+
+    def fechar(self):
+        """Fecha o banco."""
+        self._conexao.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def _remover_desatualizados(self):
+        """Tira do índice os PDFs que saíram do diretório ou mudaram.
+
+        Returns:
+            Quantidade de PDFs removidos
+        """
+        desatualizados = [
+            (caminho,)
+            for caminho, tamanho, mtime_ns in self._conexao.execute(
+                "SELECT caminho, tamanho, mtime_ns FROM pdfs"
+            ).fetchall()
+            if caminho not in self.inventario
+            or (self.inventario[caminho].tamanho,
+                self.inventario[caminho].mtime_ns) != (tamanho, mtime_ns)
+        ]
+        if desatualizados:
+            with self._conexao:
+                self._conexao.executemany(
+                    "DELETE FROM tokens WHERE caminho = ?", desatualizados
+                )
+                self._conexao.executemany(
+                    "DELETE FROM trechos WHERE caminho = ?", desatualizados
+                )
+                self._conexao.executemany(
+                    "DELETE FROM pdfs WHERE caminho = ?", desatualizados
+                )
+        return len(desatualizados)
+
+    def _reconstruir_filtro(self):
+        """Monta o filtro de novo a partir dos tokens do índice.
+
+        Deve ser chamado dentro de uma transação, que também grava o filtro.
+        """
+        tokens = [
+            token for (token,) in self._conexao.execute(
+                "SELECT DISTINCT token FROM tokens"
+            )
+        ]
+        self._filtro = FiltroBloom(
+            max(_CAPACIDADE_MINIMA_FILTRO, 2 * len(tokens))
+        )
+        for token in tokens:
+            self._filtro.adicionar(token)
+        self._gravar_filtro()
+
+    def _gravar_filtro(self):
+        """Grava o filtro de Bloom, na transação de quem chamou."""
+        self._conexao.execute(
+            "INSERT OR REPLACE INTO filtro "
+            "(id, capacidade, hashes, quantidade, bits) "
+            "VALUES (1, ?, ?, ?, ?)",
+            (
+                self._filtro.capacidade, self._filtro.hashes,
+                self._filtro.quantidade, self._filtro.para_bytes(),
+            ),
+        )
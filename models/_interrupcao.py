@@ -0,0 +1,49 @@
+"""Módulo com o tratamento de SIGINT/SIGTERM do organizador."""
+
+import signal
+import threading
+
+# Sinais que pedem o encerramento da execução
+SINAIS_ENCERRAMENTO = tuple(
+    getattr(signal, nome) for nome in ("SIGINT", "SIGTERM")
+    if hasattr(signal, nome)
+)
+
+_pedido = threading.Event()
+
+
+def instalar_tratamento_sinais():
+    """Troca o encerramento imediato por um pedido de interrupção.
+
+    No primeiro SIGINT/SIGTERM a execução não é abortada: o organizador
+    termina a operação em andamento, grava o progresso e sai. Um segundo
+    sinal encerra na hora (KeyboardInterrupt). Só tem efeito se chamado
+    na thread principal.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for sinal in SINAIS_ENCERRAMENTO:
+        signal.signal(sinal, _tratar_sinal)
+
+
+def interrupcao_solicitada():
+    """Indica se a execução recebeu um pedido de interrupção.
+
+    Returns:
+        True depois do primeiro SIGINT/SIGTERM
+    """
+    return _pedido.is_set()
+
+
+def _tratar_sinal(sinal, _):
+    """Registra o pedido de interrupção; no segundo sinal, aborta."""
+    if _pedido.is_set():
+        for sinal_tratado in SINAIS_ENCERRAMENTO:
+            signal.signal(sinal_tratado, signal.SIG_DFL)
+        raise KeyboardInterrupt
+    _pedido.set()
+    print(
+        f"\n⚠️Interrupção solicitada ({signal.Signals(sinal).name}): "
+        f"terminando a operação atual antes de sair. "
+        f"Envie o sinal de novo para abortar na hora."
+    )
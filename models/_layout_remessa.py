@@ -0,0 +1,139 @@
+"""Módulo com o layout de posição fixa das remessas .txt."""
+
+import operator
+
+# Campos que precisam estar preenchidos em todas as linhas
+CAMPOS_OBRIGATORIOS = (
+    "CHASSI", "REMARCACAO", "ANO_FABRICACAO", "ANO_MODELO",
+    "NUMERO_OPERACAO", "DATA_OPERACAO", "TIPO_GRAVAME",
+    "QUANTIDADE_MESES", "TAXA_JUROS_MES", "TAXA_JUROS_ANO",
+    "VALOR_TAXA_CONTRATO", "VALOR_IOF", "INDICATIVO_MULTA",
+    "INDICATIVO_MORA", "VALOR_PRINCIPAL_OPERACAO", "VALOR_PARCELA",
+    "VENCIMENTO_PRIMEIRA_PARCELA", "VENCIMENTO_ULTIMA_PARCELA",
+    "CIDADE_LIBERACAO_OPERACAO", "UF_LIBERACAO_OPERACAO",
+    "DATA_LIBERACAO_OPERACAO", "INDICES_UTILIZADOS", "MULTA",
+    "JUROS_MORA", "CPF_CNPJ_RECEBEDOR",
+)
+
+class RegistroRemessa(tuple):
+    """Linha de detalhe de uma remessa, com os valores na ordem do layout.
+
+    Cada layout gera uma subclasse (sem __dict__, com __slots__ vazio) que
+    expõe os campos como atributos. O acesso registro["CHASSI"] continua
+    funcionando como no dicionário usado antes; índices inteiros acessam a
+    tupla normalmente.
+    """
+
+    __slots__ = ()
+    campos = ()
+
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            try:
+                return getattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        return tuple.__getitem__(self, chave)
+
+    def get(self, campo, padrao=None):
+        """Devolve o valor do campo ou o padrão, como dict.get."""
+        return getattr(self, campo, padrao)
+
+    def como_dict(self):
+        """Converte o registro em dicionário, na ordem do layout (para o JSON).
+
+        Returns:
+            Dicionário {campo: valor}
+        """
+        return dict(zip(self.campos, self))
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.como_dict()!r})"
+
+
+class LayoutRemessa:
+    """Layout de posição fixa compilado em um plano de fatias.
+
+    As posições de todos os campos viram um único operator.itemgetter de
+    fatias, aplicado à linha de uma vez só, e cada linha vira uma tupla
+    (RegistroRemessa) em vez de um dicionário.
+    """
+
+    def __init__(self, nome, campos):
+        """Compila o layout.
+
+        Args:
+            nome: Nome do layout
+            campos: Sequência de (campo, posição inicial, posição final), com
+                    posições a partir de 1 e final inclusiva
+        """
+        self.nome = nome
+        self.posicoes = tuple(campos)
+        self.campos = tuple(campo for campo, _, _ in campos)
+        self._cortar = operator.itemgetter(
+            *(slice(ini - 1, fim) for _, ini, fim in campos)
+        )
+        atributos = {"__slots__": (), "campos": self.campos}
+        for indice, campo in enumerate(self.campos):
+            atributos[campo] = property(operator.itemgetter(indice))
+        self.registro = type(f"Registro_{nome}", (RegistroRemessa,), atributos)
+
+    def ler(self, linha):
+        """Corta uma linha de detalhe nos campos do layout.
+
+        Args:
+            linha: Linha do arquivo
+
+        Returns:
+            Registro do layout, com os valores sem espaços nas pontas
+        """
+        return self.registro(map(str.strip, self._cortar(linha)))
+
+
+def primeiro_campo_vazio(registros):
+    """Procura o primeiro campo obrigatório vazio, registro a registro.
+
+    Args:
+        registros: Lista de registros de uma remessa
+
+    Returns:
+        Nome do campo vazio, ou None se todos estiverem preenchidos
+    """
+    for registro in registros:
+        # Os valores são strings: só a vazia é falsa, e a busca na tupla é em C
+        if "" not in registro:
+            continue
+        for campo in CAMPOS_OBRIGATORIOS:
+            if not registro[campo]:
+                return campo
+    return None
+
+
+# Layout das remessas, com as posições usadas desde o parser original
+LAYOUT_REMESSA = LayoutRemessa("remessa", [
+    ("CHASSI", 41, 61),
+    ("REMARCACAO", 62, 62),
+    ("ANO_FABRICACAO", 85, 88),
+    ("ANO_MODELO", 89, 92),
+    ("NUMERO_OPERACAO", 93, 112),
+    ("DATA_OPERACAO", 113, 120),
+    ("TIPO_GRAVAME", 121, 122),
+    ("QUANTIDADE_MESES", 177, 179),
+    ("TAXA_JUROS_MES", 203, 208),
+    ("TAXA_JUROS_ANO", 209, 214),
+    ("VALOR_TAXA_CONTRATO", 215, 223),
+    ("VALOR_IOF", 224, 232),
+    ("INDICATIVO_MULTA", 233, 235),
+    ("INDICATIVO_MORA", 236, 238),
+    ("VALOR_PRINCIPAL_OPERACAO", 239, 247),
+    ("VALOR_PARCELA", 248, 256),
+    ("VENCIMENTO_PRIMEIRA_PARCELA", 257, 264),
+    ("VENCIMENTO_ULTIMA_PARCELA", 265, 272),
+    ("CIDADE_LIBERACAO_OPERACAO", 273, 297),
+    ("UF_LIBERACAO_OPERACAO", 298, 299),
+    ("DATA_LIBERACAO_OPERACAO", 300, 307),
+    ("INDICES_UTILIZADOS", 308, 317),
+    ("MULTA", 383, 388),
+    ("JUROS_MORA", 389, 397),
+    ("CPF_CNPJ_RECEBEDOR", 680, 693),
+])
@@ -0,0 +1,202 @@
+"""Módulo para monitorar a chegada de arquivos no diretório de entrada."""
+
+import os
+import select
+import struct
+import time
+
+from models._interrupcao import interrupcao_solicitada
+
+try:
+    import ctypes
+    import ctypes.util
+
+    # inotify só existe no Linux; nos demais sistemas o monitor usa polling
+    _libc = ctypes.CDLL(
+        ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+    )
+    _libc.inotify_init1.restype = ctypes.c_int
+    _libc.inotify_add_watch.argtypes = (
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32,
+    )
+except (OSError, AttributeError):
+    _libc = None
+
+# Segundos sem nenhuma mudança de tamanho ou data para um arquivo ser
+# considerado completo
+TEMPO_ESTABILIDADE_PADRAO = 5.0
+
+# Intervalo, em segundos, entre as verificações (e entre as varreduras do
+# polling)
+INTERVALO_VERIFICACAO = 1.0
+
+BACKEND_INOTIFY = "inotify"
+BACKEND_POLLING = "polling"
+
+# Eventos do inotify (linux/inotify.h)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_EVENTOS = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+_CABECALHO_EVENTO = struct.Struct("iIII")
+
+
+class MonitorDiretorio:
+    """Avisa quando arquivos novos ou alterados terminam de chegar.
+
+    Só observa os arquivos da raiz do diretório (as pastas das operações,
+    _Lixo e _Cache ficam de fora). Usa o inotify quando disponível e, nos
+    outros casos, compara listagens do diretório. Nos dois casos o lote só
+    é entregue quando nenhum arquivo dele muda de tamanho ou de data por
+    tempo_estabilidade segundos, o que também cobre cópias em pastas de
+    rede, que não geram eventos do inotify a cada escrita.
+    """
+
+    def __init__(self, diretorio, tempo_estabilidade=TEMPO_ESTABILIDADE_PADRAO,
+                 usar_inotify=True):
+        """Começa a observar o diretório.
+
+        Args:
+            diretorio: Diretório de entrada
+            tempo_estabilidade: Segundos sem mudanças para entregar o lote
+            usar_inotify: Se False, usa polling mesmo no Linux
+        """
+        self.diretorio = diretorio
+        self.tempo_estabilidade = tempo_estabilidade
+        self._descritor = _iniciar_inotify(diretorio) if usar_inotify else None
+        self.backend = (
+            BACKEND_POLLING if self._descritor is None else BACKEND_INOTIFY
+        )
+        self._retrato = _retratar(diretorio)
+
+    def esperar_lote(self):
+        """Espera arquivos novos ou alterados e que já estejam estáveis.
+
+        Returns:
+            Conjunto com os caminhos dos arquivos, ou None se a execução
+            recebeu um pedido de interrupção
+        """
+        pendentes = {}
+        ultima_mudanca = None
+        while not interrupcao_solicitada():
+            agora = time.monotonic()
+            for caminho in self._coletar():
+                pendentes.setdefault(caminho, None)
+                ultima_mudanca = agora
+
+            # Confere tamanho e data mesmo sem eventos: escritas remotas
+            # (SMB/NFS) não geram eventos locais
+            for caminho in list(pendentes):
+                assinatura = _assinatura(caminho)
+                if assinatura is None:
+                    del pendentes[caminho]
+                elif assinatura != pendentes[caminho]:
+                    pendentes[caminho] = assinatura
+                    ultima_mudanca = agora
+
+            if pendentes and agora - ultima_mudanca >= self.tempo_estabilidade:
+                return set(pendentes)
+        return None
+
+    def fechar(self):
+        """Para de observar o diretório."""
+        if self._descritor is not None:
+            os.close(self._descritor)
+            self._descritor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def _coletar(self):
+        """Espera até INTERVALO_VERIFICACAO e devolve os caminhos alterados."""
+        if self._descritor is None:
+            time.sleep(INTERVALO_VERIFICACAO)
+            return self._comparar_retrato()
+
+        prontos, _, _ = select.select(
+            [self._descritor], [], [], INTERVALO_VERIFICACAO
+        )
+        if not prontos:
+            return set()
+        try:
+            dados = os.read(self._descritor, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        alterados = set()
+        posicao = 0
+        while posicao < len(dados):
+            _, mascara, _, tamanho = _CABECALHO_EVENTO.unpack_from(
+                dados, posicao
+            )
+            posicao += _CABECALHO_EVENTO.size
+            nome = dados[posicao:posicao + tamanho].rstrip(b"\0")
+            posicao += tamanho
+            if mascara & _IN_Q_OVERFLOW:
+                # Eventos perdidos: descobre as mudanças pela listagem
+                alterados |= self._comparar_retrato()
+            elif nome and not mascara & _IN_ISDIR:
+                alterados.add(os.path.join(self.diretorio, os.fsdecode(nome)))
+        return alterados
+
+    def _comparar_retrato(self):
+        """Lista o diretório e devolve os arquivos novos ou alterados."""
+        retrato = _retratar(self.diretorio)
+        alterados = {
+            caminho for caminho, assinatura in retrato.items()
+            if self._retrato.get(caminho) != assinatura
+        }
+        self._retrato = retrato
+        return alterados
+
+
+def _iniciar_inotify(diretorio):
+    """Cria o descritor do inotify para o diretório.
+
+    Returns:
+        Descritor de arquivo ou None se o inotify não estiver disponível
+    """
+    if _libc is None:
+        return None
+    descritor = _libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    if descritor < 0:
+        return None
+    if _libc.inotify_add_watch(
+        descritor, os.fsencode(diretorio), _EVENTOS
+    ) < 0:
+        os.close(descritor)
+        return None
+    return descritor
+
+
+def _retratar(diretorio):
+    """Tamanho e data de cada arquivo da raiz do diretório."""
+    retrato = {}
+    with os.scandir(diretorio) as entradas:
+        for entrada in entradas:
+            try:
+                if entrada.is_file():
+                    info = entrada.stat()
+                    retrato[entrada.path] = (info.st_size, info.st_mtime_ns)
+            except OSError:
+                continue
+    return retrato
+
+
+def _assinatura(caminho):
+    """(tamanho, data) do arquivo, ou None se ele não existe mais."""
+    try:
+        info = os.stat(caminho)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
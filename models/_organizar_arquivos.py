@@ -1,484 +1,929 @@
-import json  # Para salvar dados em formato JSON
-import os  # Para manipulação de arquivos e diretórios
-import re  # Para expressões regulares (não está sendo usada aqui)
-import shutil  # Para mover arquivos entre pastas
-import unicodedata  # Para remover acentos
+"""Módulo para organizar arquivos PDF e TXT."""
 
+import os
+import time
+
+from models._deduplicar_pdfs import agrupar_pdfs_duplicados
+from models._esteira import EstagioProdutor
 from models._extrair_dados_do_txt import extrair_dados_do_txt
-from models._processar_pdf_em_lote import processar_pdf_em_lote
+from models import _extrair_texto_do_pdf
+from models._extrair_texto_do_pdf import configurar_cache_persistente
+from models import _indice_chassis_persistente
+from models._indexar_chassis import indexar_chassis_pdf, resolver_chassis
+from models._indice_chassis_persistente import IndiceChassisPersistente
+from models._interrupcao import interrupcao_solicitada
+from models._plano_organizacao import PlanoOrganizacao, recuperar_diario
+from models._processar_pdf_em_lote import obter_veredito_pdf
+from models import _registro_operacoes
+from models._registro_operacoes import (
+    ETAPAS,
+    RESULTADO_ORGANIZADA,
+    RESULTADO_REJEITADA,
+    OperacaoRegistrada,
+    RegistroOperacoes,
+)
+from models._validar_remessa import validar_remessa
+from models._triar_arquivos import (
+    EXTENSOES_ACEITAS,
+    LIMITE_TAMANHO_PDF_MB,
+    IndiceViasNegociaveis,
+    triar_arquivos,
+)
+
+# Inventário da última execução de cada diretório e os alertas já enviados
+# para os arquivos dele; no monitoramento, cada lote só examina os arquivos
+# alterados e não repete os alertas de arquivos que continuam iguais
+_inventarios = {}
+_alertas_enviados = {}
+
+
+def organizar_arquivos(diretorio_base, mensagem_erro, alterados=None):
+    """
+    Organiza arquivos PDF e TXT em um diretório.
+
+    Os .txt são lidos em uma thread própria enquanto os PDFs são agrupados
+    por conteúdo. Nenhuma operação válida é decidida antes de todos os PDFs
+    de NF serem extraídos, porque a busca dos chassis cobre todos eles; só
+    as remessas rejeitadas são movidas durante a extração. Depois, cada
+    operação decidida é movida e tem o seu JSON gravado em segundo plano,
+    enquanto as próximas são decididas.
+
+    Alertas de PDFs acima do limite, duplicados ou sem remessa são enviados
+    uma vez por versão do arquivo: execuções seguintes no mesmo processo só
+    voltam a avisar se o arquivo mudar.
 
+    Args:
+        diretorio_base: Caminho do diretório a ser processado
+        mensagem_erro: Lista para armazenar mensagens de erro
+        alterados: Caminhos novos ou alterados desde a execução anterior
+                   no mesmo diretório; se informado, os demais arquivos
+                   reaproveitam o inventário daquela execução
 
-# Função principal para organizar os arquivos
-def organizar_arquivos(diretorio_base, mensagem_erro):
+    Returns:
+        Lista de mensagens de erro ocorridas durante o processamento
+    """
     print(f"Iniciando organização do diretório: {diretorio_base}\n")
-    # Se a pasta Lixo nao existir cria ela
-    os.makedirs(
-        os.path.join(diretorio_base, "_Lixo"), exist_ok=True
-    )  # exist_ok=True cria a pasta se ela nao existir
-    """if not os.path.exists(os.path.join(diretorio_base, '_Lixo')):
-        os.mkdir(os.path.join(diretorio_base, '_Lixo'))"""
-
-    # Nova pasta lixo
-    pasta_lixo = os.path.join(
-        diretorio_base, "_Lixo"
-    )  # join() junta o diretório com o arquivo
+
+    os.makedirs(os.path.join(diretorio_base, "_Lixo"), exist_ok=True)
+    pasta_lixo = os.path.join(diretorio_base, "_Lixo")
+    diretorio_cache = os.path.join(diretorio_base, "_Cache")
+
+    # Termina (ou desfaz) o que uma execução interrompida deixou pela metade
+    recuperar_diario(diretorio_cache)
+
+    # Uma única listagem do diretório: extensão, nome, tamanho e data de
+    # cada arquivo ficam no inventário e servem a todas as etapas
+    # O inventário só volta a ser guardado se a execução terminar: depois de
+    # um erro, a próxima triagem examina o diretório inteiro
+    anterior = _inventarios.pop(diretorio_base, None)
     try:
-        # Lista todos os arquivos no diretório
-        todos_os_arquivos = [
-            os.path.join(diretorio_base, f)
-            for f in os.listdir(
-                diretorio_base
-            )  # listdir() lista os arquivos no diretório
-            if os.path.isfile(os.path.join(diretorio_base, f))
-        ]  # isfile() verifica se é um arquivo join() junta o diretório com o arquivo
+        triagem = triar_arquivos(
+            diretorio_base, anterior if alterados is not None else None,
+            alterados,
+        )
     except FileNotFoundError:
         print(f"ERRO: O diretório '{diretorio_base}' não foi encontrado.")
         return
+    alertas = _alertas_vigentes(diretorio_base, triagem)
+    todos_os_arquivos = list(triagem)
 
-    # Separa arquivos por extensão
-    arquivos_txt = [
-        f for f in todos_os_arquivos if f.lower().endswith(".txt")
-    ]  # lower() converte para minúsculo endswith() verifica se o arquivo termina com .txt
-    arquivos_pdf = [
-        f for f in todos_os_arquivos if f.lower().endswith(".pdf")
-    ]  # lower() converte para minúsculo endswith() verifica se o arquivo termina com .pdf
+    # Decisões só entram no plano; os arquivos são movidos no fim, de uma vez
+    plano = PlanoOrganizacao(pasta_lixo, diretorio_cache, inventario=triagem)
+
+    configurar_cache_persistente(diretorio_cache, inventario=triagem)
+    # Em ordem de nome: quando dois .txt disputam um PDF (via negociável ou
+    # NF), o dono é sempre o mesmo, qualquer que seja a ordem da listagem
+    arquivos_txt = sorted(
+        f for f in todos_os_arquivos if triagem[f].extensao == ".txt"
+    )
+    arquivos_pdf = sorted(
+        f for f in todos_os_arquivos if triagem[f].extensao == ".pdf"
+    )
     arquivos_para_remover = [
-        f
-        for f in todos_os_arquivos
-        if not (f.lower().endswith(".txt") or f.lower().endswith(".pdf"))
+        f for f in todos_os_arquivos
+        if triagem[f].extensao not in EXTENSOES_ACEITAS
     ]
 
-    if arquivos_para_remover:
-        for arquivo in arquivos_para_remover:
-            print(
-                f"⚠️Arquivos que não serão processados: {os.path.basename(arquivo)}")
-            os.remove(arquivo)
-            print(
-                f"❗Arquivo removido com sucesso: {os.path.basename(arquivo)}\n")
+    for arquivo in arquivos_para_remover:
+        print(
+            f"⚠️Arquivo não será processado com extensão incompatível: "
+            f"{os.path.basename(arquivo)}"
+        )
+        mensagem_erro.append(
+            f"Arquivo não será processado com extensão incompatível: "
+            f"<b>{os.path.basename(arquivo)}</b>"
+        )
+        os.remove(arquivo)
+        print(f"❗Arquivo removido com sucesso: {os.path.basename(arquivo)}\n")
 
     if not arquivos_txt:
         print("⚠️Nenhum arquivo .txt encontrado no diretório.⚠️")
+        _inventarios[diretorio_base] = triagem
         return None
 
-    print(f"Quantidade. de arquivos .txt encontrados: {len(arquivos_txt)}")
-
-    # Processa cada arquivo .txt
-    for caminho_txt in arquivos_txt:
-        nome_txt = os.path.basename(caminho_txt)
-        print(f"\n--- Processando o .txt: {nome_txt} ---")
-        print(f"Pesquisando CHASSI e NÚMERO da operação no .txt...")
-        dados_chassis, op_num = extrair_dados_do_txt(caminho_txt)
-
-        # Contar quantos chassis existem em dados_chassis
-        qtd_chassi = {d["CHASSI"] for d in dados_chassis}
-        qtd_chassi = len(qtd_chassi)
-        print(f"Quantidade de chassis esperados: {qtd_chassi}")
-
-        sair = False
-        for item in dados_chassis:
-            if item["CHASSI"] == "":
-                print(f"Sem chassi no .txt: {nome_txt} NOTIFICAR IC")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem chassi no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["REMARCACAO"] == "":
-                print(f"Sem remarcação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem remarcação no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["ANO_FABRICACAO"] == "":
-                print(f"Sem ano de fabricação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem ano de fabricação no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["ANO_MODELO"] == "":
-                print(f"Sem ano de modelo no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem ano de modelo no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["NUMERO_OPERACAO"] == "":
-                print(
-                    f"Sem número da operação no .txt: {nome_txt} NOTIFICAR IC")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem número da operação no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["DATA_OPERACAO"] == "":
-                print(f"Sem data da operação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem data da operação no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["TIPO_GRAVAME"] == "":
-                print(f"Sem tipo de gravame no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem tipo de gravame no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["QUANTIDADE_MESES"] == "":
-                print(f"Sem quantidade de meses no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem quantidade de meses no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["TAXA_JUROS_MES"] == "":
-                print(f"Sem taxa de juros no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem taxa de juros no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["TAXA_JUROS_ANO"] == "":
-                print(f"Sem taxa de juros no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem taxa de juros no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["VALOR_TAXA_CONTRATO"] == "":
-                print(f"Sem valor da taxa do contrato no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem valor da taxa do contrato no .txt: {nome_txt}"
-                )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["VALOR_IOF"] == "":
-                print(f"Sem valor do IOF no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem valor do IOF no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["INDICATIVO_MULTA"] == "":
-                print(f"Sem indicativo de multa no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem indicativo de multa no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["INDICATIVO_MORA"] == "":
-                print(f"Sem indicativo de mora no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem indicativo de mora no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["VALOR_PRINCIPAL_OPERACAO"] == "":
-                print(f"Sem valor principal da operação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem valor principal da operação no .txt: {nome_txt}"
-                )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["VALOR_PARCELA"] == "":
-                print(f"Sem valor da parcela no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem valor da parcela no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["VENCIMENTO_PRIMEIRA_PARCELA"] == "":
-                print(
-                    f"Sem vencimento da primeira parcela no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem vencimento da primeira parcela no .txt: {nome_txt}"
-                )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["VENCIMENTO_ULTIMA_PARCELA"] == "":
-                print(f"Sem vencimento da ultima parcela no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem vencimento da ultima parcela no .txt: {nome_txt}"
-                )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["CIDADE_LIBERACAO_OPERACAO"] == "":
-                print(
-                    f"Sem cidade de liberação da operação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem cidade de liberação da operação no .txt: {nome_txt}"
-                )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["UF_LIBERACAO_OPERACAO"] == "":
-                print(f"Sem UF de liberação da operação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem UF de liberação da operação no .txt: {nome_txt}"
+    print(f"Quantidade de arquivos .txt encontrados: {len(arquivos_txt)}")
+
+    # Operações concluídas e ponto de controle, mantidos entre execuções
+    registro = RegistroOperacoes(diretorio_cache)
+    numeros_operacao = {}
+    # .txt cujo destino foi decidido nesta execução (entram no registro) e
+    # o hash dos arquivos de cada um, calculado antes de eles saírem do lugar
+    decididos = []
+    entradas = {}
+    parada = None
+    decisao_concluida = False
+    try:
+        _avisar_execucao_interrompida(registro.progresso_salvo())
+        for caminho_txt in arquivos_txt[:]:
+            if _pular_remessa_organizada(
+                registro, triagem, caminho_txt, arquivos_pdf, plano,
+                mensagem_erro
+            ):
+                arquivos_txt.remove(caminho_txt)
+                plano.liberar(caminho_txt)
+
+        pdfs_nf_acima_do_limite = [
+            f for f in arquivos_pdf
+            if triagem[f].acima_do_limite and not triagem[f].via_negociavel
+        ]
+        for caminho_pdf in pdfs_nf_acima_do_limite:
+            if not _alerta_novo(alertas, "acima_do_limite",
+                                [triagem[caminho_pdf]]):
+                continue
+            print(
+                f'⚠️O .pdf "{triagem[caminho_pdf].nome}" tem mais de '
+                f'{LIMITE_TAMANHO_PDF_MB}MB e não será lido. '
+                f'NOTIFICAR IC 😱 *****NOTIFICAR IC*****'
+            )
+            mensagem_erro.append(
+                f'O .pdf "{triagem[caminho_pdf].nome}" tem mais de '
+                f'{LIMITE_TAMANHO_PDF_MB}MB e não foi lido.'
+            )
+
+        print("Pesquisando CHASSI e NÚMERO da operação nos .txt...")
+        leitura = EstagioProdutor(
+            extrair_dados_do_txt, arquivos_txt, nome="leitura_txt"
+        )
+        # Enquanto os .txt são lidos, os PDFs de NF são agrupados pelo hash
+        vias_negociaveis = IndiceViasNegociaveis(arquivos_pdf, triagem)
+        pdfs_nf = _filtrar_pdfs_nf(arquivos_pdf, triagem)
+        duplicados = agrupar_pdfs_duplicados(pdfs_nf, triagem)
+
+        remessas = {}
+
+        # Remessas inválidas saem antes de qualquer leitura de PDF
+        print("Validando os campos dos .txt...")
+        with leitura:
+            for caminho_txt, (dados_chassis, op_num) in leitura:
+                numeros_operacao[caminho_txt] = op_num
+                if _validar_dados_txt(
+                    dados_chassis, os.path.basename(caminho_txt),
+                    caminho_txt, plano, mensagem_erro
+                ):
+                    decididos.append(caminho_txt)
+                    _liberar_remessa(plano, caminho_txt, triagem, entradas)
+                    continue
+                remessas[caminho_txt] = (dados_chassis, op_num)
+        arquivos_txt = [f for f in arquivos_txt if f in remessas]
+        _avisar_pdfs_duplicados(duplicados, triagem, alertas, mensagem_erro)
+
+        print("Indexando os chassis dos .pdf...")
+        # Chassis dos PDFs lidos em execuções anteriores e que continuam no
+        # diretório esperando o .txt
+        indice_persistente = IndiceChassisPersistente(diretorio_cache, triagem)
+        with indice_persistente:
+            # Os textos já extraídos ficam no cache em disco: uma execução
+            # interrompida aqui recomeça só pelos PDFs que faltaram
+            parada = ("indexacao", 0, len(pdfs_nf))
+            registro.salvar_progresso(*parada)
+            falhas_extracao = []
+            indice_chassis = indexar_chassis_pdf(
+                pdfs_nf,
+                {d["CHASSI"] for dados, _ in remessas.values() for d in dados},
+                falhas_extracao,
+                duplicados,
+                indice_persistente,
+            )
+            _isolar_pdfs_com_falha(
+                falhas_extracao, arquivos_pdf, plano, mensagem_erro
+            )
+
+            # Interrompida durante a indexação: o índice está incompleto e
+            # nenhuma remessa é decidida nesta execução
+            a_decidir = [] if interrupcao_solicitada() else arquivos_txt
+            if not a_decidir:
+                parada = ("indexacao", sum(
+                    caminho_pdf in _extrair_texto_do_pdf.vereditos_pdf
+                    for caminho_pdf in pdfs_nf
+                ), len(pdfs_nf))
+            if a_decidir:
+                parada = ("decisao", 0, len(a_decidir))
+                registro.salvar_progresso(*parada)
+
+            for posicao, caminho_txt in enumerate(a_decidir):
+                if interrupcao_solicitada():
+                    parada = ("decisao", posicao, len(a_decidir))
+                    break
+                decididos.append(caminho_txt)
+                _decidir_remessa(
+                    caminho_txt, remessas[caminho_txt], vias_negociaveis, triagem,
+                    indice_chassis, arquivos_pdf, pdfs_nf_acima_do_limite,
+                    diretorio_base, plano, mensagem_erro,
                 )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-            elif item["DATA_LIBERACAO_OPERACAO"] == "":
-                print(f"Sem data de liberação da operação no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem data de liberação da operação no .txt: {nome_txt}"
+                # A operação é movida enquanto as próximas são decididas
+                _liberar_remessa(plano, caminho_txt, triagem, entradas)
+
+            if a_decidir and not interrupcao_solicitada():
+                _descartar_pdfs_orfaos(
+                    indice_persistente,
+                    [
+                        pdf for pdf in _filtrar_pdfs_nf(arquivos_pdf, triagem)
+                        if plano.destino_de(pdf) is None
+                    ],
+                    plano, alertas, mensagem_erro,
                 )
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["INDICES_UTILIZADOS"] == "":
-                print(f"Sem índices utilizados no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem índices utilizados no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["MULTA"] == "":
-                print(f"Sem multa no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem multa no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["JUROS_MORA"] == "":
-                print(f"Sem juros de mora no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(f"Sem juros de mora no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-            elif item["CPF_CNPJ_RECEBEDOR"] == "":
-                print(f"Sem CPF/CNPJ do recebedor no .txt: {nome_txt}")
-                # add mensagem na lista
-                mensagem_erro.append(
-                    f"Sem CPF/CNPJ do recebedor no .txt: {nome_txt}")
-                # move o .txt pasta Lixo
-                shutil.move(caminho_txt, pasta_lixo)
-                sair = True
-                break
-
-        if sair:
-            continue
+        decisao_concluida = True
+    finally:
+        # Mesmo que a decisão pare com erro, as operações já liberadas
+        # terminam de ser movidas e entram no registro, e o diário é fechado
+        _concluir_execucao(
+            plano, registro, triagem, decididos, numeros_operacao, entradas,
+            parada, decisao_concluida, mensagem_erro,
+        )
+    _inventarios[diretorio_base] = {
+        caminho: arquivo for caminho, arquivo in triagem.items()
+        if plano.destino_de(caminho) is None
+    }
+
+    estatisticas = _extrair_texto_do_pdf.cache_pdf_textos.estatisticas()
+    print(
+        f"\nCache de PDFs em memória: {estatisticas['acertos']} acerto(s), "
+        f"{estatisticas['falhas']} falha(s), "
+        f"{estatisticas['despejos']} despejo(s)."
+    )
+
+    return mensagem_erro
+
+
+def _decidir_remessa(caminho_txt, remessa, vias_negociaveis, triagem,
+                     indice_chassis, arquivos_pdf, pdfs_nf_acima_do_limite,
+                     diretorio_base, plano, mensagem_erro):
+    """Decide o destino de um .txt válido e dos PDFs da operação.
+
+    Args:
+        caminho_txt: Caminho completo do arquivo TXT
+        remessa: Tupla (registros dos chassis, número da operação) do .txt
+        vias_negociaveis: IndiceViasNegociaveis da execução
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+        indice_chassis: Índice gerado por indexar_chassis_pdf
+        arquivos_pdf: Lista de caminhos dos PDFs ainda não organizados
+        pdfs_nf_acima_do_limite: PDFs de NF que não foram lidos
+        diretorio_base: Diretório de entrada
+        plano: PlanoOrganizacao da execução
+        mensagem_erro: Lista para armazenar mensagens de erro
+    """
+    nome_txt = os.path.basename(caminho_txt)
+    print(f"\n--- Processando o .txt: {nome_txt} ---")
+    dados_chassis, op_num = remessa
+
+    qtd_chassi = len({d["CHASSI"] for d in dados_chassis})
+    print(f"Quantidade de chassis esperados: {qtd_chassi}")
+    print(f"  -> ✅Número da operação e chassi(s) encontrado no .txt: {nome_txt}")
+    arquivos_para_mover = {caminho_txt}
+
+    if _processar_via_negociavel(
+        vias_negociaveis, triagem, op_num, arquivos_para_mover,
+        nome_txt, caminho_txt, plano, mensagem_erro
+    ):
+        return
+
+    resultados_pdf = resolver_chassis(
+        indice_chassis, _filtrar_pdfs_nf(arquivos_pdf, triagem),
+        dados_chassis
+    )
+
+    if _processar_resultados_pdf(
+        resultados_pdf, arquivos_para_mover, arquivos_pdf,
+        nome_txt, caminho_txt, plano, mensagem_erro
+    ):
+        return
+
+    chassis_esperados = {d["CHASSI"] for d in dados_chassis}
+    chassis_encontrados = {
+        chassi for _, chassis in resultados_pdf for chassi in chassis
+    }
+
+    faltando = chassis_esperados - chassis_encontrados
+    if faltando:
         print(
-            f"  -> ✅Número da operação e chassi(s) encontrado no .txt: {nome_txt}")
-        arquivos_para_mover = {caminho_txt}
-        via_negociavel_encontrada = False
-
-        def remover_acentos(texto):  # Função para remover acentos
-            return "".join(
-                c
-                for c in unicodedata.normalize("NFD", texto)
-                if unicodedata.category(c) != "Mn"
-            )
+            f"  ⚠️Chassis {faltando} do .txt {nome_txt} não encontrados "
+            f"nos .pdf🤦‍♀️*****NOTIFICAR IC*****"
+        )
+        nao_lidos = [
+            triagem[f].nome for f in pdfs_nf_acima_do_limite
+            if f in arquivos_pdf
+        ]
+        aviso_nao_lidos = (
+            f" PDFs acima de {LIMITE_TAMANHO_PDF_MB}MB não lidos: "
+            f"{', '.join(nao_lidos)}." if nao_lidos else ""
+        )
+        mensagem_erro.append(
+            f"Chassis {faltando} do .txt {nome_txt} não encontrados nos .pdf."
+            f"{aviso_nao_lidos} O .txt foi movido: <b>{nome_txt}</b>."
+        )
+        print('Movendo o .txt para a pasta "Lixo"')
+        plano.mover_para_lixo(caminho_txt)
+        print(f"❗Txt sem os chassis movido para a pasta Lixo: {nome_txt}")
+        return
 
-        print(f"Vai encontrar a Via Negociável...")
-        # Lista para armazenar os PDFs que *não* são a Via Negociável atual
-        arquivos_pdf_restantes_nf = []
-        sair = False
-        # Normaliza número da operação para busca
-        op_normalizado = remover_acentos(op_num).lower().replace(" ", "")
-        for pdf_path in arquivos_pdf:
-
-            nome_pdf = os.path.basename(pdf_path)
-            nome_normalizado = (
-                remover_acentos(nome_pdf).lower().replace(" ", "")
-            )  # Normaliza nome: sem acento, minúsculo, sem espaços
-
-            if (
-                re.search(
-                    r"^via[-_]*negociavel", nome_normalizado
-                )  # Busca por “via negociavel” com ou sem separadores + número da operação
-                and op_normalizado in nome_normalizado
-            ):
-                arquivos_para_mover.add(pdf_path)
-                arquivos_pdf.remove(pdf_path)
-                print(f"  -> ✅Via Negociável encontrada: {nome_pdf}")
-
-                # Verifica se o .pdf mais de 10MB
-                tamanho_arquivo = os.path.getsize(pdf_path) / (
-                    1024 * 1024
-                )  # Converte bytes para MB
-                if tamanho_arquivo > 10:
-                    print(
-                        f'⚠️O PDF "{nome_pdf}" tem mais de 10MB. NOTIFICAR IC 😱 *****NOTIFICAR IC*****'
-                    )
-                    # add mensagem na lista
-                    mensagem_erro.append(
-                        f'O PDF "{nome_pdf}" tem mais de 10MB.')
-                    print(f'Movendo o .txt para a pasta "Lixo"')
-                    # move o .txt pasta Lixo
-                    shutil.move(caminho_txt, pasta_lixo)
-                    print(
-                        f"❗Txt com Via Negociável maior que 10MB movido para a pasta Lixo: {nome_txt}"
-                    )
-                    sair = True
-                    break
+    if len(arquivos_para_mover) > 1:
+        nova_pasta = f"{op_num}"
+        destino = os.path.join(diretorio_base, nova_pasta)
 
-                via_negociavel_encontrada = True
-                break
+        for arq in arquivos_para_mover:
+            plano.mover(arq, destino, grupo=caminho_txt)
+            # PDF já organizado não deve ser consultado pelos próximos .txt
+            if arq in arquivos_pdf:
+                arquivos_pdf.remove(arq)
 
-            if re.search(r"via[-_]*negociavel", nome_normalizado):
-                pass
-            else:
-                arquivos_pdf_restantes_nf.append(pdf_path)
+        print("Vai salvar os dados extraídos do .txt em JSON...")
+        # O JSON é o último movimento do grupo: se ele está na pasta da
+        # operação, todos os arquivos dela também estão
+        plano.gravar_json(
+            [dados.como_dict() for dados in dados_chassis],
+            os.path.join(destino, f"{op_num}_dados_extraidos.json"),
+            grupo=caminho_txt,
+        )
+        print(f"  -> ✅Dados extraídos do .txt salvos no JSON: {nova_pasta}")
+    else:
+        print("  -> ❗Nenhum arquivo adicional encontrado.")
 
-        if sair:
-            continue
+    print(f"--- Fim do processamento do .txt: {nome_txt} ---")
 
-        if not via_negociavel_encontrada:
-            print(
-                f"⚠️Via Negociável não encontrada pelo número da operação {op_num}. NOTIFICAR IC 😱 *****NOTIFICAR IC*****"
-            )
-            # add mensagem na lista
+
+def _liberar_remessa(plano, caminho_txt, triagem, entradas):
+    """Anota o hash dos arquivos de um .txt decidido e libera a operação.
+
+    Args:
+        plano: PlanoOrganizacao da execução
+        caminho_txt: Caminho completo do arquivo TXT
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+        entradas: Dicionário {caminho do .txt: {nome: hash}} da execução
+    """
+    entradas.update(_descrever_entradas(plano, [caminho_txt], triagem))
+    plano.liberar(caminho_txt)
+
+
+def _concluir_execucao(plano, registro, triagem, decididos, numeros_operacao,
+                       entradas, parada, decisao_concluida, mensagem_erro):
+    """Executa o plano, registra as operações concluídas e fecha o registro.
+
+    Se a decisão parou com erro, só os grupos já liberados são executados
+    e o ponto de controle salvo é mantido.
+
+    Args:
+        plano: PlanoOrganizacao da execução
+        registro: RegistroOperacoes da execução
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+        decididos: .txt cujo destino foi decidido nesta execução
+        numeros_operacao: Dicionário {caminho do .txt: número da operação}
+        entradas: Dicionário {caminho do .txt liberado: {nome: hash}}
+        parada: Ponto de controle (etapa, concluídos, total) da execução
+        decisao_concluida: False se a decisão parou com erro
+        mensagem_erro: Lista para armazenar mensagens de erro
+    """
+    try:
+        total_grupos = len({movimento.grupo for movimento in plano.movimentos})
+        if decisao_concluida and not interrupcao_solicitada():
+            parada = ("execucao", 0, total_grupos)
+            registro.salvar_progresso(*parada)
+
+        # As operações não compartilham arquivos e são movidas em paralelo
+        falhas_movimento = plano.executar(liberar_restantes=decisao_concluida)
+        for falha in falhas_movimento:
+            nome = os.path.basename(falha.grupo)
             mensagem_erro.append(
-                f"Via Negociável não encontrada pelo número da operação {op_num}."
+                f"Falha ao mover os arquivos de {nome} ({falha.erro}). "
+                f"Nenhum arquivo foi movido: <b>{nome}</b>."
             )
-            # Remover o .txt sem a Via Negociável da lista de arquivos para mover
-            arquivos_para_mover.remove(caminho_txt)
-            print(f'Movendo o .txt para a pasta "Lixo"')
-            # move o .txt pasta Lixo
-            shutil.move(caminho_txt, pasta_lixo)
+        if plano.adiados:
+            parada = (
+                "execucao", total_grupos - len(plano.adiados), total_grupos
+            )
+
+        nao_concluidos = (
+            set(plano.adiados) | {f.grupo for f in falhas_movimento}
+        )
+        registro.registrar([
+            OperacaoRegistrada(
+                triagem[caminho_txt].hash, numeros_operacao.get(caminho_txt),
+                triagem[caminho_txt].nome,
+                RESULTADO_REJEITADA
+                if os.path.dirname(plano.destino_de(caminho_txt))
+                == plano.pasta_lixo
+                else RESULTADO_ORGANIZADA,
+                plano.destino_de(caminho_txt), entradas[caminho_txt], None,
+            )
+            for caminho_txt in decididos
+            # Só os liberados: uma decisão interrompida por erro não moveu nada
+            if caminho_txt in entradas and plano.destino_de(caminho_txt)
+            and caminho_txt not in nao_concluidos
+        ])
+        if not decisao_concluida:
+            return
+        if interrupcao_solicitada():
+            registro.salvar_progresso(*parada)
+            etapa, concluidos, total = parada
             print(
-                f"❗Txt sem a Via Negociável movido para a pasta Lixo: {nome_txt}")
-            continue
+                f"\n⏸️Execução interrompida na etapa de {ETAPAS[etapa]} "
+                f"({concluidos} de {total}). A próxima execução continua daqui."
+            )
+        else:
+            registro.limpar_progresso()
+    finally:
+        registro.fechar()
 
-        print(f"Vai procurar os chassis...")
-        # Procura os chassis dentro dos PDFs
-        # resultados_pdf = processar_pdf_em_lote(arquivos_pdf, dados_chassis)
-        resultados_pdf = processar_pdf_em_lote(
-            arquivos_pdf_restantes_nf, dados_chassis)
-
-        chassis_encontrados = set()
-        # Verifica se o chassi foi encontrado e em qual arquivo .pdf
-        for caminho_pdf, chassis in resultados_pdf:
-            if chassis:
-                arquivos_para_mover.add(caminho_pdf)
-                chassis_encontrados.update(chassis)
-                print(
-                    f"  -> Chassis {list(chassis)} em {os.path.basename(caminho_pdf)}"
-                )
 
-                # Verifica se o .pdf mais de 10MB
-                tamanho_arquivo = os.path.getsize(caminho_pdf) / (
-                    1024 * 1024
-                )  # Converte bytes para MB
-                if tamanho_arquivo > 10:
-                    print(
-                        f'⚠️O .pdf "{os.path.basename(caminho_pdf)}" tem mais de 10MB. NOTIFICAR IC 😱 *****NOTIFICAR IC*****'
-                    )
-                    # add mensagem na lista
-                    mensagem_erro.append(
-                        f'O .pdf "{os.path.basename(caminho_pdf)}" tem mais de 10MB.'
-                    )
-                    print(f'Movendo o .txt para a pasta "Lixo"')
-                    # move o .txt pasta Lixo
-                    shutil.move(caminho_txt, pasta_lixo)
-                    print(
-                        f"❗Txt com NF maior que 10MB movido para a pasta Lixo: {nome_txt}"
-                    )
-                    sair = True
-                    break
-            else:
-                print(
-                    f"  -> Chassis nao encontrado em {os.path.basename(caminho_pdf)}")
-        if sair:
+def _avisar_execucao_interrompida(progresso):
+    """Informa onde parou a execução anterior, se ela não terminou.
+
+    Args:
+        progresso: Progresso salvo no registro, ou None
+    """
+    if progresso is None:
+        return
+    quando = time.strftime(
+        "%d/%m/%Y %H:%M:%S", time.localtime(progresso.atualizado_em)
+    )
+    print(
+        f"♻️A execução anterior parou em {quando} na etapa de "
+        f"{ETAPAS.get(progresso.etapa, progresso.etapa)} "
+        f"({progresso.concluidos} de {progresso.total}). Operações já "
+        f"concluídas estão no registro e textos de PDF já extraídos vêm "
+        f"do cache.\n"
+    )
+
+
+def _pular_remessa_organizada(registro, triagem, caminho_txt, arquivos_pdf,
+                              plano, mensagem_erro):
+    """Tira da execução um .txt idêntico a uma remessa já organizada.
+
+    Os PDFs reenviados junto com ele (mesmo nome e mesmo hash de um arquivo
+    registrado na operação) vão para o Lixo no mesmo grupo do .txt, em vez
+    de ficarem no diretório sem remessa. Com o reprocessamento ativo
+    (configurar_reprocessamento), o .txt só é anunciado e segue para ser
+    organizado de novo.
+
+    Args:
+        registro: RegistroOperacoes da execução
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+        caminho_txt: Caminho completo do arquivo TXT
+        arquivos_pdf: Lista de caminhos dos PDFs ainda não organizados
+        plano: PlanoOrganizacao da execução
+        mensagem_erro: Lista para armazenar mensagens de erro
+
+    Returns:
+        True se a remessa já foi organizada, False caso contrário
+    """
+    operacao = registro.obter_organizada(triagem[caminho_txt].hash)
+    if operacao is None:
+        return False
+
+    nome_txt = triagem[caminho_txt].nome
+    quando = time.strftime(
+        "%d/%m/%Y %H:%M", time.localtime(operacao.concluido_em)
+    )
+    print(
+        f"⚠️O .txt {nome_txt} é idêntico à remessa da operação "
+        f"{operacao.op_num}, já organizada em {quando}."
+    )
+    if _registro_operacoes.reprocessar_organizadas:
+        print(f"♻️Reprocessamento ativo: {nome_txt} será organizado de novo.")
+        return False
+    reenviados = [
+        caminho_pdf for caminho_pdf in arquivos_pdf
+        if plano.destino_de(caminho_pdf) is None
+        and operacao.entradas.get(triagem[caminho_pdf].nome)
+        == triagem[caminho_pdf].hash
+    ]
+    nomes = ", ".join(
+        triagem[caminho].nome for caminho in [caminho_txt, *reenviados]
+    )
+    mensagem_erro.append(
+        f"O .txt {nome_txt} é idêntico à remessa da operação "
+        f"{operacao.op_num}, já organizada em {quando}. "
+        f"Os arquivos foram movidos (para organizá-los de novo, ative "
+        f"REPROCESSAR_REMESSAS): <b>{nomes}</b>."
+    )
+    plano.mover_para_lixo(caminho_txt, grupo=caminho_txt)
+    for caminho_pdf in reenviados:
+        plano.mover_para_lixo(caminho_pdf, grupo=caminho_txt)
+        arquivos_pdf.remove(caminho_pdf)
+    print(f"❗Remessa já organizada movida para a pasta Lixo: {nomes}")
+    return True
+
+
+def _descartar_pdfs_orfaos(indice_persistente, pdfs_sem_remessa, plano,
+                           alertas, mensagem_erro):
+    """Relata os PDFs de NF que nenhum .txt usou a tempo e os tira do índice.
+
+    Só vão para a pasta Lixo se isso foi pedido em configurar_pdfs_orfaos;
+    senão, continuam no diretório esperando a remessa.
+
+    Args:
+        indice_persistente: IndiceChassisPersistente da execução
+        pdfs_sem_remessa: Caminhos dos PDFs de NF que ficaram no diretório
+        plano: PlanoOrganizacao da execução
+        alertas: Conjunto de alertas já enviados (ver _alertas_vigentes)
+        mensagem_erro: Lista para armazenar mensagens de erro
+    """
+    dias = _indice_chassis_persistente.dias_pdf_orfao
+    if not dias:
+        return
+    orfaos = indice_persistente.orfaos(pdfs_sem_remessa, dias)
+    if not orfaos:
+        return
+
+    mover = _indice_chassis_persistente.mover_pdfs_orfaos
+    novos = [
+        (caminho_pdf, dias_sem_remessa)
+        for caminho_pdf, dias_sem_remessa in orfaos
+        if _alerta_novo(alertas, "orfao",
+                        [indice_persistente.inventario[caminho_pdf]])
+    ]
+    if novos:
+        print(
+            f"\n⚠️{len(novos)} PDF(s) de NF sem nenhum .txt há mais de "
+            f"{dias} dia(s):"
+        )
+        for caminho_pdf, dias_sem_remessa in novos:
+            print(
+                f"  - {os.path.basename(caminho_pdf)} "
+                f"({dias_sem_remessa} dias)"
+            )
+        mensagem_erro.append(
+            f"{len(novos)} PDF(s) de NF sem nenhum .txt há mais de {dias} "
+            f"dia(s) {'foram movidos' if mover else 'continuam no diretório'}: "
+            f"<b>{', '.join(os.path.basename(c) for c, _ in novos)}</b>."
+        )
+    if not mover:
+        indice_persistente.descartar([caminho for caminho, _ in orfaos])
+        return
+    for caminho_pdf, _ in orfaos:
+        plano.mover_para_lixo(caminho_pdf)
+        plano.liberar(caminho_pdf)
+    print(f"❗PDFs sem remessa movidos para a pasta Lixo: {len(orfaos)}")
+
+
+def inventario_atual(diretorio_base):
+    """Arquivos que a última execução terminada deixou no diretório.
+
+    Args:
+        diretorio_base: Diretório de entrada
+
+    Returns:
+        Dicionário {caminho: TriagemArquivo}, vazio se nenhuma execução
+        terminou desde a última falha
+    """
+    return _inventarios.get(diretorio_base, {})
+
+
+def _alertas_vigentes(diretorio_base, triagem):
+    """Alertas já enviados para arquivos que continuam iguais no diretório.
+
+    Alertas de arquivos que saíram do diretório ou mudaram são esquecidos:
+    se o arquivo voltar (ou for substituído), o alerta é enviado de novo.
+
+    Args:
+        diretorio_base: Diretório da execução
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+
+    Returns:
+        Conjunto de alertas do diretório, atualizado por _alerta_novo
+    """
+    def vigente(versao):
+        arquivo = triagem.get(versao[0])
+        return (
+            arquivo is not None
+            and (arquivo.tamanho, arquivo.mtime_ns) == versao[1:]
+        )
+
+    alertas = _alertas_enviados.setdefault(diretorio_base, set())
+    for alerta in list(alertas):
+        if not all(vigente(versao) for versao in alerta[1]):
+            alertas.discard(alerta)
+    return alertas
+
+
+def _alerta_novo(alertas, tipo, arquivos):
+    """Registra um alerta e diz se ele ainda não tinha sido enviado.
+
+    Args:
+        alertas: Conjunto de alertas já enviados (ver _alertas_vigentes)
+        tipo: Tipo do alerta
+        arquivos: Lista de TriagemArquivo a que o alerta se refere
+
+    Returns:
+        True se o alerta deve ser enviado
+    """
+    alerta = (tipo, tuple(
+        (arquivo.caminho, arquivo.tamanho, arquivo.mtime_ns)
+        for arquivo in arquivos
+    ))
+    if alerta in alertas:
+        return False
+    alertas.add(alerta)
+    return True
+
+
+def _descrever_entradas(plano, decididos, triagem):
+    """Hash dos arquivos de cada operação decidida, para o registro.
+
+    Args:
+        plano: PlanoOrganizacao da execução (ainda não executado)
+        decididos: Lista de caminhos dos .txt decididos na execução
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+
+    Returns:
+        Dicionário {caminho do .txt: {nome do arquivo: hash}}
+    """
+    entradas = {caminho_txt: {} for caminho_txt in decididos}
+    for movimento in plano.movimentos:
+        # JSON gerados pelo plano não estão no inventário
+        if movimento.grupo in entradas and movimento.origem in triagem:
+            arquivo = triagem[movimento.origem]
+            entradas[movimento.grupo][arquivo.nome] = arquivo.hash
+    return entradas
+
+
+def _filtrar_pdfs_nf(arquivos_pdf, triagem):
+    """Separa os PDFs de nota fiscal que podem ser lidos.
+
+    Args:
+        arquivos_pdf: Lista de caminhos para arquivos PDF
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+
+    Returns:
+        Lista de caminhos dos PDFs que não são via negociável e estão
+        dentro do limite de tamanho
+    """
+    return [
+        pdf for pdf in arquivos_pdf
+        if not (triagem[pdf].via_negociavel or triagem[pdf].acima_do_limite)
+    ]
+
+
+def _avisar_pdfs_duplicados(duplicados, triagem, alertas, mensagem_erro):
+    """Avisa sobre PDFs que chegaram com o mesmo conteúdo e nomes diferentes.
+
+    Args:
+        duplicados: Dicionário {representante: [cópias]}
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+        alertas: Conjunto de alertas já enviados (ver _alertas_vigentes)
+        mensagem_erro: Lista para armazenar mensagens de erro
+    """
+    for representante, copias in duplicados.items():
+        if not _alerta_novo(alertas, "duplicados", [
+            triagem[caminho] for caminho in [representante, *copias]
+        ]):
             continue
+        nomes = ", ".join(
+            triagem[caminho].nome for caminho in [representante, *copias]
+        )
+        print(f"⚠️PDFs com conteúdo idêntico (lidos uma única vez): {nomes}")
+        mensagem_erro.append(
+            f"PDFs com conteúdo idêntico no diretório: <b>{nomes}</b>."
+        )
+
 
-        # print(chassis_encontrados)
-        # Verifica quais chassis esperados não foram encontrados
-        chassis_esperados = {d["CHASSI"] for d in dados_chassis}
-        faltando = chassis_esperados - chassis_encontrados
-        if faltando:
+def _isolar_pdfs_com_falha(falhas_extracao, arquivos_pdf, plano,
+                           mensagem_erro):
+    """Move para a pasta Lixo os PDFs cuja extração travou ou falhou.
+
+    Args:
+        falhas_extracao: Lista de FalhaExtracao (caminho e motivo)
+        arquivos_pdf: Lista de caminhos para arquivos PDF
+        plano: PlanoOrganizacao da execução
+        mensagem_erro: Lista para armazenar mensagens de erro
+    """
+    for caminho_pdf, motivo in falhas_extracao:
+        nome_pdf = os.path.basename(caminho_pdf)
+        print(
+            f'⚠️A extração do PDF "{nome_pdf}" falhou ({motivo}). '
+            f'NOTIFICAR IC 😱 *****NOTIFICAR IC*****'
+        )
+        mensagem_erro.append(
+            f'A extração do PDF "{nome_pdf}" falhou ({motivo}). '
+            f'O .pdf foi movido: <b>{nome_pdf}</b>.'
+        )
+        if caminho_pdf in arquivos_pdf:
+            arquivos_pdf.remove(caminho_pdf)
+        plano.mover_para_lixo(caminho_pdf)
+        plano.liberar(caminho_pdf)
+        print(f"❗PDF com falha na extração movido para a pasta Lixo: {nome_pdf}")
+
+
+def _descrever_veredito(veredito):
+    """Descreve as medidas que levaram o texto de um PDF a ser recusado.
+
+    Args:
+        veredito: VereditoPdf do PDF
+
+    Returns:
+        String com o percentual de palavras reconhecidas e, se for o caso,
+        a presença do caractere de substituição
+    """
+    if veredito.percentual_reconhecido is None:
+        return "não foi possível ler o texto"
+    descricao = (
+        f"{veredito.percentual_reconhecido:.1f}% de palavras reconhecidas"
+    )
+    if veredito.caractere_substituicao:
+        descricao += ", com caracteres inválidos"
+    return descricao
+
+
+def _descrever_paginas(chassis):
+    """Descreve os chassis encontrados com a página de cada um.
+
+    Args:
+        chassis: Dicionário {chassi: página} (página None se desconhecida)
+
+    Returns:
+        Lista de textos no formato "CHASSI (pág. N)"
+    """
+    return [
+        f"{chassi} (pág. {pagina})" if pagina else chassi
+        for chassi, pagina in chassis.items()
+    ]
+
+
+def _validar_dados_txt(dados_chassis, nome_txt, caminho_txt, plano,
+                       mensagem_erro):
+    """Valida os dados extraídos do arquivo TXT.
+
+    Todas as violações são informadas de uma vez, agrupadas por campo e
+    motivo, e o relatório completo é salvo em JSON junto do .txt na pasta
+    Lixo, para que a remessa possa ser corrigida em uma única rodada.
+
+    Args:
+        dados_chassis: Lista de registros (RegistroRemessa) dos chassis
+        nome_txt: Nome do arquivo TXT
+        caminho_txt: Caminho completo do arquivo TXT
+        plano: PlanoOrganizacao da execução
+        mensagem_erro: Lista para armazenar mensagens de erro
+
+    Returns:
+        True se houve erro na validação, False caso contrário
+    """
+    relatorio = validar_remessa(dados_chassis)
+    if relatorio.valido:
+        return False
+
+    grupos = {}
+    for violacao in relatorio:
+        grupos.setdefault((violacao.campo, violacao.motivo), []).append(
+            violacao.chassi or f"registro {violacao.registro}"
+        )
+    problemas = []
+    for (campo, motivo), chassis in grupos.items():
+        exemplos = ", ".join(chassis[:5])
+        if len(chassis) > 5:
+            exemplos += f" e mais {len(chassis) - 5}"
+        problemas.append(f"{campo.lower()}: {motivo} ({exemplos})")
+
+    print(
+        f"⚠️{len(relatorio)} problema(s) nos campos do .txt {nome_txt}:"
+    )
+    for problema in problemas:
+        print(f"  - {problema}")
+    mensagem_erro.append(
+        f"{len(relatorio)} problema(s) nos campos do .txt {nome_txt}: "
+        f"{'; '.join(problemas)}. O .txt foi movido: <b>{nome_txt}</b>"
+    )
+
+    destino_txt = plano.mover_para_lixo(caminho_txt)
+    plano.gravar_json(
+        [violacao._asdict() for violacao in relatorio],
+        f"{destino_txt}_validacao.json",
+        grupo=caminho_txt,
+    )
+    print(f"❗Txt com campos inválidos movido para a pasta Lixo: {nome_txt}")
+    return True
+
+
+def _processar_via_negociavel(vias_negociaveis, triagem, op_num,
+                              arquivos_para_mover, nome_txt, caminho_txt,
+                              plano, mensagem_erro):
+    """Processa a via negociável nos arquivos PDF.
+
+    Args:
+        vias_negociaveis: IndiceViasNegociaveis da execução
+        triagem: Dicionário {caminho: TriagemArquivo} da execução
+        op_num: Número da operação
+        arquivos_para_mover: Conjunto de arquivos para mover
+        nome_txt: Nome do arquivo TXT
+        caminho_txt: Caminho completo do arquivo TXT
+        plano: PlanoOrganizacao da execução
+        mensagem_erro: Lista para armazenar mensagens de erro
+
+    Returns:
+        True se houve erro no processamento, False caso contrário
+    """
+    print("Vai encontrar a Via Negociável...")
+    pdf_path = vias_negociaveis.reivindicar(op_num)
+
+    if pdf_path is None:
+        print(
+            f"⚠️Via Negociável não encontrada pelo número da operação "
+            f"{op_num}. NOTIFICAR IC 😱 *****NOTIFICAR IC*****"
+        )
+        mensagem_erro.append(
+            f"Via Negociável não encontrada pelo número da operação {op_num}. "
+            f"O .txt foi movido: <b>{nome_txt}</b>."
+        )
+        arquivos_para_mover.remove(caminho_txt)
+        print('Movendo o .txt para a pasta "Lixo"')
+        plano.mover_para_lixo(caminho_txt)
+        print(f"❗Txt sem a Via Negociável movido para a pasta Lixo: {nome_txt}")
+        return True
+
+    nome_pdf = triagem[pdf_path].nome
+    arquivos_para_mover.add(pdf_path)
+    print(f"  -> ✅Via Negociável encontrada: {nome_pdf}")
+
+    if triagem[pdf_path].acima_do_limite:
+        print(
+            f'⚠️O PDF "{nome_pdf}" tem mais de '
+            f'{LIMITE_TAMANHO_PDF_MB}MB. '
+            f'NOTIFICAR IC 😱 *****NOTIFICAR IC*****'
+        )
+        mensagem_erro.append(
+            f'O PDF "{nome_pdf}" tem mais de {LIMITE_TAMANHO_PDF_MB}MB. '
+            f'O .txt foi movido: <b>{nome_txt}</b>.'
+        )
+        print('Movendo o .txt para a pasta "Lixo"')
+        plano.mover_para_lixo(caminho_txt)
+        print(
+            f"❗Txt com Via Negociável maior que 10MB "
+            f"movido para a pasta Lixo: {nome_txt}"
+        )
+        return True
+
+    return False
+
+
+def _processar_resultados_pdf(resultados_pdf, arquivos_para_mover,
+                              arquivos_pdf, nome_txt, caminho_txt,
+                              plano, mensagem_erro):
+    """Processa os resultados da análise dos PDFs.
+
+    Args:
+        resultados_pdf: Lista de resultados da análise dos PDFs
+        arquivos_para_mover: Conjunto de arquivos para mover
+        arquivos_pdf: Lista de caminhos para arquivos PDF
+        nome_txt: Nome do arquivo TXT
+        caminho_txt: Caminho completo do arquivo TXT
+        plano: PlanoOrganizacao da execução
+        mensagem_erro: Lista para armazenar mensagens de erro
+
+    Returns:
+        True se houve erro no processamento, False caso contrário
+    """
+    print("Vai procurar os chassis...")
+    pdf_com_erro_extracao = False
+
+    for caminho_pdf, chassis in resultados_pdf:
+        veredito = obter_veredito_pdf(caminho_pdf)
+        if veredito.codificado:
+            nome_pdf_erro = os.path.basename(caminho_pdf)
             print(
-                f"  ⚠️Chassis {faltando} do .txt {nome_txt} não encontrados nos .pdf🤦‍♀️*****NOTIFICAR IC*****"
+                f'  ⚠️ A extração de texto do PDF "{nome_pdf_erro}" falhou '
+                f'(texto codificado, {_descrever_veredito(veredito)}). '
+                f'NOTIFICAR IC 😱 *****NOTIFICAR IC*****'
             )
-            # add mensagem na lista
             mensagem_erro.append(
-                f"Chassis {faltando} do .txt {nome_txt} não encontrados nos .pdf"
+                f'A extração de texto do PDF "{nome_pdf_erro}" falhou '
+                f'(texto codificado). O .txt foi movido: <b>{nome_txt}</b>.'
             )
-            print(f'Movendo o .txt para a pasta "Lixo"')
-            # move o .txt pasta Lixo
-            shutil.move(caminho_txt, pasta_lixo)
-            print(f"❗Txt movido para a pasta Lixo: {nome_txt}")
-            continue
+            pdf_com_erro_extracao = True
+            arquivos_pdf.remove(caminho_pdf)
+            break
 
-        # Se tiver mais de um arquivo relacionado, move para uma nova pasta
-        if len(arquivos_para_mover) > 1:
-            # nome_devedor = dados_chassis[0]["NUMERO_OPERACAO"].replace(" ", "_").replace("/", "")# Normaliza nome: sem acento, minúsculo, sem espaços
-            # nova_pasta = f"{op_num}_{nome_devedor}" # Nome da nova pasta
-            nova_pasta = f"{op_num}"
-            # Caminho da nova pasta
-            destino = os.path.join(diretorio_base, nova_pasta)
-            os.makedirs(destino, exist_ok=True)  # Cria a nova pasta
-
-            for arq in arquivos_para_mover:
-                try:
-                    shutil.move(arq, os.path.join(
-                        destino, os.path.basename(arq)))
-                except Exception as e:
-                    print(f"[Erro ao mover] {arq}: {e}")
-
-            print(f"Vai salvar os dados extraídos do .txt em JSON...")
-            # Salva os dados extraídos do .txt em JSON
-            with open(
-                os.path.join(destino, f"{op_num}_dados_extraidos.json"),
-                "w",
-                encoding="utf-8",
-            ) as f:  # Salva os dados em um arquivo JSON
-                json.dump(
-                    dados_chassis, f, indent=4, ensure_ascii=False
-                )  # Para melhor visualização, sem acentos e sem espaços
+        if chassis:
+            arquivos_para_mover.add(caminho_pdf)
             print(
-                f"  -> ✅Dados extraídos do .txt salvos no JSON: {nova_pasta}")
-        else:
-            print("  -> ❗Nenhum arquivo adicional encontrado.")
+                f"  -> Chassis {_descrever_paginas(chassis)} em "
+                f"{os.path.basename(caminho_pdf)}"
+            )
 
-        print(f"--- Fim do processamento do .txt: {nome_txt} ---")
+    if pdf_com_erro_extracao:
+        print(
+            'Movendo o .txt para a pasta "Lixo" devido à falha na '
+            'extração do PDF.'
+        )
+        plano.mover_para_lixo(caminho_txt)
+        print(f"❗Txt movido para a pasta Lixo: {nome_txt}")
+        return True
 
-    return mensagem_erro
+    return False
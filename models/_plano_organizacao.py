@@ -0,0 +1,506 @@
+"""Módulo com o plano de movimentações do organizador e o seu diário."""
+
+import json
+import os
+import shutil
+import threading
+import uuid
+from collections import namedtuple
+
+from models._esteira import EstagioConsumidor
+from models._interrupcao import interrupcao_solicitada
+from models._transferir_arquivos import (
+    executor_transferencias,
+    mover_arquivo,
+    sincronizar_pastas,
+)
+
+# Diário (append-only) das movimentações, dentro da pasta _Cache
+NOME_DIARIO = "diario_organizacao.jsonl"
+
+# Pasta, dentro da _Cache, dos JSON gerados antes de irem para o destino
+NOME_PASTA_TEMPORARIA = "plano"
+
+# Operações (grupos de movimentos) executadas ao mesmo tempo
+LIMITE_OPERACOES_SIMULTANEAS = 4
+
+# Operações liberadas que esperam execução antes de liberar() bloquear
+LIMITE_OPERACOES_NA_FILA = 2 * LIMITE_OPERACOES_SIMULTANEAS
+
+# Uma movimentação do plano. Movimentos do mesmo grupo (uma operação) são
+# executados juntos: se um falhar, os já feitos do grupo são desfeitos
+Movimento = namedtuple("Movimento", ["grupo", "origem", "destino"])
+
+# Movimento que falhou e fez o seu grupo ser desfeito
+FalhaMovimento = namedtuple("FalhaMovimento", ["grupo", "origem", "erro"])
+
+# As operações anotam no mesmo diário a partir de threads diferentes
+_lock_diario = threading.Lock()
+
+# Resultado de um grupo que não chegou a começar por causa de uma interrupção
+_ADIADO = object()
+
+
+class PlanoOrganizacao:
+    """Plano completo das movimentações de uma execução.
+
+    As decisões do organizador acrescentam movimentos ao plano e, quando a
+    decisão de um grupo termina, liberar() o entrega ao estágio de
+    execução: os JSON do grupo são gravados e os arquivos movidos em
+    segundo plano, enquanto o organizador decide as próximas operações.
+    executar() libera os grupos que faltarem e espera o fim de todos. Cada
+    grupo é gravado no diário antes do primeiro movimento e cada movimento
+    feito também é anotado, então uma execução interrompida pode ser
+    retomada por recuperar_diario.
+
+    Cada arquivo só pode ter um movimento no plano: quem decide a qual
+    operação ele pertence é o organizador, antes de planejar. Por isso os
+    grupos não disputam arquivos e são executados em paralelo.
+
+    Se a execução receber um pedido de interrupção, os grupos em andamento
+    terminam e os que ainda não começaram são adiados: nenhum arquivo deles
+    é movido e a próxima execução os decide de novo. Grupos liberados
+    depois da interrupção (decididos antes dela) são sempre executados.
+
+    Um erro inesperado em um grupo vira uma FalhaMovimento desse grupo e os
+    demais continuam; se o grupo já estava no diário, o diário é mantido
+    para a próxima execução terminá-lo ou desfazê-lo.
+    """
+
+    def __init__(self, pasta_lixo, diretorio_cache, inventario=None):
+        """Cria um plano vazio.
+
+        Args:
+            pasta_lixo: Caminho da pasta para arquivos rejeitados
+            diretorio_cache: Pasta _Cache, onde ficam o diário e os JSON
+                             ainda não movidos
+            inventario: Dicionário {caminho: TriagemArquivo} da execução,
+                        de onde vem o hash para conferir cópias
+        """
+        self.id = uuid.uuid4().hex
+        self.pasta_lixo = pasta_lixo
+        self.diretorio_cache = diretorio_cache
+        self.inventario = inventario or {}
+        self.movimentos = []
+        self.adiados = []
+        self._destinos = set()
+        self._origens = {}
+        self._grupos = {}
+        self._liberados = set()
+        self._conteudos_json = {}
+        self._estagio = None
+        self._diario = None
+        self._diario_pendente = False
+
+    def mover(self, origem, pasta_destino, grupo=None):
+        """Planeja mover um arquivo para uma pasta, mantendo o nome.
+
+        Args:
+            origem: Caminho do arquivo
+            pasta_destino: Pasta de destino (criada na execução)
+            grupo: Operação à qual o movimento pertence (padrão: o arquivo)
+
+        Returns:
+            Caminho de destino do arquivo
+        """
+        destino = os.path.join(pasta_destino, os.path.basename(origem))
+        self._adicionar(origem, destino, grupo)
+        return destino
+
+    def mover_para_lixo(self, origem, grupo=None):
+        """Planeja mover um arquivo para a pasta Lixo sem sobrescrever outro.
+
+        Se já houver um arquivo com o mesmo nome no Lixo, o novo ganha um
+        sufixo " (N)".
+
+        Args:
+            origem: Caminho do arquivo
+            grupo: Operação à qual o movimento pertence (padrão: o arquivo)
+
+        Returns:
+            Caminho de destino do arquivo
+        """
+        raiz, extensao = os.path.splitext(os.path.basename(origem))
+        destino = os.path.join(self.pasta_lixo, raiz + extensao)
+        contador = 1
+        while destino in self._destinos or os.path.exists(destino):
+            destino = os.path.join(
+                self.pasta_lixo, f"{raiz} ({contador}){extensao}"
+            )
+            contador += 1
+        self._adicionar(origem, destino, grupo)
+        return destino
+
+    def gravar_json(self, dados, destino, grupo=None):
+        """Planeja gravar um JSON na pasta temporária e movê-lo ao destino.
+
+        O arquivo temporário é gravado pelo estágio de execução, junto com
+        os movimentos do grupo.
+
+        Args:
+            dados: Conteúdo serializável em JSON
+            destino: Caminho final do arquivo JSON
+            grupo: Operação à qual o arquivo pertence
+        """
+        pasta = os.path.join(self.diretorio_cache, NOME_PASTA_TEMPORARIA)
+        os.makedirs(pasta, exist_ok=True)
+        temporario = os.path.join(
+            pasta, f"{self.id}_{len(self.movimentos)}.json"
+        )
+        self._conteudos_json[temporario] = dados
+        self._adicionar(temporario, destino, grupo)
+
+    def destino_de(self, origem):
+        """Destino planejado de um arquivo.
+
+        Args:
+            origem: Caminho do arquivo
+
+        Returns:
+            Caminho de destino ou None se o arquivo não está no plano
+        """
+        return self._origens.get(origem)
+
+    def liberar(self, grupo):
+        """Entrega um grupo já decidido ao estágio de execução.
+
+        Volta logo, a não ser que a fila do estágio esteja cheia; nesse caso
+        espera até uma operação terminar. Grupos sem movimentos ou já
+        liberados são ignorados.
+
+        Args:
+            grupo: Operação (grupo de movimentos) decidida
+        """
+        if grupo in self._liberados or grupo not in self._grupos:
+            return
+        self._liberados.add(grupo)
+        if self._estagio is None:
+            print("\nExecutando as operações conforme são decididas...")
+            os.makedirs(self.diretorio_cache, exist_ok=True)
+            self._diario = open(
+                os.path.join(self.diretorio_cache, NOME_DIARIO), "a",
+                encoding="utf-8",
+            )
+            self._estagio = EstagioConsumidor(
+                self._executar_liberado,
+                workers=LIMITE_OPERACOES_SIMULTANEAS,
+                limite_fila=LIMITE_OPERACOES_NA_FILA,
+                nome="operacao",
+            )
+        movimentos = self._grupos[grupo]
+        conteudos = {
+            movimento.origem: self._conteudos_json.pop(movimento.origem)
+            for movimento in movimentos
+            if movimento.origem in self._conteudos_json
+        }
+        # Liberado depois da interrupção: a decisão veio antes dela
+        self._estagio.enviar(
+            grupo, movimentos, conteudos, not interrupcao_solicitada()
+        )
+
+    def executar(self, liberar_restantes=True):
+        """Libera os grupos restantes e espera a execução de todos.
+
+        Os grupos adiados por um pedido de interrupção ficam em
+        self.adiados.
+
+        Args:
+            liberar_restantes: Se False, só espera os grupos já liberados;
+                               os demais não são movidos (decisão que não
+                               terminou)
+
+        Returns:
+            Lista de FalhaMovimento, na ordem em que os grupos foram
+            liberados (vazia se tudo deu certo)
+        """
+        if liberar_restantes:
+            for grupo in list(self._grupos):
+                self.liberar(grupo)
+        if self._estagio is None:
+            return []
+        print(
+            f"\nConcluindo o plano: {len(self.movimentos)} "
+            f"movimentação(ões)..."
+        )
+        try:
+            resultados = self._estagio.encerrar()
+        finally:
+            self._diario.close()
+        self.adiados = [
+            grupo for grupo, resultado in resultados.items()
+            if resultado is _ADIADO
+        ]
+        falhas = [
+            falha for falha in resultados.values()
+            if isinstance(falha, FalhaMovimento)
+        ]
+
+        for falha in falhas:
+            print(f"[Erro ao mover] {falha.origem}: {falha.erro}")
+        if self.adiados:
+            print(
+                f"⏸️{len(self.adiados)} operação(ões) adiada(s) para a "
+                f"próxima execução."
+            )
+        if self._diario_pendente:
+            print(
+                "⚠️Operação interrompida por erro: a próxima execução "
+                "termina ou desfaz o que ficou no diário."
+            )
+        else:
+            _encerrar_diario(self.diretorio_cache)
+        return falhas
+
+    def _executar_liberado(self, movimentos, conteudos, pode_adiar):
+        """Executa um grupo liberado (roda nas threads do estágio).
+
+        Os JSON do grupo são gravados e o grupo vira um plano próprio no
+        diário antes do primeiro movimento.
+
+        Args:
+            movimentos: Movimentos do grupo, na ordem do plano
+            conteudos: Dicionário {arquivo temporário: dados do JSON}
+            pode_adiar: False se o grupo foi liberado depois da interrupção
+
+        Returns:
+            _ADIADO se o grupo não começou; senão, o retorno de
+            _executar_grupo ou a FalhaMovimento de um erro inesperado
+        """
+        if pode_adiar and interrupcao_solicitada():
+            return _ADIADO
+        no_diario = False
+        try:
+            for temporario, dados in conteudos.items():
+                with open(temporario, "w", encoding="utf-8") as f:
+                    json.dump(dados, f, indent=4, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            id_grupo = uuid.uuid4().hex
+            for passo, movimento in enumerate(movimentos):
+                _anotar(self._diario, {
+                    "plano": id_grupo, "passo": passo, **movimento._asdict()
+                }, sincronizar=False)
+            _anotar(
+                self._diario, {"plano": id_grupo, "planejado": len(movimentos)}
+            )
+            no_diario = True
+            falha = _executar_grupo(
+                self._diario, id_grupo, list(range(len(movimentos))),
+                movimentos, inventario=self.inventario,
+            )
+            _anotar(self._diario, {"plano": id_grupo, "concluido": True})
+        except Exception as e:
+            # Sem o "concluido", a próxima execução retoma o grupo
+            if no_diario:
+                self._diario_pendente = True
+            return FalhaMovimento(
+                movimentos[0].grupo, movimentos[0].origem,
+                f"{type(e).__name__}: {e}",
+            )
+        return falha
+
+    def _adicionar(self, origem, destino, grupo):
+        """Acrescenta um movimento ao plano."""
+        grupo = grupo or origem
+        if origem in self._origens:
+            raise ValueError(f"Arquivo já tem destino no plano: {origem}")
+        if grupo in self._liberados:
+            raise ValueError(f"Grupo já liberado para execução: {grupo}")
+        self._origens[origem] = destino
+        self._destinos.add(destino)
+        movimento = Movimento(grupo, origem, destino)
+        self.movimentos.append(movimento)
+        self._grupos.setdefault(grupo, []).append(movimento)
+
+
+def recuperar_diario(diretorio_cache):
+    """Retoma ou desfaz os planos que uma execução anterior não terminou.
+
+    Um plano que não chegou a ser gravado por inteiro não moveu nada e é
+    descartado. Nos demais, cada grupo é retomado do ponto em que parou; se
+    um arquivo do grupo não existir mais, o grupo é desfeito, para que a
+    pasta da operação não fique só com parte dos arquivos.
+
+    Args:
+        diretorio_cache: Pasta _Cache da execução
+
+    Returns:
+        Quantidade de planos retomados
+    """
+    caminho_diario = os.path.join(diretorio_cache, NOME_DIARIO)
+    if not os.path.exists(caminho_diario):
+        _encerrar_diario(diretorio_cache)
+        return 0
+
+    planos = {}
+    with open(caminho_diario, encoding="utf-8") as diario:
+        for linha in diario:
+            try:
+                registro = json.loads(linha)
+            except ValueError:
+                continue  # Última linha cortada pela interrupção
+            plano = planos.setdefault(registro["plano"], {
+                "movimentos": {}, "planejado": False, "concluido": False,
+                "feitos": set(), "desfeitos": set(),
+            })
+            if "passo" in registro:
+                plano["movimentos"][registro["passo"]] = Movimento(
+                    registro["grupo"], registro["origem"], registro["destino"]
+                )
+            elif "planejado" in registro:
+                plano["planejado"] = True
+            elif "feito" in registro:
+                plano["feitos"].add(registro["feito"])
+            elif "desfeito" in registro:
+                plano["desfeitos"].add(registro["desfeito"])
+            elif registro.get("concluido"):
+                plano["concluido"] = True
+
+    retomados = 0
+    with open(caminho_diario, "a", encoding="utf-8") as diario:
+        for id_plano, plano in planos.items():
+            if plano["concluido"] or not plano["planejado"]:
+                continue
+            print(
+                f"⚠️Retomando plano interrompido de uma execução anterior: "
+                f"{id_plano}"
+            )
+            movimentos = [
+                plano["movimentos"][passo]
+                for passo in sorted(plano["movimentos"])
+            ]
+            for passos in _agrupar(movimentos).values():
+                feitos = [p for p in passos if p in plano["feitos"]]
+                if any(p in plano["desfeitos"] for p in passos):
+                    # A interrupção foi no meio de um desfazer: termina-o
+                    _desfazer(diario, id_plano, [
+                        p for p in feitos if p not in plano["desfeitos"]
+                    ], movimentos)
+                    continue
+                falha = _executar_grupo(
+                    diario, id_plano, passos, movimentos, feitos,
+                    retomada=True,
+                )
+                if falha is not None:
+                    print(f"[Erro ao mover] {falha.origem}: {falha.erro}")
+            _anotar(diario, {"plano": id_plano, "concluido": True})
+            retomados += 1
+
+    _encerrar_diario(diretorio_cache)
+    return retomados
+
+
+def _agrupar(movimentos):
+    """Índices dos movimentos por grupo, na ordem em que aparecem."""
+    grupos = {}
+    for passo, movimento in enumerate(movimentos):
+        grupos.setdefault(movimento.grupo, []).append(passo)
+    return grupos
+
+
+def _executar_grupo(diario, id_plano, passos, movimentos, feitos=(),
+                    inventario=None, retomada=False):
+    """Executa os movimentos de um grupo, desfazendo-o se algum falhar.
+
+    Os movimentos rodam no pool de transferências; o último do grupo (o
+    JSON da operação) só depois que todos os outros deram certo. As pastas
+    envolvidas recebem um único fsync e só então os movimentos são anotados
+    no diário. Na retomada de um diário, um movimento ainda não anotado
+    cuja origem sumiu e cujo destino existe é tratado como feito (a
+    interrupção foi entre mover e anotar); numa execução normal, é falha.
+
+    Args:
+        retomada: True quando chamado por recuperar_diario
+
+    Returns:
+        FalhaMovimento se o grupo foi desfeito, None se deu certo
+    """
+    feitos = list(feitos)
+    pendentes = [passo for passo in passos if passo not in feitos]
+    if not pendentes:
+        return None
+    inventario = inventario or {}
+
+    def transferir(passo):
+        origem, destino = movimentos[passo].origem, movimentos[passo].destino
+        arquivo = inventario.get(origem)
+        return executor_transferencias().submit(
+            mover_arquivo, origem, destino,
+            (lambda: arquivo.hash) if arquivo is not None else None,
+        )
+
+    concluidos = []
+    falha = None
+    *primeiros, ultimo = pendentes
+    etapas = [{passo: transferir(passo) for passo in primeiros}, {ultimo: None}]
+    for etapa in etapas:
+        for passo, futuro in etapa.items():
+            origem, destino = movimentos[passo].origem, movimentos[passo].destino
+            try:
+                (futuro or transferir(passo)).result()
+            except OSError as e:
+                ja_movido = (
+                    retomada
+                    and isinstance(e, FileNotFoundError)
+                    and os.path.exists(destino)
+                )
+                if not ja_movido:
+                    falha = falha or (origem, e)
+                    continue
+            concluidos.append(passo)
+        if falha:
+            break
+
+    sincronizar_pastas(
+        os.path.dirname(caminho)
+        for passo in concluidos
+        for caminho in (movimentos[passo].origem, movimentos[passo].destino)
+    )
+    for passo in concluidos:
+        _anotar(diario, {"plano": id_plano, "feito": passo}, sincronizar=False)
+    _sincronizar(diario)
+    feitos.extend(concluidos)
+
+    if falha:
+        _desfazer(diario, id_plano, feitos, movimentos)
+        return FalhaMovimento(movimentos[passos[0]].grupo, *falha)
+    return None
+
+
+def _desfazer(diario, id_plano, feitos, movimentos):
+    """Devolve os arquivos dos movimentos feitos para a origem."""
+    for passo in reversed(feitos):
+        origem, destino = movimentos[passo].origem, movimentos[passo].destino
+        try:
+            if os.path.exists(destino) and not os.path.exists(origem):
+                mover_arquivo(destino, origem)
+        except OSError as e:
+            print(f"[Erro ao desfazer] {destino}: {e}")
+        _anotar(diario, {"plano": id_plano, "desfeito": passo})
+
+
+def _anotar(diario, registro, sincronizar=True):
+    """Acrescenta um registro ao diário, garantindo a gravação em disco."""
+    with _lock_diario:
+        diario.write(json.dumps(registro, ensure_ascii=False) + "\n")
+    if sincronizar:
+        _sincronizar(diario)
+
+
+def _sincronizar(diario):
+    """Garante que o que foi escrito no diário está em disco."""
+    with _lock_diario:
+        diario.flush()
+        os.fsync(diario.fileno())
+
+
+def _encerrar_diario(diretorio_cache):
+    """Apaga o diário e os JSON temporários quando não há plano pendente."""
+    caminho_diario = os.path.join(diretorio_cache, NOME_DIARIO)
+    if os.path.exists(caminho_diario):
+        os.remove(caminho_diario)
+    shutil.rmtree(
+        os.path.join(diretorio_cache, NOME_PASTA_TEMPORARIA),
+        ignore_errors=True,
+    )
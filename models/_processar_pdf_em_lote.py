@@ -1,44 +1,285 @@
 """Módulo para processamento em lote de arquivos PDF."""
 
 import concurrent.futures
+import os
 
-from models._extrair_texto_do_pdf import extrair_texto_do_pdf
+from models import _extrair_texto_do_pdf
+from models._extracao_supervisionada import (
+    LIMITE_MEMORIA_PADRAO_MB,
+    TEMPO_LIMITE_PADRAO,
+    FalhaExtracao,
+    PoolSupervisionado,
+)
+from models._extrair_texto_do_pdf import (
+    VereditoPdf,
+    analisar_pdf,
+    esquecer_pdfs,
+    preparar_pdf,
+    registrar_veredito,
+)
+from models._interrupcao import interrupcao_solicitada
 
+# Backends de execução disponíveis para a extração
+BACKEND_THREADS = "threads"
+BACKEND_PROCESSOS = "processos"
 
-def processar_pdf_em_lote(arquivos_pdf, chassis_data):
+# Motor em uso durante a execução (configurado por configurar_motor_extracao)
+motor_extracao = None
+
+
+class MotorExtracao:
+    """Pool de extração de PDFs mantido vivo durante toda a execução.
+
+    O backend de threads compartilha os caches do processo principal, mas
+    não tem como interromper um PDF que trave o PyMuPDF. O de processos
+    distribui o trabalho entre vários núcleos em um pool supervisionado,
+    com tempo limite por PDF e teto de memória por processo; cada processo
+    devolve apenas o resumo da análise (chassis encontrados, veredito de
+    texto codificado e nº de páginas), nunca o texto completo. Os tokens
+    candidatos e os trechos longos do PDF só atravessam o pipe quando quem
+    chama pede (com_tokens), para alimentar o índice persistente.
+
+    Se a execução receber um pedido de interrupção, os PDFs em andamento
+    terminam e os que ainda não começaram ficam de fora do resultado (sem
+    contar como falha).
+    """
+
+    def __init__(self, backend=BACKEND_THREADS, max_workers=None,
+                 tempo_limite=TEMPO_LIMITE_PADRAO,
+                 limite_memoria_mb=LIMITE_MEMORIA_PADRAO_MB):
+        """Cria o motor sem iniciar o pool (que é criado no primeiro uso).
+
+        Args:
+            backend: BACKEND_THREADS ou BACKEND_PROCESSOS
+            max_workers: Quantidade de workers (None usa o padrão do Python)
+            tempo_limite: Segundos permitidos para extrair cada PDF
+                          (só no backend de processos)
+            limite_memoria_mb: Teto de memória de cada processo, em MB
+                               (só no backend de processos)
+        """
+        if backend not in (BACKEND_THREADS, BACKEND_PROCESSOS):
+            raise ValueError(f"Backend de extração desconhecido: {backend}")
+        self.backend = backend
+        self.max_workers = max_workers
+        self.tempo_limite = tempo_limite
+        self.limite_memoria_mb = limite_memoria_mb
+        self._executor = None
+        self._pool = None
+        # PDFs que passaram pelos processos do pool atual (cada processo
+        # guarda o próprio cache em memória)
+        self._enviados = set()
+
+    def analisar(self, arquivos_pdf, chassis, falhas=None, com_tokens=False):
+        """Analisa os PDFs procurando os chassis.
+
+        Args:
+            arquivos_pdf: Lista de caminhos para arquivos PDF
+            chassis: Conjunto de chassis procurados, ou None para só
+                     extrair e classificar os PDFs (preparar_pdf)
+            falhas: Lista onde são registrados os PDFs que não puderam ser
+                    analisados (FalhaExtracao)
+            com_tokens: Se True, as análises trazem os tokens candidatos e
+                        os trechos longos (veja analisar_pdf)
+
+        Returns:
+            Lista de AnalisePdf, uma por PDF analisado com sucesso
+        """
+        if falhas is None:
+            falhas = []
+
+        if self.backend == BACKEND_PROCESSOS:
+            pool = self._obter_pool()
+            self._enviados.update(arquivos_pdf)
+            resultados, falhas_pool = pool.analisar(
+                arquivos_pdf, chassis, com_tokens
+            )
+            falhas.extend(falhas_pool)
+            for analise in resultados:
+                registrar_veredito(analise.caminho, *analise.veredito)
+            return resultados
+
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers
+            )
+        if chassis is None:
+            futuros = {
+                self._executor.submit(preparar_pdf, caminho_pdf): caminho_pdf
+                for caminho_pdf in arquivos_pdf
+            }
+        else:
+            futuros = {
+                self._executor.submit(
+                    analisar_pdf, caminho_pdf, chassis, com_tokens
+                ): caminho_pdf
+                for caminho_pdf in arquivos_pdf
+            }
+        resultados = []
+        for futuro in concurrent.futures.as_completed(futuros):
+            if interrupcao_solicitada():
+                for pendente in futuros:
+                    pendente.cancel()
+            if futuro.cancelled():
+                continue
+            try:
+                resultados.append(futuro.result())
+                if chassis is None:
+                    registrar_veredito(
+                        futuros[futuro], *resultados[-1].veredito
+                    )
+            except Exception as e:
+                falhas.append(
+                    FalhaExtracao(futuros[futuro], f"{type(e).__name__}: {e}")
+                )
+        return resultados
+
+    def aquecer(self):
+        """Deixa o pool de processos pronto antes do primeiro lote.
+
+        Só tem efeito no backend de processos.
+        """
+        if self.backend == BACKEND_PROCESSOS:
+            self._obter_pool().aquecer()
+
+    def esquecer_pdfs(self, caminhos):
+        """Descarta os resultados em memória de PDFs alterados ou removidos.
+
+        No backend de processos, se algum deles já passou pelo pool, os
+        processos são recriados no próximo uso, já que cada um guarda o seu
+        cache em memória.
+
+        Args:
+            caminhos: Caminhos dos PDFs
+        """
+        caminhos = set(caminhos)
+        esquecer_pdfs(caminhos)
+        if self._pool is not None and caminhos & self._enviados:
+            self._pool.fechar()
+            self._pool = None
+            self._enviados.clear()
+
+    def fechar(self):
+        """Encerra o pool de workers."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._pool is not None:
+            self._pool.fechar()
+            self._pool = None
+        self._enviados.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def _obter_pool(self):
+        """Cria o pool no primeiro uso, ou o recria se o cache em disco mudou."""
+        cache = _extrair_texto_do_pdf.cache_persistente
+        diretorio_cache = (
+            os.path.dirname(cache.caminho_banco) if cache is not None else None
+        )
+        if self._pool is not None and self._pool.diretorio_cache != diretorio_cache:
+            self._pool.fechar()
+            self._pool = None
+            self._enviados.clear()
+        if self._pool is None:
+            self._pool = PoolSupervisionado(
+                self.max_workers, self.tempo_limite, self.limite_memoria_mb,
+                diretorio_cache,
+            )
+        return self._pool
+
+
+def configurar_motor_extracao(backend=BACKEND_THREADS, max_workers=None,
+                              tempo_limite=TEMPO_LIMITE_PADRAO,
+                              limite_memoria_mb=LIMITE_MEMORIA_PADRAO_MB):
+    """Define o motor de extração usado por processar_pdf_em_lote.
+
+    Args:
+        backend: BACKEND_THREADS ou BACKEND_PROCESSOS
+        max_workers: Quantidade de workers (None usa o padrão do Python)
+        tempo_limite: Segundos permitidos para extrair cada PDF
+        limite_memoria_mb: Teto de memória de cada processo, em MB
+
+    Returns:
+        Instância de MotorExtracao em uso
+    """
+    global motor_extracao
+    if motor_extracao is not None:
+        motor_extracao.fechar()
+    motor_extracao = MotorExtracao(
+        backend, max_workers, tempo_limite, limite_memoria_mb
+    )
+    return motor_extracao
+
+
+def processar_pdf_em_lote(arquivos_pdf, chassis_data, falhas=None,
+                          analises=None):
     """Procura os arquivos PDF que contêm os chassis.
 
+    Usa o motor configurado por configurar_motor_extracao, ou um pool de
+    threads temporário se nenhum motor tiver sido configurado.
+
     Args:
         arquivos_pdf: Lista de caminhos para arquivos PDF
         chassis_data: Lista de dicionários contendo informações de chassis
+        falhas: Lista onde são registrados os PDFs que não puderam ser
+                analisados (FalhaExtracao)
+        analises: Lista onde são guardadas as AnalisePdf completas (com
+                  veredito, tokens candidatos e trechos longos); só com
+                  ela os tokens e trechos são devolvidos pelos workers
 
     Returns:
-        Lista de tuplas (caminho_pdf, chassis_encontrados)
+        Lista de tuplas (caminho_pdf, chassis_encontrados), em que
+        chassis_encontrados é um dicionário {chassi: página}
     """
-    resultados = []
     # Conjunto de chassis para facilitar a busca
     chassis_set = {d["CHASSI"] for d in chassis_data}
+    com_tokens = analises is not None
 
-    def verificar_pdf(caminho_pdf):
-        """Verifica se um chassi está no texto de um PDF.
+    if motor_extracao is not None:
+        resultados = motor_extracao.analisar(
+            arquivos_pdf, chassis_set, falhas, com_tokens
+        )
+    else:
+        with MotorExtracao() as motor:
+            resultados = motor.analisar(
+                arquivos_pdf, chassis_set, falhas, com_tokens
+            )
 
-        Args:
-            caminho_pdf: Caminho para o arquivo PDF
+    if analises is not None:
+        analises.extend(resultados)
+    return [(analise.caminho, analise.chassis) for analise in resultados]
 
-        Returns:
-            Tupla (caminho_pdf, conjunto_de_chassis_encontrados)
-        """
-        texto = extrair_texto_do_pdf(caminho_pdf)
-        chassi_encontrado = {c for c in chassis_set if c in texto}
-        return caminho_pdf, chassi_encontrado
-
-    # Executa a verificação em paralelo usando threads
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futuros = [
-            executor.submit(verificar_pdf, caminho_pdf) 
-            for caminho_pdf in arquivos_pdf
-        ]
-        for futuro in concurrent.futures.as_completed(futuros):
-            resultados.append(futuro.result())
 
-    return resultados
+def obter_veredito_pdf(caminho_pdf):
+    """Devolve o veredito de texto codificado de um PDF.
+
+    Normalmente o veredito já veio da análise do PDF. Se faltar, o PDF é
+    extraído pelo motor de extração (com o tempo limite e o teto de
+    memória do backend de processos), nunca direto no processo principal.
+
+    Args:
+        caminho_pdf: Caminho para o arquivo PDF
+
+    Returns:
+        VereditoPdf do PDF; um PDF que não pôde ser lido é tratado como
+        texto ilegível
+    """
+    veredito = _extrair_texto_do_pdf.vereditos_pdf.get(caminho_pdf)
+    if veredito is not None:
+        return veredito
+
+    falhas = []
+    if motor_extracao is not None:
+        resultados = motor_extracao.analisar([caminho_pdf], None, falhas)
+    else:
+        with MotorExtracao() as motor:
+            resultados = motor.analisar([caminho_pdf], None, falhas)
+    for falha in falhas:
+        print(f"[Erro PDF] {os.path.basename(falha.caminho)} - {falha.motivo}")
+    if resultados:
+        return resultados[0].veredito
+    return VereditoPdf(True)
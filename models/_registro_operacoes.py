@@ -0,0 +1,179 @@
+"""Módulo com o registro em disco das operações já organizadas."""
+
+import json
+import os
+import sqlite3
+import time
+from collections import namedtuple
+
+# Banco do registro, dentro da pasta _Cache
+NOME_REGISTRO = "registro_operacoes.sqlite3"
+
+# Resultados possíveis de uma operação
+RESULTADO_ORGANIZADA = "organizada"
+RESULTADO_REJEITADA = "rejeitada"
+
+# Etapas de uma execução, usadas no ponto de controle
+ETAPAS = {
+    "indexacao": "indexação dos PDFs",
+    "decisao": "decisão das operações",
+    "execucao": "movimentação dos arquivos",
+}
+
+# Operação concluída: entradas é o dicionário {nome do arquivo: hash}
+OperacaoRegistrada = namedtuple(
+    "OperacaoRegistrada",
+    [
+        "hash_txt", "op_num", "nome_txt", "resultado", "destino",
+        "entradas", "concluido_em",
+    ],
+)
+
+# Último ponto de controle de uma execução que não terminou; serve só para
+# avisar onde ela parou, a retomada vem do diário, do registro e do cache
+Progresso = namedtuple(
+    "Progresso", ["etapa", "concluidos", "total", "atualizado_em"]
+)
+
+# Se True, uma remessa idêntica a uma já organizada é organizada de novo
+# (definido por configurar_reprocessamento)
+reprocessar_organizadas = False
+
+
+def configurar_reprocessamento(reprocessar=False):
+    """Define o tratamento de um .txt idêntico a uma remessa já organizada.
+
+    Args:
+        reprocessar: Se True, o .txt é organizado de novo (reenvio
+                     intencional); senão, vai para o Lixo com um aviso
+    """
+    global reprocessar_organizadas
+    reprocessar_organizadas = reprocessar
+
+
+class RegistroOperacoes:
+    """Registro, mantido entre execuções, das operações concluídas.
+
+    Cada operação é identificada pelo hash do seu .txt e guarda o número
+    da operação, o resultado (organizada ou rejeitada), o destino do .txt e
+    o hash de cada arquivo movido. Uma remessa que já foi organizada não é
+    processada de novo, a não ser com configurar_reprocessamento. O
+    registro também guarda o ponto de controle da execução em andamento,
+    que só é apagado quando ela termina.
+    """
+
+    def __init__(self, diretorio_cache):
+        """Abre (ou cria) o banco do registro.
+
+        Args:
+            diretorio_cache: Pasta _Cache da execução
+        """
+        os.makedirs(diretorio_cache, exist_ok=True)
+        self.caminho_banco = os.path.join(diretorio_cache, NOME_REGISTRO)
+        self._conexao = sqlite3.connect(self.caminho_banco, timeout=30)
+        self._conexao.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS operacoes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                hash_txt TEXT NOT NULL,
+                op_num TEXT,
+                nome_txt TEXT NOT NULL,
+                resultado TEXT NOT NULL,
+                destino TEXT NOT NULL,
+                entradas TEXT NOT NULL,
+                concluido_em REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS operacoes_hash_txt
+                ON operacoes (hash_txt);
+            CREATE TABLE IF NOT EXISTS progresso (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                etapa TEXT NOT NULL,
+                concluidos INTEGER NOT NULL,
+                total INTEGER NOT NULL,
+                atualizado_em REAL NOT NULL
+            );
+            """
+        )
+        self._conexao.commit()
+
+    def registrar(self, operacoes):
+        """Grava operações concluídas, todas na mesma transação.
+
+        Args:
+            operacoes: Lista de OperacaoRegistrada (concluido_em é ignorado)
+        """
+        agora = time.time()
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT INTO operacoes (hash_txt, op_num, nome_txt, "
+                "resultado, destino, entradas, concluido_em) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        operacao.hash_txt, operacao.op_num, operacao.nome_txt,
+                        operacao.resultado, operacao.destino,
+                        json.dumps(operacao.entradas, ensure_ascii=False),
+                        agora,
+                    )
+                    for operacao in operacoes
+                ],
+            )
+
+    def obter_organizada(self, hash_txt):
+        """Busca a última vez em que uma remessa foi organizada.
+
+        Remessas rejeitadas não contam: a mesma remessa pode voltar junto
+        com os PDFs que faltavam.
+
+        Args:
+            hash_txt: Hash do conteúdo do .txt
+
+        Returns:
+            OperacaoRegistrada ou None se a remessa nunca foi organizada
+        """
+        linha = self._conexao.execute(
+            "SELECT hash_txt, op_num, nome_txt, resultado, destino, "
+            "entradas, concluido_em FROM operacoes "
+            "WHERE hash_txt = ? AND resultado = ? ORDER BY id DESC LIMIT 1",
+            (hash_txt, RESULTADO_ORGANIZADA),
+        ).fetchone()
+        if linha is None:
+            return None
+        *campos, entradas, concluido_em = linha
+        return OperacaoRegistrada(*campos, json.loads(entradas), concluido_em)
+
+    def salvar_progresso(self, etapa, concluidos, total):
+        """Grava o ponto de controle da execução em andamento.
+
+        Args:
+            etapa: Nome da etapa em que a execução está
+            concluidos: Itens da etapa já concluídos
+            total: Total de itens da etapa
+        """
+        with self._conexao:
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO progresso "
+                "(id, etapa, concluidos, total, atualizado_em) "
+                "VALUES (1, ?, ?, ?, ?)",
+                (etapa, concluidos, total, time.time()),
+            )
+
+    def progresso_salvo(self):
+        """Ponto de controle deixado por uma execução que não terminou.
+
+        Returns:
+            Progresso ou None se a última execução terminou
+        """
+        linha = self._conexao.execute(
+            "SELECT etapa, concluidos, total, atualizado_em FROM progresso"
+        ).fetchone()
+        return Progresso(*linha) if linha else None
+
+    def limpar_progresso(self):
+        """Apaga o ponto de controle ao fim de uma execução completa."""
+        with self._conexao:
+            self._conexao.execute("DELETE FROM progresso")
+
+    def fechar(self):
+        """Fecha a conexão com o banco."""
+        self._conexao.close()
@@ -0,0 +1,172 @@
+"""Módulo com a camada de transferência de arquivos do organizador."""
+
+import errno
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from models._cache_persistente import calcular_hash_arquivo
+
+# Transferências simultâneas entre sistemas de arquivos diferentes
+LIMITE_TRANSFERENCIAS = 4
+
+# Sufixo da cópia enquanto ela não foi conferida
+SUFIXO_PARCIAL = ".parcial"
+
+# Erros que indicam que a cópia no kernel não é suportada neste par de
+# sistemas de arquivos (e não que a cópia falhou)
+_ERROS_SEM_SUPORTE = {
+    errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF,
+    errno.ENOTSUP,
+}
+
+# Tamanho máximo de cada chamada de cópia no kernel
+_BLOCO_COPIA = 64 * 1024 * 1024
+
+_executor = None
+_lock_executor = threading.Lock()
+
+
+class TransferenciaInvalida(OSError):
+    """A cópia no destino não confere com a origem (tamanho ou hash)."""
+
+
+def executor_transferencias():
+    """Pool de threads, limitado, usado pelas transferências.
+
+    Returns:
+        ThreadPoolExecutor compartilhado (criado no primeiro uso)
+    """
+    global _executor
+    with _lock_executor:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=LIMITE_TRANSFERENCIAS,
+                thread_name_prefix="transferencia",
+            )
+        return _executor
+
+
+def mover_arquivo(origem, destino, obter_hash=None):
+    """Move um arquivo, com os.replace quando estão no mesmo sistema de arquivos.
+
+    Entre sistemas de arquivos diferentes o arquivo é copiado pelo kernel
+    (os.copy_file_range ou os.sendfile) para um arquivo .parcial no destino,
+    que é conferido (tamanho e hash) antes de ganhar o nome final. Só então
+    a origem é apagada.
+
+    Args:
+        origem: Caminho do arquivo
+        destino: Caminho final do arquivo (a pasta é criada se preciso)
+        obter_hash: Função sem argumentos que devolve o hash da origem (por
+                    exemplo, o hash guardado no inventário), para não
+                    relê-la se ele já foi calculado
+
+    Returns:
+        True se o arquivo foi copiado entre sistemas de arquivos
+    """
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    try:
+        os.replace(origem, destino)
+        return False
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+
+    parcial = destino + SUFIXO_PARCIAL
+    try:
+        _copiar(origem, parcial)
+        shutil.copystat(origem, parcial)
+        tamanho_origem = os.stat(origem).st_size
+        tamanho_copia = os.stat(parcial).st_size
+        if tamanho_copia != tamanho_origem:
+            raise TransferenciaInvalida(
+                f"tamanho copiado {tamanho_copia} != {tamanho_origem}"
+            )
+        hash_origem = (
+            obter_hash() if obter_hash else calcular_hash_arquivo(origem)
+        )
+        if calcular_hash_arquivo(parcial) != hash_origem:
+            raise TransferenciaInvalida("hash da cópia não confere")
+        os.replace(parcial, destino)
+    except BaseException:
+        try:
+            os.remove(parcial)
+        except OSError:
+            pass
+        raise
+    os.remove(origem)
+    return True
+
+
+def sincronizar_pastas(pastas):
+    """Grava em disco as entradas das pastas (um fsync por pasta).
+
+    Chamado uma vez por operação, depois de todos os seus movimentos, em vez
+    de um fsync por arquivo. Em sistemas sem fsync de pasta (Windows) não
+    faz nada.
+
+    Args:
+        pastas: Pastas cujas entradas mudaram
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    for pasta in set(pastas):
+        try:
+            descritor = os.open(pasta, os.O_RDONLY | os.O_DIRECTORY)
+        except OSError:
+            continue
+        try:
+            os.fsync(descritor)
+        except OSError:
+            pass
+        finally:
+            os.close(descritor)
+
+
+def _copiar(origem, destino):
+    """Copia o conteúdo pelo kernel, com cópia em Python como último recurso."""
+    with open(origem, "rb") as entrada, open(destino, "wb") as saida:
+        tamanho = os.fstat(entrada.fileno()).st_size
+        copiado = 0
+        for copiar_bloco in _COPIAS_NO_KERNEL:
+            try:
+                while copiado < tamanho:
+                    enviado = copiar_bloco(
+                        entrada.fileno(), saida.fileno(), copiado,
+                        min(_BLOCO_COPIA, tamanho - copiado),
+                    )
+                    if not enviado:
+                        break
+                    copiado += enviado
+                break
+            except OSError as e:
+                if e.errno not in _ERROS_SEM_SUPORTE or copiado:
+                    raise
+        if copiado < tamanho:
+            entrada.seek(copiado)
+            saida.seek(copiado)
+            shutil.copyfileobj(entrada, saida, 1024 * 1024)
+        saida.flush()
+        os.fsync(saida.fileno())
+
+
+def _copy_file_range(entrada, saida, posicao, quantidade):
+    """Cópia no kernel entre arquivos (Linux 4.5+, Python 3.8+)."""
+    return os.copy_file_range(entrada, saida, quantidade, posicao, posicao)
+
+
+def _sendfile(entrada, saida, posicao, quantidade):
+    """Cópia no kernel de arquivo para arquivo (Linux 2.6.33+)."""
+    os.lseek(saida, posicao, os.SEEK_SET)
+    return os.sendfile(saida, entrada, posicao, quantidade)
+
+
+# Métodos de cópia no kernel disponíveis, do preferido ao último recurso
+_COPIAS_NO_KERNEL = [
+    copiar for copiar, nome in (
+        (_copy_file_range, "copy_file_range"), (_sendfile, "sendfile"),
+    )
+    if hasattr(os, nome)
+]
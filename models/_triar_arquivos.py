@@ -0,0 +1,195 @@
+"""Módulo para triagem dos arquivos antes de qualquer extração de PDF."""
+
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from functools import cached_property
+
+from models._cache_persistente import calcular_hash_arquivo
+
+# Extensões processadas pelo organizador
+EXTENSOES_ACEITAS = (".txt", ".pdf")
+
+# Tamanho máximo, em MB, de um PDF que pode ser organizado
+LIMITE_TAMANHO_PDF_MB = 10
+
+# Nome de via negociável (normalizado) e os números da operação no nome
+_RE_VIA = re.compile(r"via[-_]*negociavel")
+_RE_NUMERO = re.compile(r"\d+")
+
+
+@dataclass(frozen=True)
+class TriagemArquivo:
+    """Registro imutável de um arquivo do diretório, lido uma vez por execução.
+
+    Nome, extensão, tamanho e data de modificação vêm da mesma listagem do
+    diretório (os.scandir) e são compartilhados por todas as etapas. O hash
+    do conteúdo só é calculado na primeira vez em que é pedido.
+    """
+
+    caminho: str
+    nome: str
+    extensao: str
+    nome_normalizado: str = None
+    via_negociavel: bool = False
+    tamanho: int = None
+    mtime_ns: int = None
+
+    @property
+    def tamanho_mb(self):
+        """Tamanho em MB, ou None se o arquivo não foi consultado."""
+        return None if self.tamanho is None else self.tamanho / (1024 * 1024)
+
+    @property
+    def acima_do_limite(self):
+        """True se é um PDF maior que LIMITE_TAMANHO_PDF_MB."""
+        return (
+            self.extensao == ".pdf"
+            and self.tamanho_mb > LIMITE_TAMANHO_PDF_MB
+        )
+
+    @cached_property
+    def hash(self):
+        """Hash do conteúdo (calculado só na primeira consulta)."""
+        return calcular_hash_arquivo(self.caminho)
+
+
+def remover_acentos(texto):
+    """Remove acentos de um texto.
+
+    Args:
+        texto: Texto a ser processado
+
+    Returns:
+        Texto sem acentos
+    """
+    return "".join(
+        c for c in unicodedata.normalize("NFD", texto)
+        if unicodedata.category(c) != "Mn"
+    )
+
+
+def normalizar_nome(nome):
+    """Normaliza um nome de arquivo: sem acentos, minúsculo e sem espaços.
+
+    Args:
+        nome: Nome do arquivo
+
+    Returns:
+        Nome normalizado
+    """
+    return remover_acentos(nome).lower().replace(" ", "")
+
+
+def triar_arquivos(diretorio_base, anterior=None, alterados=None):
+    """Lista o diretório e avalia as regras de nome e metadados de cada arquivo.
+
+    Uma única passada de os.scandir: o tipo da entrada vem da própria
+    listagem e o stat é feito uma vez, só para as extensões aceitas. As
+    demais etapas consultam o resultado em vez do sistema de arquivos. Nada
+    aqui abre o conteúdo dos arquivos.
+
+    Com uma triagem anterior e os caminhos alterados desde ela (o caso do
+    monitoramento), só os alterados são examinados de novo; os demais
+    arquivos que continuam no diretório mantêm o registro anterior,
+    inclusive o hash já calculado.
+
+    Args:
+        diretorio_base: Diretório a ser processado
+        anterior: Dicionário {caminho: TriagemArquivo} de uma triagem
+                  anterior do mesmo diretório
+        alterados: Caminhos novos ou alterados desde a triagem anterior
+
+    Returns:
+        Dicionário {caminho: TriagemArquivo}, na ordem da listagem
+
+    Raises:
+        FileNotFoundError: Se o diretório não existir
+    """
+    triagem = {}
+    anterior = anterior or {}
+    alterados = set(alterados or ())
+    with os.scandir(diretorio_base) as entradas:
+        for entrada in entradas:
+            if not entrada.is_file():
+                continue
+            if entrada.path in anterior and entrada.path not in alterados:
+                triagem[entrada.path] = anterior[entrada.path]
+                continue
+            nome = entrada.name
+            extensao = os.path.splitext(nome)[1].lower()
+            if extensao not in EXTENSOES_ACEITAS:
+                triagem[entrada.path] = TriagemArquivo(
+                    entrada.path, nome, extensao
+                )
+                continue
+
+            nome_normalizado = normalizar_nome(nome)
+            stat = entrada.stat()
+            triagem[entrada.path] = TriagemArquivo(
+                entrada.path, nome, extensao, nome_normalizado,
+                extensao == ".pdf"
+                and bool(_RE_VIA.search(nome_normalizado)),
+                stat.st_size, stat.st_mtime_ns,
+            )
+    return triagem
+
+
+class IndiceViasNegociaveis:
+    """Índice das vias negociáveis pelo número da operação no nome.
+
+    Montado uma vez por execução a partir da triagem (que já normalizou
+    cada nome). Cada sequência de dígitos depois de "vianegociavel" no nome
+    vira uma chave, então a busca por .txt é uma consulta ao dicionário.
+    As vias já usadas por um .txt ficam no conjunto `reivindicadas` e não
+    são entregues de novo.
+    """
+
+    def __init__(self, arquivos_pdf, triagem):
+        """Monta o índice.
+
+        Args:
+            arquivos_pdf: Lista de caminhos para arquivos PDF, na ordem em
+                          que devem ser preferidos
+            triagem: Dicionário {caminho: TriagemArquivo} da execução
+        """
+        self.reivindicadas = set()
+        self._vias = []
+        self._por_numero = {}
+        for caminho in arquivos_pdf:
+            nome_normalizado = triagem[caminho].nome_normalizado
+            prefixo = _RE_VIA.match(nome_normalizado)
+            if not prefixo:
+                continue
+            self._vias.append((caminho, nome_normalizado))
+            resto = os.path.splitext(nome_normalizado[prefixo.end():])[0]
+            for numero in _RE_NUMERO.findall(resto):
+                self._por_numero.setdefault(numero, []).append(caminho)
+
+    def reivindicar(self, op_num):
+        """Entrega a via negociável da operação e a marca como usada.
+
+        O número é procurado primeiro como chave exata; se não houver, vale
+        a regra anterior de o número aparecer em qualquer parte do nome.
+
+        Args:
+            op_num: Número da operação
+
+        Returns:
+            Caminho da via negociável, ou None se não houver uma livre
+        """
+        if not op_num:
+            return None
+        op_normalizado = normalizar_nome(op_num)
+        candidatas = self._por_numero.get(op_normalizado, ())
+        if not any(c not in self.reivindicadas for c in candidatas):
+            candidatas = [
+                caminho for caminho, nome_normalizado in self._vias
+                if op_normalizado in nome_normalizado
+            ]
+        for caminho in candidatas:
+            if caminho not in self.reivindicadas:
+                self.reivindicadas.add(caminho)
+                return caminho
+        return None
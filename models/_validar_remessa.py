@@ -0,0 +1,191 @@
+"""Módulo para validar todos os campos de uma remessa de uma só vez."""
+
+import re
+from collections import namedtuple
+from datetime import datetime
+from itertools import repeat
+
+from models._layout_remessa import CAMPOS_OBRIGATORIOS, primeiro_campo_vazio
+
+# Campos de data: aceitos como AAAAMMDD ou DDMMAAAA
+CAMPOS_DATA = (
+    "DATA_OPERACAO", "VENCIMENTO_PRIMEIRA_PARCELA",
+    "VENCIMENTO_ULTIMA_PARCELA", "DATA_LIBERACAO_OPERACAO",
+)
+
+# Campos de UF (os que não são obrigatórios só são conferidos se preenchidos)
+CAMPOS_UF = ("UF_LIBERACAO_OPERACAO", "UF_PLACA")
+
+# Campos de CPF/CNPJ
+CAMPOS_DOCUMENTO = ("CPF_CNPJ_RECEBEDOR", "CPF_CNPJ_DEVEDOR")
+
+UFS_VALIDAS = frozenset((
+    "AC", "AL", "AP", "AM", "BA", "CE", "DF", "ES", "GO", "MA", "MT", "MS",
+    "MG", "PA", "PB", "PR", "PE", "PI", "RJ", "RN", "RS", "RO", "RR", "SC",
+    "SP", "SE", "TO",
+))
+
+_RE_OITO_DIGITOS = re.compile(r"\d{8}")
+_RE_DIGITOS = re.compile(r"\d+")
+
+# Uma violação encontrada; registro é a posição (a partir de 1) na remessa
+Violacao = namedtuple(
+    "Violacao", ["registro", "chassi", "campo", "valor", "motivo"]
+)
+
+
+class RelatorioValidacao(list):
+    """Lista de todas as violações de uma remessa, na ordem dos registros."""
+
+    @property
+    def valido(self):
+        """True se a remessa não tem nenhuma violação."""
+        return not self
+
+
+def validar_remessa(registros):
+    """Valida todos os campos de todos os registros de uma remessa.
+
+    Cada regra roda sobre a coluna inteira do seu campo, tirada dos
+    registros só quando é necessária. As regras de formato são avaliadas
+    uma vez por valor distinto da coluna, já que datas, UF e CPF/CNPJ se
+    repetem entre os chassis de uma mesma operação.
+
+    Regras:
+        - campos obrigatórios preenchidos;
+        - datas válidas (AAAAMMDD ou DDMMAAAA);
+        - UF existente;
+        - CPF/CNPJ com dígitos verificadores corretos.
+
+    Args:
+        registros: Lista de registros (RegistroRemessa) da remessa
+
+    Returns:
+        RelatorioValidacao com todas as violações encontradas
+    """
+    relatorio = RelatorioValidacao()
+    if not registros:
+        return relatorio
+
+    campos = registros[0].campos
+
+    def coluna_de(campo):
+        # tuple.__getitem__ direto evita o __getitem__ por nome do registro
+        return map(tuple.__getitem__, registros, repeat(campos.index(campo)))
+
+    def violacao(indice, campo, valor, motivo):
+        return Violacao(
+            indice + 1, registros[indice].CHASSI, campo, valor, motivo
+        )
+
+    # Só percorre as colunas de obrigatórios se algum registro tiver vazio
+    if primeiro_campo_vazio(registros) is not None:
+        for campo in CAMPOS_OBRIGATORIOS:
+            if campo not in campos or "" not in coluna_de(campo):
+                continue
+            relatorio.extend(
+                violacao(indice, campo, valor, "campo obrigatório vazio")
+                for indice, valor in enumerate(coluna_de(campo)) if not valor
+            )
+
+    regras = (
+        [(campo, _motivo_data) for campo in CAMPOS_DATA]
+        + [(campo, _motivo_uf) for campo in CAMPOS_UF]
+        + [(campo, _motivo_documento) for campo in CAMPOS_DOCUMENTO]
+    )
+    for campo, regra in regras:
+        if campo not in campos:
+            continue
+        # Vazios já foram tratados acima (ou o campo é opcional)
+        motivos = {
+            valor: regra(valor) for valor in set(coluna_de(campo)) if valor
+        }
+        if not any(motivos.values()):
+            continue
+        relatorio.extend(
+            violacao(indice, campo, valor, motivos[valor])
+            for indice, valor in enumerate(coluna_de(campo))
+            if motivos.get(valor)
+        )
+
+    relatorio.sort(key=lambda violacao: violacao.registro)
+    return relatorio
+
+
+def _motivo_data(valor):
+    """Motivo da data ser inválida, ou None se for AAAAMMDD ou DDMMAAAA."""
+    if not _RE_OITO_DIGITOS.fullmatch(valor):
+        return "data deve ter 8 dígitos"
+    for formato in ("%Y%m%d", "%d%m%Y"):
+        try:
+            datetime.strptime(valor, formato)
+            return None
+        except ValueError:
+            pass
+    return "data inexistente"
+
+
+def _motivo_uf(valor):
+    """Motivo da UF ser inválida, ou None se existir."""
+    return None if valor in UFS_VALIDAS else "UF inexistente"
+
+
+def _motivo_documento(valor):
+    """Motivo do CPF/CNPJ ser inválido, ou None se os dígitos conferirem.
+
+    O campo tem 14 posições: um CPF pode vir completado com zeros à
+    esquerda, e então é aceito se for um CNPJ ou um CPF válido.
+    """
+    if not _RE_DIGITOS.fullmatch(valor):
+        return "CPF/CNPJ deve ter apenas dígitos"
+    if len(valor) == 11:
+        return None if cpf_valido(valor) else "CPF inválido"
+    if len(valor) == 14:
+        if cnpj_valido(valor):
+            return None
+        if valor.startswith("000") and cpf_valido(valor[3:]):
+            return None
+        return "CNPJ inválido"
+    return "CPF/CNPJ deve ter 11 ou 14 dígitos"
+
+
+def cpf_valido(cpf):
+    """Confere os dígitos verificadores de um CPF (11 dígitos).
+
+    Args:
+        cpf: CPF só com dígitos
+
+    Returns:
+        True se os dígitos verificadores conferem
+    """
+    if len(cpf) != 11 or len(set(cpf)) == 1:
+        return False
+    numeros = [int(c) for c in cpf]
+    for tamanho in (9, 10):
+        soma = sum(
+            n * peso for n, peso in zip(numeros, range(tamanho + 1, 1, -1))
+        )
+        if (soma * 10) % 11 % 10 != numeros[tamanho]:
+            return False
+    return True
+
+
+def cnpj_valido(cnpj):
+    """Confere os dígitos verificadores de um CNPJ (14 dígitos).
+
+    Args:
+        cnpj: CNPJ só com dígitos
+
+    Returns:
+        True se os dígitos verificadores conferem
+    """
+    if len(cnpj) != 14 or len(set(cnpj)) == 1:
+        return False
+    numeros = [int(c) for c in cnpj]
+    for tamanho in (12, 13):
+        pesos = list(range(tamanho - 7, 1, -1)) + list(range(9, 1, -1))
+        soma = sum(n * peso for n, peso in zip(numeros, pesos))
+        resto = soma % 11
+        if (0 if resto < 2 else 11 - resto) != numeros[tamanho]:
+            return False
+    return True
@@ -2,7 +2,9 @@
 
 """Módulo para validação de texto extraído de PDFs."""
 
+import math
 import re
+from collections import namedtuple
 
 # Lista de palavras comuns em português. Quanto mais palavras, mais preciso,
 # mas uma lista pequena já é suficiente para detectar texto completamente codificado.
@@ -138,6 +140,27 @@ PALAVRAS_COMUNS_PT = {
 }
 
 
+# Tamanho, em caracteres, de cada trecho lido pelo detector de texto codificado
+TAMANHO_TRECHO = 2048
+
+# A análise por amostragem só pode parar depois de ler este mínimo de trechos
+# e de palavras, já que palavras de um mesmo trecho não são independentes
+MINIMO_TRECHOS_AMOSTRA = 4
+MINIMO_PALAVRAS_AMOSTRA = 400
+
+# Valor z do intervalo de confiança (99,9%) usado para encerrar a amostragem
+Z_CONFIANCA = 3.29
+
+_RE_NAO_LETRA = re.compile(r"[^a-zA-Z\s]")
+_RE_ESPACO = re.compile(r"\s")
+
+# Resultado da classificação de um texto extraído de PDF
+AnaliseTexto = namedtuple(
+    "AnaliseTexto",
+    ["percentual_reconhecido", "caractere_substituicao", "codificado"],
+)
+
+
 def is_texto_codificado(texto: str, threshold_percent=10) -> bool:
     """
     Verifica se um texto extraído de um PDF parece codificado ou ilegível.
@@ -150,28 +173,193 @@ def is_texto_codificado(texto: str, threshold_percent=10) -> bool:
     Returns:
         True se o texto parece codificado, False caso contrário.
     """
-    # Verifica a presença do caractere de substituição Unicode (forte indício de erro)
-    if "\ufffd" in texto:
-        return True
+    return analisar_texto(texto, threshold_percent).codificado
 
-    # Limpa o texto, mantendo apenas letras e espaços, e converte para minúsculas
-    texto_limpo = re.sub(r"[^a-zA-Z\s]", "", texto).lower()
 
-    # Divide o texto em palavras
-    palavras = texto_limpo.split()
+def analisar_texto(
+    texto: str, threshold_percent=10, amostragem=True
+) -> AnaliseTexto:
+    """
+    Classifica um texto extraído de um PDF, guardando as medidas usadas.
 
-    if not palavras:
-        return True  # Se não há palavras, o texto é inválido
+    O texto é lido em trechos de tamanho fixo, cortados em espaços. Com
+    amostragem, os trechos são visitados espalhados pelo documento (início,
+    meio, quartos...) e a análise para assim que o intervalo de confiança
+    de Wilson do percentual de palavras reconhecidas fica todo de um lado
+    do limite. Nesse caso o percentual devolvido é o da amostra.
+
+    Args:
+        texto: O texto extraído do PDF.
+        threshold_percent: O percentual mínimo de palavras reconhecíveis para
+                           considerar o texto válido.
+        amostragem: Se False, analisa o texto inteiro.
+
+    Returns:
+        AnaliseTexto com o percentual de palavras reconhecidas, a presença do
+        caractere de substituição Unicode e o veredito de texto codificado.
+    """
+    # Presença do caractere de substituição Unicode (forte indício de erro).
+    # A busca é feita no próprio texto, sem criar cópias
+    caractere_substituicao = "\ufffd" in texto
+
+    limite = threshold_percent / 100
+    limites = _limites_trechos(texto)
+    ordem = range(len(limites) - 1)
+    if amostragem:
+        ordem = _ordem_amostragem(len(limites) - 1)
 
     palavras_reconhecidas = 0
-    for palavra in palavras:
-        if palavra in PALAVRAS_COMUNS_PT:
-            palavras_reconhecidas += 1
+    total_palavras = 0
+    for lidos, indice in enumerate(ordem, start=1):
+        # Limpa o trecho, mantendo apenas letras e espaços, em minúsculas
+        trecho = texto[limites[indice]:limites[indice + 1]]
+        palavras = _RE_NAO_LETRA.sub("", trecho).lower().split()
+        total_palavras += len(palavras)
+        palavras_reconhecidas += sum(
+            1 for palavra in palavras if palavra in PALAVRAS_COMUNS_PT
+        )
 
-    # Calcula o percentual de palavras que são conhecidas
-    percentual_reconhecido = (palavras_reconhecidas / len(palavras)) * 100
+        if (
+            amostragem
+            and lidos >= MINIMO_TRECHOS_AMOSTRA
+            and total_palavras >= MINIMO_PALAVRAS_AMOSTRA
+        ):
+            inferior, superior = _intervalo_wilson(
+                palavras_reconhecidas, total_palavras
+            )
+            if superior < limite or inferior >= limite:
+                break
 
-    # print(f"  -> Análise de texto: {percentual_reconhecido:.2f}% de palavras reconhecidas.")
+    if not total_palavras:
+        # Se não há palavras, o texto é inválido
+        return AnaliseTexto(0.0, caractere_substituicao, True)
+
+    # Calcula o percentual de palavras que são conhecidas
+    percentual_reconhecido = (palavras_reconhecidas / total_palavras) * 100
 
     # Se o percentual for menor que o limite, considera o texto como codificado
-    return percentual_reconhecido < threshold_percent
+    return AnaliseTexto(
+        percentual_reconhecido,
+        caractere_substituicao,
+        caractere_substituicao or percentual_reconhecido < threshold_percent,
+    )
+
+
+def _limites_trechos(texto: str) -> list:
+    """Divide o texto em trechos de ~TAMANHO_TRECHO caracteres, em espaços.
+
+    Cortar só em espaços garante que nenhuma palavra seja partida, então a
+    soma das palavras dos trechos é igual às palavras do texto inteiro.
+    """
+    limites = [0]
+    while limites[-1] < len(texto):
+        espaco = _RE_ESPACO.search(texto, limites[-1] + TAMANHO_TRECHO)
+        limites.append(espaco.start() if espaco else len(texto))
+    return limites
+
+
+def _ordem_amostragem(quantidade: int) -> list:
+    """Ordena os trechos para que cada prefixo cubra o documento todo.
+
+    Usa a sequência de van der Corput: 0, 1/2, 1/4, 3/4, 1/8...
+    """
+    bits = max(1, (quantidade - 1).bit_length())
+    return sorted(
+        range(quantidade), key=lambda i: int(f"{i:0{bits}b}"[::-1], 2)
+    )
+
+
+def _intervalo_wilson(sucessos: int, total: int) -> tuple:
+    """Intervalo de confiança de Wilson para uma proporção."""
+    z2 = Z_CONFIANCA * Z_CONFIANCA
+    proporcao = sucessos / total
+    denominador = 1 + z2 / total
+    centro = (proporcao + z2 / (2 * total)) / denominador
+    margem = (
+        Z_CONFIANCA
+        * math.sqrt(
+            proporcao * (1 - proporcao) / total + z2 / (4 * total * total)
+        )
+        / denominador
+    )
+    return centro - margem, centro + margem
+
+
+if __name__ == "__main__":
+    # Compara a análise completa com a análise por amostragem:
+    #   python -m models._validar_texto [diretório com PDFs]
+    # Sem diretório, usa lotes de NF sintéticos. O veredito das duas análises
+    # precisa ser o mesmo em todos os documentos.
+    import os
+    import random
+    import sys
+    import time
+
+    def carregar_corpus(diretorio):
+        import fitz
+
+        for nome in sorted(os.listdir(diretorio)):
+            if nome.lower().endswith(".pdf"):
+                with fitz.open(os.path.join(diretorio, nome)) as pdf:
+                    yield nome, "\f".join(pagina.get_text() for pagina in pdf)
+
+    def gerar_corpus():
+        aleatorio = random.Random(0)
+        comuns = sorted(PALAVRAS_COMUNS_PT)
+        pagina_nf = (
+            "DANFE Documento Auxiliar da Nota Fiscal Eletronica chassi "
+            "9BWZZZ377VT004251 valor total do produto R$ 150.000,00 data de "
+            "emissao 10/01/2026 cliente endereco municipio de Sao Paulo "
+        )
+
+        def pagina_legivel():
+            extras = " ".join(aleatorio.choice(comuns) for _ in range(60))
+            return pagina_nf * 8 + extras
+
+        def pagina_codificada():
+            return " ".join(
+                "".join(aleatorio.choice("bcdfghjklmnpqrstvwxz") for _ in
+                        range(aleatorio.randint(2, 9)))
+                for _ in range(600)
+            )
+
+        for paginas in (1, 10, 50, 200):
+            yield f"legivel_{paginas}p", "\f".join(
+                pagina_legivel() for _ in range(paginas)
+            )
+            yield f"codificado_{paginas}p", "\f".join(
+                pagina_codificada() for _ in range(paginas)
+            )
+            yield f"capa_legivel_{paginas}p", "\f".join(
+                [pagina_legivel()]
+                + [pagina_codificada() for _ in range(paginas - 1)]
+            )
+
+    if len(sys.argv) > 1:
+        corpus = carregar_corpus(sys.argv[1])
+    else:
+        corpus = gerar_corpus()
+    tempo_completo = tempo_amostra = 0.0
+    divergencias = 0
+    for nome, texto in corpus:
+        inicio = time.perf_counter()
+        completa = analisar_texto(texto, amostragem=False)
+        meio = time.perf_counter()
+        amostra = analisar_texto(texto)
+        fim = time.perf_counter()
+        tempo_completo += meio - inicio
+        tempo_amostra += fim - meio
+        igual = completa.codificado == amostra.codificado
+        divergencias += not igual
+        print(
+            f"{nome:<24} {len(texto) // 1024:>6} KB | "
+            f"completa {(meio - inicio) * 1000:8.2f} ms "
+            f"({completa.percentual_reconhecido:5.1f}%) | "
+            f"amostragem {(fim - meio) * 1000:7.2f} ms "
+            f"({amostra.percentual_reconhecido:5.1f}%)"
+            f"{'' if igual else '  <-- VEREDITO DIFERENTE'}"
+        )
+    print(
+        f"Total: completa {tempo_completo * 1000:.1f} ms, amostragem "
+        f"{tempo_amostra * 1000:.1f} ms, {divergencias} veredito(s) diferente(s)"
+    )
@@ -0,0 +1,68 @@
+"""Testes do autômato de Aho-Corasick que localiza os chassis."""
+
+import random
+import string
+
+import pytest
+
+from models import _aho_corasick
+from models._aho_corasick import MINIMO_PADROES_AUTOMATO, AutomatoChassis
+
+CARACTERES = string.ascii_uppercase + string.digits
+
+
+def _chassis(quantidade, aleatorio):
+    return {
+        "".join(aleatorio.choice(CARACTERES) for _ in range(17))
+        for _ in range(quantidade)
+    }
+
+
+@pytest.mark.parametrize("quantidade, por_substring", [
+    (MINIMO_PADROES_AUTOMATO - 1, True),
+    (MINIMO_PADROES_AUTOMATO, False),
+], ids=["substring", "automato"])
+def test_mesmo_resultado_da_busca_por_substring(quantidade, por_substring):
+    aleatorio = random.Random(quantidade)
+    chassis = _chassis(quantidade - 1, aleatorio)
+    presentes = aleatorio.sample(sorted(chassis), 10)
+    # Os 8 últimos de um chassi também são procurados (sobreposição)
+    chassis.add(presentes[0][-8:])
+    texto = "NOTA FISCAL " + " x ".join(
+        f"chassi{chassi}fim" for chassi in presentes
+    ) + " " + presentes[0][:-1]
+
+    automato = AutomatoChassis(chassis, usar_extensao=False)
+
+    assert automato._por_substring is por_substring
+    assert automato.procurar(texto) == {
+        chassi: texto.find(chassi) for chassi in chassis if chassi in texto
+    }
+
+
+@pytest.mark.parametrize("minimo_padroes", [0, MINIMO_PADROES_AUTOMATO])
+def test_procurados_e_textos_vazios(minimo_padroes):
+    automato = AutomatoChassis(
+        {"AAAAAAAA", "BBBBBBBB", ""}, usar_extensao=False,
+        minimo_padroes=minimo_padroes,
+    )
+    texto = "BBBBBBBB AAAAAAAA bbbbbbbb"
+
+    assert automato.padroes == {"AAAAAAAA", "BBBBBBBB"}
+    assert automato.procurar(texto, {"AAAAAAAA", "CCCCCCCC"}) == {
+        "AAAAAAAA": 9
+    }
+    assert automato.procurar("") == {}
+    assert AutomatoChassis([]).procurar(texto) == {}
+
+
+@pytest.mark.skipif(
+    _aho_corasick.ahocorasick is None, reason="pyahocorasick não instalado"
+)
+def test_extensao_nativa_tem_o_mesmo_resultado():
+    chassis = _chassis(20, random.Random(0))
+    texto = " ".join(sorted(chassis)[::3])
+
+    assert AutomatoChassis(chassis).procurar(texto) == AutomatoChassis(
+        chassis, usar_extensao=False, minimo_padroes=0
+    ).procurar(texto)
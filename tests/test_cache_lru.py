@@ -0,0 +1,46 @@
+"""Testes do cache LRU em memória limitado por bytes."""
+
+from models._cache_lru import CacheLRU
+
+
+def _cache(limite):
+    return CacheLRU(limite, medir=len)
+
+
+def test_despeja_a_entrada_usada_ha_mais_tempo():
+    cache = _cache(10)
+    cache.gravar("a", "1234")
+    cache.gravar("b", "1234")
+    cache.obter("a")
+
+    cache.gravar("c", "1234")
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.estatisticas() == {
+        "entradas": 2, "bytes_usados": 8, "limite_bytes": 10,
+        "acertos": 1, "falhas": 0, "despejos": 1,
+    }
+
+
+def test_regravar_e_remover_ajustam_os_bytes():
+    cache = _cache(10)
+    cache.gravar("a", "12345678")
+    cache.gravar("a", "12")
+    assert cache.bytes_usados == 2
+
+    cache.remover("a")
+    cache.remover("inexistente")
+
+    assert cache.bytes_usados == 0 and len(cache) == 0
+    assert cache.obter("a", "padrao") == "padrao"
+    assert cache.falhas == 1
+
+
+def test_valor_maior_que_o_limite_nao_e_guardado():
+    cache = _cache(10)
+    cache.gravar("a", "123")
+
+    cache.gravar("grande", "x" * 11)
+
+    assert "grande" not in cache and "a" in cache
+    assert cache.despejos == 0
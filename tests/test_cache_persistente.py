@@ -0,0 +1,93 @@
+"""Testes do cache em disco dos textos extraídos dos PDFs."""
+
+import os
+
+import pytest
+
+from models import _cache_persistente
+from models._cache_persistente import (
+    CachePdfPersistente,
+    EntradaCachePdf,
+    calcular_hash_arquivo,
+)
+from models._triar_arquivos import triar_arquivos
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CachePdfPersistente(str(tmp_path / "_Cache" / "pdf.sqlite3"))
+    yield cache
+    cache.fechar()
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    caminho = tmp_path / "NF.pdf"
+    caminho.write_bytes(b"conteudo do pdf")
+    return caminho
+
+
+def test_texto_volta_na_proxima_execucao(tmp_path, cache, pdf):
+    cache.gravar(str(pdf), "Chassi 9BWZZZ377VT000077", False, 2, 97.5)
+    cache.fechar()
+
+    reaberto = CachePdfPersistente(cache.caminho_banco)
+    try:
+        assert reaberto.obter(str(pdf)) == EntradaCachePdf(
+            "Chassi 9BWZZZ377VT000077", False, 2, 97.5, False
+        )
+    finally:
+        reaberto.fechar()
+
+
+def test_pdf_alterado_invalida_a_entrada(cache, pdf):
+    cache.gravar(str(pdf), "texto antigo", False)
+    pdf.write_bytes(b"outro conteudo!")
+
+    assert cache.obter(str(pdf)) is None
+    # A entrada inválida foi apagada
+    pdf.write_bytes(b"conteudo do pdf")
+    assert cache.obter(str(pdf)) is None
+
+
+def test_so_a_data_alterada_mantem_a_entrada(cache, pdf):
+    cache.gravar(str(pdf), "texto", True, 1)
+    stat = pdf.stat()
+    os.utime(pdf, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert cache.obter(str(pdf)).texto == "texto"
+
+
+def test_limpar_ausentes(cache, pdf, tmp_path):
+    removido = tmp_path / "NF removida.pdf"
+    removido.write_bytes(b"x")
+    cache.gravar(str(pdf), "texto", False)
+    cache.gravar(str(removido), "texto", False)
+    removido.unlink()
+
+    assert cache.limpar_ausentes() == 1
+    assert cache.obter(str(pdf)) is not None
+
+
+def test_hash_do_arquivo(pdf, tmp_path):
+    copia = tmp_path / "copia.pdf"
+    copia.write_bytes(pdf.read_bytes())
+
+    assert calcular_hash_arquivo(str(pdf)) == calcular_hash_arquivo(str(copia))
+
+
+def test_inventario_da_execucao_substitui_o_disco(tmp_path, pdf, monkeypatch):
+    inventario = triar_arquivos(str(tmp_path))
+    cache = CachePdfPersistente(
+        str(tmp_path / "_Cache" / "inventario.sqlite3"), inventario
+    )
+    try:
+        cache.gravar(str(pdf), "texto", False)
+        # Tamanho, data e hash vêm do inventário, sem consultar o disco
+        monkeypatch.setattr(_cache_persistente.os, "stat", None)
+        monkeypatch.setattr(
+            _cache_persistente, "calcular_hash_arquivo", None
+        )
+        assert cache.obter(str(pdf)).texto == "texto"
+    finally:
+        cache.fechar()
@@ -0,0 +1,38 @@
+"""Testes do agrupamento de PDFs com conteúdo idêntico."""
+
+from models._deduplicar_pdfs import agrupar_pdfs_duplicados
+from models._triar_arquivos import triar_arquivos
+
+
+def test_agrupa_so_conteudo_identico(tmp_path):
+    for nome, conteudo in [
+        ("NF b.pdf", b"nota 1"), ("NF a.pdf", b"nota 1"),
+        ("NF c.pdf", b"nota 1"), ("NF d.pdf", b"nota 2"),
+        ("NF unica.pdf", b"nota unica"),
+    ]:
+        (tmp_path / nome).write_bytes(conteudo)
+    triagem = triar_arquivos(str(tmp_path))
+
+    duplicados = agrupar_pdfs_duplicados(list(triagem), triagem)
+
+    assert duplicados == {
+        str(tmp_path / "NF a.pdf"): [
+            str(tmp_path / "NF b.pdf"), str(tmp_path / "NF c.pdf"),
+        ],
+    }
+    # O PDF de tamanho único não teve o conteúdo lido
+    assert "hash" not in vars(triagem[str(tmp_path / "NF unica.pdf")])
+    assert "hash" in vars(triagem[str(tmp_path / "NF d.pdf")])
+
+
+def test_pdf_que_sumiu_fica_fora_dos_grupos(tmp_path):
+    for nome in ("NF a.pdf", "NF b.pdf", "NF c.pdf"):
+        (tmp_path / nome).write_bytes(b"nota")
+    triagem = triar_arquivos(str(tmp_path))
+    (tmp_path / "NF a.pdf").unlink()
+
+    duplicados = agrupar_pdfs_duplicados(list(triagem), triagem)
+
+    assert duplicados == {
+        str(tmp_path / "NF b.pdf"): [str(tmp_path / "NF c.pdf")],
+    }
@@ -0,0 +1,90 @@
+"""Testes dos estágios da esteira do organizador."""
+
+import threading
+import time
+
+import pytest
+
+from models._esteira import EstagioConsumidor, EstagioProdutor
+
+
+def test_produtor_para_quando_a_fila_enche():
+    produzidos = []
+
+    def produzir(item):
+        produzidos.append(item)
+        return item * 10
+
+    with EstagioProdutor(produzir, range(20), limite_fila=2) as estagio:
+        resultados = iter(estagio)
+        assert next(resultados) == (0, 0)
+        time.sleep(0.3)
+        # Dois na fila e um pronto esperando espaço
+        assert len(produzidos) <= 4
+        assert list(resultados) == [(i, i * 10) for i in range(1, 20)]
+
+
+def test_erro_do_produtor_chega_no_item_em_que_ocorreu():
+    produzidos = []
+
+    def produzir(item):
+        produzidos.append(item)
+        if item == 2:
+            raise ValueError("txt inválido")
+        return item
+
+    recebidos = []
+    with EstagioProdutor(produzir, range(5)) as estagio:
+        with pytest.raises(ValueError, match="txt inválido"):
+            for item, _ in estagio:
+                recebidos.append(item)
+
+    assert recebidos == [0, 1]
+    assert produzidos == [0, 1, 2]
+
+
+def test_fechar_interrompe_a_producao():
+    estagio = EstagioProdutor(lambda item: item, range(1000), limite_fila=1)
+    next(iter(estagio))
+
+    estagio.fechar()
+
+    assert not estagio._thread.is_alive()
+
+
+def test_consumidor_bloqueia_o_envio_com_a_fila_cheia():
+    liberar = threading.Event()
+
+    def processar(item):
+        liberar.wait(5)
+        return item * 10
+
+    estagio = EstagioConsumidor(processar, workers=1, limite_fila=1)
+    estagio.enviar(0, 0)
+    estagio.enviar(1, 1)
+    envio = threading.Thread(target=estagio.enviar, args=(2, 2))
+    envio.start()
+    envio.join(0.3)
+    assert envio.is_alive()
+
+    liberar.set()
+    envio.join(5)
+
+    assert estagio.encerrar() == {0: 0, 1: 10, 2: 20}
+
+
+def test_consumidor_devolve_o_primeiro_erro_na_ordem_dos_envios():
+    def processar(item):
+        if item == 1:
+            time.sleep(0.1)
+            raise KeyError(item)
+        if item == 2:
+            raise ValueError(item)
+        return item
+
+    estagio = EstagioConsumidor(processar, workers=3)
+    for item in range(4):
+        estagio.enviar(item, item)
+
+    with pytest.raises(KeyError):
+        estagio.encerrar()
@@ -0,0 +1,64 @@
+"""Testes da extração antecipada dos PDFs que chegam antes do .txt."""
+
+import time
+
+import fitz
+
+from models import _extrair_texto_do_pdf
+from models._cache_persistente import CachePdfPersistente
+from models._extracao_antecipada import ExtracaoAntecipada, pdfs_antecipaveis
+from models._triar_arquivos import LIMITE_TAMANHO_PDF_MB, triar_arquivos
+
+CHASSI = "9BWZZZ377VT000077"
+
+
+def test_so_nfs_que_a_extracao_normal_leria(tmp_path):
+    for nome in ("NF b.pdf", "NF a.pdf", "Via Negociável 1.pdf", "r.txt"):
+        (tmp_path / nome).write_bytes(b"x")
+    with open(tmp_path / "NF grande.pdf", "wb") as f:
+        f.truncate(LIMITE_TAMANHO_PDF_MB * 1024 * 1024 + 1)
+    triagem = triar_arquivos(str(tmp_path))
+
+    assert pdfs_antecipaveis(triagem) == [
+        str(tmp_path / "NF a.pdf"), str(tmp_path / "NF b.pdf"),
+    ]
+    assert pdfs_antecipaveis(
+        triagem, {str(tmp_path / "NF b.pdf"), str(tmp_path / "r.txt")}
+    ) == [str(tmp_path / "NF b.pdf")]
+
+
+def test_pdf_antecipado_e_so_consulta_ao_cache(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "NF.pdf")
+    with fitz.open() as pdf:
+        pdf.new_page().insert_text((72, 72), f"Nota fiscal, chassi {CHASSI}")
+        pdf.save(caminho)
+    diretorio_cache = str(tmp_path / "_Cache")
+
+    with ExtracaoAntecipada(diretorio_cache) as antecipacao:
+        assert antecipacao.agendar([caminho]) == 1
+        limite = time.monotonic() + 60
+        while not antecipacao.preparados and time.monotonic() < limite:
+            time.sleep(0.05)
+        assert antecipacao.preparados == 1
+
+    cache = CachePdfPersistente(
+        str(tmp_path / "_Cache" / "pdf_textos.sqlite3")
+    )
+    try:
+        assert CHASSI in cache.obter(caminho).texto
+    finally:
+        cache.fechar()
+
+    # O .txt chegou: a análise não volta a ler o PDF
+    _extrair_texto_do_pdf.configurar_cache_memoria()
+    monkeypatch.setattr(_extrair_texto_do_pdf, "cache_persistente", None)
+    monkeypatch.setattr(_extrair_texto_do_pdf, "iterar_paginas_pdf", None)
+    cache = _extrair_texto_do_pdf.configurar_cache_persistente(
+        diretorio_cache
+    )
+    try:
+        analise = _extrair_texto_do_pdf.analisar_pdf(caminho, {CHASSI})
+    finally:
+        cache.fechar()
+        _extrair_texto_do_pdf.vereditos_pdf.clear()
+    assert analise.chassis == {CHASSI: 1}
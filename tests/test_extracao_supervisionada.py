@@ -0,0 +1,33 @@
+"""Testes do pool supervisionado de extração."""
+
+import multiprocessing
+
+import pytest
+
+import models._extracao_supervisionada as extracao
+
+
+def _analisar_falso(caminho_pdf, chassis, com_tokens=False):
+    if caminho_pdf == "estoura.pdf":
+        raise MemoryError
+    return caminho_pdf
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="precisa de fork para levar o analisar_pdf falso ao processo",
+)
+def test_processo_que_estoura_memoria_e_substituido(monkeypatch):
+    monkeypatch.setattr(extracao, "analisar_pdf", _analisar_falso)
+    pool = extracao.PoolSupervisionado(max_workers=1, limite_memoria_mb=0)
+    pool._contexto = multiprocessing.get_context("fork")
+    try:
+        resultados, falhas = pool.analisar(
+            ["estoura.pdf", "saudavel.pdf", "outro.pdf"], {"9BWZZZ377VT004251"}
+        )
+        assert resultados == ["saudavel.pdf", "outro.pdf"]
+        assert [falha.caminho for falha in falhas] == ["estoura.pdf"]
+        assert "memória" in falhas[0].motivo
+        assert pool._workers[0].processo.is_alive()
+    finally:
+        pool.fechar()
@@ -0,0 +1,91 @@
+"""Testes da busca de chassis no texto dos PDFs."""
+
+import fitz
+import pytest
+
+import models._extrair_texto_do_pdf as extracao
+
+CHASSI_17 = "9BWZZZ377VT000077"
+CHASSI_8 = "VT000077"
+
+
+def _gerar_pdf(caminho, paginas):
+    with fitz.open() as pdf:
+        for texto in paginas:
+            pdf.new_page().insert_text((72, 72), texto)
+        pdf.save(caminho)
+
+
+@pytest.fixture(params=[True, False], ids=["compacto", "texto"])
+def cache(request):
+    extracao.configurar_cache_memoria(compacto=request.param)
+    extracao.vereditos_pdf.clear()
+    yield request.param
+    extracao.configurar_cache_memoria()
+    extracao.vereditos_pdf.clear()
+
+
+def test_tokens_juntam_chassi_partido():
+    tokens = extracao.extrair_tokens_candidatos(
+        "Chassi: 9BWZZZ377-\nVT000077" + extracao.SEPARADOR_PAGINA
+    )
+    assert tokens[CHASSI_17] == 1
+
+
+def test_chassi_colado_so_aparece_nos_trechos():
+    texto = (
+        "Nota fiscal" + extracao.SEPARADOR_PAGINA
+        + f"Chassi {CHASSI_17}" + extracao.SEPARADOR_PAGINA
+    )
+    tokens = extracao.extrair_tokens_candidatos(texto)
+    trechos = extracao.extrair_trechos_longos(texto)
+
+    assert CHASSI_8 not in tokens
+    assert extracao.localizar_tokens(tokens, None, {CHASSI_8}) == {}
+    assert extracao.localizar_tokens(
+        tokens, trechos, {CHASSI_8, CHASSI_17, "ZZZZZZZZ"}
+    ) == {CHASSI_8: 2, CHASSI_17: 2}
+
+
+@pytest.mark.parametrize("ja_em_cache", [False, True])
+def test_analisar_pdf_acha_chassi_colado(tmp_path, cache, ja_em_cache):
+    caminho = str(tmp_path / "nf.pdf")
+    _gerar_pdf(caminho, ["Nota fiscal de venda", f"Chassi {CHASSI_17}"])
+    if ja_em_cache:
+        extracao.analisar_pdf(caminho, {"INEXISTENTE1"})
+
+    resumo = extracao.analisar_pdf(caminho, {CHASSI_8, "AAAAAAAA"})
+    analise = extracao.analisar_pdf(
+        caminho, {CHASSI_8, "AAAAAAAA"}, com_tokens=True
+    )
+
+    assert resumo.chassis == analise.chassis == {CHASSI_8: 2}
+    assert resumo.tokens is None and resumo.trechos is None
+    assert CHASSI_17 in analise.tokens
+    assert CHASSI_17 in analise.trechos
+
+
+def test_leitura_para_quando_todos_os_chassis_foram_achados(
+        tmp_path, cache, monkeypatch):
+    caminho = str(tmp_path / "nf.pdf")
+    _gerar_pdf(caminho, [f"Chassi {CHASSI_17}", "Página 2", "Página 3"])
+    lidas = []
+    iterar = extracao.iterar_paginas_pdf
+
+    def _contar(caminho_pdf):
+        for pagina in iterar(caminho_pdf):
+            lidas.append(pagina.numero)
+            yield pagina
+
+    monkeypatch.setattr(extracao, "iterar_paginas_pdf", _contar)
+
+    analise = extracao.analisar_pdf(caminho, {CHASSI_17})
+
+    assert lidas == [1]
+    assert analise.chassis == {CHASSI_17: 1}
+    assert analise.veredito.paginas == 3
+    # O texto parcial não vai para o cache: outro chassi lê o PDF inteiro
+    assert caminho not in extracao.cache_pdf_textos
+    analise = extracao.analisar_pdf(caminho, {CHASSI_17, "9BWZZZ377VT999999"})
+    assert lidas == [1, 1, 2, 3]
+    assert caminho in extracao.cache_pdf_textos
@@ -0,0 +1,35 @@
+"""Testes do filtro de Bloom do índice de chassis."""
+
+from models._filtro_bloom import FiltroBloom
+
+
+def _chassis(inicio, fim):
+    return [f"9BWZZZ377VT{numero:06d}" for numero in range(inicio, fim)]
+
+
+def test_sem_falsos_negativos_e_poucos_falsos_positivos():
+    filtro = FiltroBloom(1000, 0.01)
+    for chassi in _chassis(0, 1000):
+        filtro.adicionar(chassi)
+
+    assert all(chassi in filtro for chassi in _chassis(0, 1000))
+    falsos_positivos = sum(
+        chassi in filtro for chassi in _chassis(1000, 11000)
+    )
+    assert falsos_positivos < 0.02 * 10000
+    assert not filtro.cheio
+
+
+def test_reaberto_dos_bytes_gravados():
+    filtro = FiltroBloom(10)
+    for chassi in _chassis(0, 11):
+        filtro.adicionar(chassi)
+
+    reaberto = FiltroBloom(
+        filtro.capacidade, bits=filtro.para_bytes(), hashes=filtro.hashes,
+        quantidade=filtro.quantidade,
+    )
+
+    assert reaberto.cheio
+    assert all(chassi in reaberto for chassi in _chassis(0, 11))
+    assert reaberto.para_bytes() == filtro.para_bytes()
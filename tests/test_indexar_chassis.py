@@ -0,0 +1,93 @@
+"""Testes do índice invertido de chassis dos PDFs de NF."""
+
+import shutil
+
+import fitz
+import pytest
+
+from models import _extrair_texto_do_pdf, _processar_pdf_em_lote
+from models._indexar_chassis import indexar_chassis_pdf, resolver_chassis
+
+CHASSI_A = "9BWZZZ377VT000001"
+CHASSI_B = "9BWZZZ377VT000002"
+CHASSI_C = "9BWZZZ377VT000003"
+
+
+def _gerar_pdf(caminho, paginas):
+    with fitz.open() as pdf:
+        for texto in paginas:
+            pdf.new_page().insert_text((72, 72), texto)
+        pdf.save(caminho)
+
+
+@pytest.fixture
+def lidos(monkeypatch):
+    _extrair_texto_do_pdf.configurar_cache_memoria()
+    _extrair_texto_do_pdf.vereditos_pdf.clear()
+    lidos = []
+    analisar_pdf = _processar_pdf_em_lote.analisar_pdf
+
+    def _contar(caminho_pdf, chassis, com_tokens=False):
+        lidos.append(caminho_pdf)
+        return analisar_pdf(caminho_pdf, chassis, com_tokens)
+
+    monkeypatch.setattr(_processar_pdf_em_lote, "motor_extracao", None)
+    monkeypatch.setattr(_processar_pdf_em_lote, "analisar_pdf", _contar)
+    yield lidos
+    _extrair_texto_do_pdf.vereditos_pdf.clear()
+
+
+def test_cada_pdf_e_lido_uma_vez_para_todos_os_chassis(tmp_path, lidos):
+    nf_1 = str(tmp_path / "NF 1.pdf")
+    nf_2 = str(tmp_path / "NF 2.pdf")
+    copia = str(tmp_path / "NF 2 (1).pdf")
+    quebrado = tmp_path / "NF quebrada.pdf"
+    _gerar_pdf(nf_1, ["Nota fiscal", f"Chassi {CHASSI_A}"])
+    _gerar_pdf(nf_2, [f"Chassis {CHASSI_B} e {CHASSI_C}"])
+    shutil.copy(nf_2, copia)
+    quebrado.write_bytes(b"%PDF-1.4 isto nao e um pdf")
+    falhas = []
+
+    indice = indexar_chassis_pdf(
+        [nf_1, nf_2, copia, str(quebrado)],
+        {CHASSI_A, CHASSI_B, CHASSI_C, "9BWZZZ377VT999999"},
+        falhas,
+        {nf_2: [copia]},
+    )
+
+    assert sorted(lidos) == sorted([nf_1, nf_2, str(quebrado)])
+    assert indice == {
+        CHASSI_A: {nf_1: 2},
+        CHASSI_B: {nf_2: 1, copia: 1},
+        CHASSI_C: {nf_2: 1, copia: 1},
+    }
+    assert [falha.caminho for falha in falhas] == [str(quebrado)]
+    assert (_extrair_texto_do_pdf.vereditos_pdf[copia]
+            == _extrair_texto_do_pdf.vereditos_pdf[nf_2])
+
+
+def test_sem_pdfs_ou_sem_chassis_nada_e_lido(tmp_path, lidos):
+    nf = str(tmp_path / "NF.pdf")
+    _gerar_pdf(nf, [f"Chassi {CHASSI_A}"])
+
+    assert indexar_chassis_pdf([], {CHASSI_A}) == {}
+    assert indexar_chassis_pdf([nf], set()) == {}
+    assert lidos == []
+
+
+def test_resolver_considera_so_os_pdfs_disponiveis():
+    indice = {
+        CHASSI_A: {"NF 1.pdf": 2},
+        CHASSI_B: {"NF 2.pdf": 1, "NF 3.pdf": 4},
+    }
+
+    resultados = resolver_chassis(
+        indice, ["NF 1.pdf", "NF 3.pdf", "NF 4.pdf"],
+        [{"CHASSI": CHASSI_A}, {"CHASSI": CHASSI_B}, {"CHASSI": CHASSI_C}],
+    )
+
+    assert resultados == [
+        ("NF 1.pdf", {CHASSI_A: 2}),
+        ("NF 3.pdf", {CHASSI_B: 4}),
+        ("NF 4.pdf", {}),
+    ]
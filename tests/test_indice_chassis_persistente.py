@@ -0,0 +1,138 @@
+"""Testes do índice em disco dos chassis dos PDFs de NF."""
+
+import pytest
+
+from models import _indice_chassis_persistente
+from models._extrair_texto_do_pdf import (
+    SEPARADOR_PAGINA,
+    AnalisePdf,
+    VereditoPdf,
+    extrair_tokens_candidatos,
+    extrair_trechos_longos,
+)
+from models._indice_chassis_persistente import IndiceChassisPersistente
+from models._triar_arquivos import TriagemArquivo
+
+CHASSI = "9BWZZZ377VT000077"
+
+
+def _analise(caminho, *paginas):
+    texto = "".join(pagina + SEPARADOR_PAGINA for pagina in paginas)
+    return AnalisePdf(
+        caminho, {}, VereditoPdf(False, len(paginas), 100.0, False),
+        extrair_tokens_candidatos(texto), extrair_trechos_longos(texto),
+    )
+
+
+@pytest.fixture
+def inventario():
+    return {
+        caminho: TriagemArquivo(caminho, caminho, ".pdf", caminho, False, 10, 1)
+        for caminho in ("a.pdf", "b.pdf")
+    }
+
+
+def test_chassi_por_token_e_por_substring(tmp_path, inventario):
+    with IndiceChassisPersistente(str(tmp_path), inventario) as indice:
+        indice.indexar([
+            _analise("a.pdf", "capa", f"Chassi {CHASSI}"),
+            _analise("b.pdf", "Chassi 9BWZZZ377VT000099"),
+        ])
+        resolvidos = {
+            analise.caminho: analise.chassis
+            for analise in indice.resolver(
+                ["a.pdf", "b.pdf"], {CHASSI, "VT000077", "AAAAAAAA"}
+            )
+        }
+    assert resolvidos == {
+        "a.pdf": {CHASSI: 2, "VT000077": 2},
+        "b.pdf": {},
+    }
+
+
+@pytest.mark.parametrize("fechar", [True, False], ids=["fechado", "sem_fechar"])
+def test_indice_e_filtro_voltam_na_proxima_execucao(tmp_path, inventario,
+                                                     fechar):
+    indice = IndiceChassisPersistente(str(tmp_path), inventario)
+    indice.indexar([_analise("a.pdf", f"Chassi {CHASSI}")])
+    if fechar:
+        indice.fechar()
+
+    with IndiceChassisPersistente(str(tmp_path), inventario) as reaberto:
+        assert reaberto.indexados(["a.pdf", "b.pdf"]) == {"a.pdf"}
+        assert CHASSI in reaberto._filtro
+        [analise] = reaberto.resolver(["a.pdf"], {CHASSI})
+    assert analise.chassis == {CHASSI: 1}
+    assert analise.veredito == VereditoPdf(False, 1, 100.0, False)
+    if not fechar:
+        indice.fechar()
+
+
+def test_pdf_alterado_sai_do_indice(tmp_path, inventario):
+    with IndiceChassisPersistente(str(tmp_path), inventario) as indice:
+        indice.indexar([_analise("a.pdf", f"Chassi {CHASSI}")])
+
+    inventario["a.pdf"] = TriagemArquivo(
+        "a.pdf", "a.pdf", ".pdf", "a.pdf", False, 11, 2
+    )
+    with IndiceChassisPersistente(str(tmp_path), inventario) as reaberto:
+        assert reaberto.indexados(["a.pdf"]) == set()
+        assert CHASSI not in reaberto._filtro
+
+
+def test_orfao_descartado_nao_volta_ao_indice(tmp_path, inventario):
+    with IndiceChassisPersistente(str(tmp_path), inventario) as indice:
+        indice.indexar([_analise("a.pdf", f"Chassi {CHASSI}")])
+        assert indice.orfaos(["a.pdf"], 0) == [("a.pdf", 0)]
+        indice.descartar(["a.pdf"])
+        indice.indexar([_analise("a.pdf", f"Chassi {CHASSI}")])
+        assert indice.indexados(["a.pdf"]) == set()
+        assert indice.orfaos(["a.pdf"], 0) == []
+
+
+def test_reindexar_nao_conta_os_tokens_de_novo(tmp_path, inventario):
+    with IndiceChassisPersistente(str(tmp_path), inventario) as indice:
+        indice.indexar([_analise("a.pdf", f"Chassi {CHASSI}")])
+        quantidade = indice._filtro.quantidade
+        indice.indexar([
+            _analise("a.pdf", f"Chassi {CHASSI}"),
+            _analise("b.pdf", f"Copia {CHASSI}"),
+        ])
+        assert indice._filtro.quantidade == quantidade
+        indice.indexar([_analise("b.pdf", "Chassi 9BWZZZ377VT000099")])
+        assert indice._filtro.quantidade == quantidade + 1
+
+
+def test_envelhecidos_saem_do_indice_e_do_filtro(tmp_path, inventario,
+                                                 monkeypatch):
+    agora = 1_000_000_000.0
+    monkeypatch.setattr(_indice_chassis_persistente.time, "time",
+                        lambda: agora)
+    outro = "9BWZZZ377VT000099"
+    with IndiceChassisPersistente(str(tmp_path), inventario) as indice:
+        indice.indexar([_analise("a.pdf", f"Chassi {CHASSI}")])
+        agora += 10 * 86400
+        indice.indexar([_analise("b.pdf", f"Chassi {outro}")])
+        agora += 25 * 86400
+
+        orfaos = indice.orfaos(["a.pdf", "b.pdf"], 30)
+        indice.descartar([caminho for caminho, _ in orfaos])
+
+        assert orfaos == [("a.pdf", 35)]
+        assert CHASSI not in indice._filtro and outro in indice._filtro
+        assert indice.indexados(["a.pdf", "b.pdf"]) == {"b.pdf"}
+        assert indice.orfaos(["a.pdf", "b.pdf"], 0) == [("b.pdf", 25)]
+
+
+def test_filtro_cheio_e_reconstruido_maior(tmp_path, inventario,
+                                           monkeypatch):
+    monkeypatch.setattr(
+        _indice_chassis_persistente, "_CAPACIDADE_MINIMA_FILTRO", 4
+    )
+    chassis = [f"9BWZZZ377VT{numero:06d}" for numero in range(10)]
+    with IndiceChassisPersistente(str(tmp_path), inventario) as indice:
+        indice.indexar([_analise("a.pdf", " ".join(chassis))])
+
+        assert indice._filtro.capacidade == 20
+        assert not indice._filtro.cheio
+        assert all(chassi in indice._filtro for chassi in chassis)
@@ -0,0 +1,91 @@
+"""Testes da leitura das remessas .txt."""
+
+import pytest
+
+from models._extrair_dados_do_txt import extrair_dados_do_txt
+from models._layout_remessa import LAYOUT_REMESSA, primeiro_campo_vazio
+
+VALORES = {
+    "REMARCACAO": "N", "ANO_FABRICACAO": "2022", "ANO_MODELO": "2023",
+    "DATA_OPERACAO": "20260110", "TIPO_GRAVAME": "03",
+    "QUANTIDADE_MESES": "048", "TAXA_JUROS_MES": "000150",
+    "TAXA_JUROS_ANO": "001950", "VALOR_TAXA_CONTRATO": "000010000",
+    "VALOR_IOF": "000005000", "INDICATIVO_MULTA": "SIM",
+    "INDICATIVO_MORA": "SIM", "VALOR_PRINCIPAL_OPERACAO": "005000000",
+    "VALOR_PARCELA": "000150000", "VENCIMENTO_PRIMEIRA_PARCELA": "20260210",
+    "VENCIMENTO_ULTIMA_PARCELA": "20300110",
+    "CIDADE_LIBERACAO_OPERACAO": "SAO PAULO", "UF_LIBERACAO_OPERACAO": "SP",
+    "DATA_LIBERACAO_OPERACAO": "20260110", "INDICES_UTILIZADOS": "IPCA",
+    "MULTA": "000200", "JUROS_MORA": "000000100",
+    "CPF_CNPJ_RECEBEDOR": "11222333000181",
+}
+
+
+def linha_detalhe(chassi, operacao="123456", **valores):
+    """Monta uma linha de detalhe nas posições do layout padrão."""
+    buffer = [" "] * 700
+    campos = {**VALORES, "CHASSI": chassi, "NUMERO_OPERACAO": operacao,
+              **valores}
+    for campo, ini, fim in LAYOUT_REMESSA.posicoes:
+        largura = fim - ini + 1
+        buffer[ini - 1:fim] = campos.get(campo, "")[:largura].ljust(largura)
+    return "".join(buffer)
+
+
+CASOS = {
+    "simples": [
+        "HEADER".ljust(700),
+        linha_detalhe("9BWZZZ377VT000001"),
+        linha_detalhe("AB000002"),
+        linha_detalhe("X" * 21),
+        "TRAILLER".ljust(700),
+    ],
+    "chassi_invalido_e_linhas_vazias": [
+        "HEADER".ljust(700),
+        linha_detalhe("CURTO"),
+        "",
+        "   ",
+        linha_detalhe("  9BWZZZ377VT0003  "),
+        linha_detalhe("9BWZZZ377VT000004"),
+    ],
+    "sem_header": [
+        linha_detalhe("9BWZZZ377VT000005", operacao="777"),
+        linha_detalhe("9BWZZZ377VT000006", operacao="778"),
+    ],
+    "campo_vazio": [
+        "HEADER".ljust(700),
+        linha_detalhe("9BWZZZ377VT000007"),
+        linha_detalhe("9BWZZZ377VT000008", MULTA=""),
+    ],
+    "acentos_e_linha_curta": [
+        "HEADER".ljust(700),
+        linha_detalhe("9BWZZZ377VT000009",
+                      CIDADE_LIBERACAO_OPERACAO="SÃO PAULO"),
+        linha_detalhe("9BWZZZ377VT000010")[:300],
+    ],
+}
+
+
+@pytest.mark.parametrize("quebra", ["\n", "\r\n"], ids=["lf", "crlf"])
+@pytest.mark.parametrize("caso, chassis, operacao, campo_vazio", [
+    ("simples", ["9BWZZZ377VT000001", "AB000002", "X" * 21], "123456", None),
+    ("chassi_invalido_e_linhas_vazias", ["9BWZZZ377VT000004"], "123456",
+     None),
+    ("sem_header", ["9BWZZZ377VT000005", "9BWZZZ377VT000006"], "777", None),
+    ("campo_vazio", ["9BWZZZ377VT000007", "9BWZZZ377VT000008"], "123456",
+     "MULTA"),
+    ("acentos_e_linha_curta", ["9BWZZZ377VT000009", "9BWZZZ377VT000010"],
+     "123456", "INDICES_UTILIZADOS"),
+])
+def test_leitura_da_remessa(tmp_path, quebra, caso, chassis, operacao,
+                            campo_vazio):
+    caminho = tmp_path / "remessa.txt"
+    caminho.write_text(
+        quebra.join(CASOS[caso]) + quebra, encoding="utf-8", newline=""
+    )
+
+    registros, numero_operacao = extrair_dados_do_txt(str(caminho))
+
+    assert [r.CHASSI for r in registros] == chassis
+    assert numero_operacao == operacao
+    assert primeiro_campo_vazio(registros) == campo_vazio
@@ -0,0 +1,51 @@
+"""Testes do laço de monitoramento do main."""
+
+import main
+from models import _organizar_arquivos
+from models._triar_arquivos import TriagemArquivo
+
+
+class _Motor:
+    def __init__(self):
+        self.esquecidos = []
+
+    def esquecer_pdfs(self, caminhos):
+        self.esquecidos.extend(caminhos)
+
+    def aquecer(self):
+        pass
+
+
+class _Antecipacao:
+    def __init__(self):
+        self.agendados = []
+
+    def agendar(self, arquivos_pdf):
+        self.agendados.extend(arquivos_pdf)
+
+
+def test_erro_no_lote_nao_encerra_o_monitoramento(tmp_path, monkeypatch):
+    monkeypatch.setattr(_organizar_arquivos, "_inventarios", {})
+    pasta = str(tmp_path)
+    nf = str(tmp_path / "NF 1.pdf")
+    enviados = []
+    lotes = iter([OSError("disco indisponível"), None])
+
+    def processar(pasta_nf, alterados=None):
+        erro = next(lotes)
+        if erro is not None:
+            raise erro
+        _organizar_arquivos._inventarios[pasta_nf] = {
+            nf: TriagemArquivo(nf, "NF 1.pdf", ".pdf", "nf1.pdf", False, 10, 1)
+        }
+
+    monkeypatch.setattr(main, "processar_diretorio", processar)
+    monkeypatch.setattr(main, "post_teams_message", enviados.append)
+    motor, antecipacao = _Motor(), _Antecipacao()
+
+    main.processar_lote(pasta, motor, antecipacao, {nf})
+    main.processar_lote(pasta, motor, antecipacao, {nf})
+
+    assert len(enviados) == 1
+    assert "OSError: disco indisponível" in enviados[0]["mensagem_erro"][0]
+    assert antecipacao.agendados == [nf]
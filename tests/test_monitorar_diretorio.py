@@ -0,0 +1,71 @@
+"""Testes do monitor do diretório de entrada."""
+
+import threading
+import time
+
+import pytest
+
+from models import _monitorar_diretorio
+from models._monitorar_diretorio import BACKEND_POLLING, MonitorDiretorio
+
+ESTABILIDADE = 0.3
+
+
+@pytest.fixture(autouse=True)
+def intervalo_curto(monkeypatch):
+    monkeypatch.setattr(_monitorar_diretorio, "INTERVALO_VERIFICACAO", 0.02)
+
+
+@pytest.fixture(params=[False, True], ids=["polling", "inotify"])
+def monitor(request, tmp_path):
+    (tmp_path / "antigo.pdf").write_bytes(b"ja estava aqui")
+    with MonitorDiretorio(
+        str(tmp_path), ESTABILIDADE, usar_inotify=request.param
+    ) as monitor:
+        if request.param and monitor.backend == BACKEND_POLLING:
+            pytest.skip("inotify indisponível")
+        yield monitor
+
+
+def _copiar_aos_poucos(caminho, partes, intervalo, fim):
+    for _ in range(partes):
+        time.sleep(intervalo)
+        with open(caminho, "ab") as f:
+            f.write(b"x" * 1024)
+    fim.append(time.monotonic())
+
+
+def test_lote_so_sai_quando_a_copia_termina(tmp_path, monitor):
+    caminho = tmp_path / "NF.pdf"
+    (tmp_path / "pasta").mkdir()
+    fim = []
+    copia = threading.Thread(
+        target=_copiar_aos_poucos, args=(caminho, 8, 0.1, fim)
+    )
+    copia.start()
+
+    lote = monitor.esperar_lote()
+    entregue = time.monotonic()
+    copia.join()
+
+    assert lote == {str(caminho)}
+    assert caminho.stat().st_size == 8 * 1024
+    assert entregue - fim[0] >= ESTABILIDADE
+
+
+def test_arquivo_removido_antes_de_estabilizar_sai_do_lote(tmp_path, monitor):
+    (tmp_path / "temporario.pdf").write_bytes(b"x")
+    time.sleep(0.05)
+    (tmp_path / "temporario.pdf").unlink()
+    (tmp_path / "remessa.txt").write_text("txt")
+
+    assert monitor.esperar_lote() == {str(tmp_path / "remessa.txt")}
+
+
+def test_interrupcao_encerra_a_espera(tmp_path, monitor, monkeypatch):
+    monkeypatch.setattr(
+        _monitorar_diretorio, "interrupcao_solicitada", lambda: True
+    )
+    (tmp_path / "NF.pdf").write_bytes(b"x")
+
+    assert monitor.esperar_lote() is None
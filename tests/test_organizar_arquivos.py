@@ -0,0 +1,137 @@
+"""Testes do organizador, de ponta a ponta, em um diretório temporário."""
+
+import os
+import shutil
+
+import fitz
+import pytest
+
+from models import (
+    _extrair_texto_do_pdf,
+    _organizar_arquivos,
+    _registro_operacoes,
+)
+from models._organizar_arquivos import organizar_arquivos
+
+from tests.test_leitura_remessa import linha_detalhe
+
+TEXTO_NF = "Nota fiscal de venda do produto para o cliente, valor total. "
+
+
+def _gerar_pdf(caminho, paginas):
+    with fitz.open() as pdf:
+        for texto in paginas:
+            pdf.new_page().insert_text((40, 60), texto, fontsize=8)
+        pdf.save(caminho)
+
+
+def gerar_operacao(base, indice):
+    """Cria o .txt, a via negociável e a NF de uma operação."""
+    operacao = str(100000 + indice)
+    chassis = [f"9BWZZZ377VT{indice:06d}", f"9BWZZZ377VX{indice:06d}"]
+    with open(os.path.join(base, f"remessa_{indice}.txt"), "w",
+              encoding="utf-8") as f:
+        f.write("HEADER".ljust(700) + "\n")
+        for chassi in chassis:
+            f.write(linha_detalhe(chassi, operacao) + "\n")
+        f.write("TRAILLER".ljust(700) + "\n")
+    _gerar_pdf(os.path.join(base, f"Via Negociável {operacao}.pdf"),
+               [f"Via negociável da operação {operacao}"])
+    _gerar_pdf(os.path.join(base, f"NF {indice}.pdf"),
+               [TEXTO_NF + f"chassi {chassi}" for chassi in chassis])
+    return operacao
+
+
+@pytest.fixture
+def base(tmp_path):
+    _extrair_texto_do_pdf.configurar_cache_memoria()
+    _extrair_texto_do_pdf.vereditos_pdf.clear()
+    yield tmp_path
+    _registro_operacoes.configurar_reprocessamento()
+    if _extrair_texto_do_pdf.cache_persistente is not None:
+        _extrair_texto_do_pdf.cache_persistente.fechar()
+        _extrair_texto_do_pdf.cache_persistente = None
+
+
+def _pastas(base):
+    return sorted(
+        nome for nome in os.listdir(base)
+        if os.path.isdir(os.path.join(base, nome))
+    )
+
+
+def test_organiza_as_operacoes(base):
+    for indice in range(2):
+        gerar_operacao(str(base), indice)
+
+    mensagens = organizar_arquivos(str(base), [])
+
+    assert mensagens == []
+    assert _pastas(base) == ["100000", "100001", "_Cache", "_Lixo"]
+    assert sorted(os.listdir(base / "100000")) == [
+        "100000_dados_extraidos.json", "NF 0.pdf",
+        "Via Negociável 100000.pdf", "remessa_0.txt",
+    ]
+
+
+@pytest.mark.parametrize("reprocessar", [False, True])
+def test_remessa_ja_organizada(base, reprocessar):
+    gerar_operacao(str(base), 0)
+    organizar_arquivos(str(base), [])
+    shutil.move(str(base / "100000"), str(base / "organizada"))
+    reenviados = ["remessa_0.txt", "NF 0.pdf", "Via Negociável 100000.pdf"]
+    for nome in reenviados:
+        shutil.copy(base / "organizada" / nome, base / nome)
+    _gerar_pdf(str(base / "NF 0 avulsa.pdf"), [TEXTO_NF])
+    _registro_operacoes.configurar_reprocessamento(reprocessar)
+
+    mensagens = organizar_arquivos(str(base), [])
+
+    if reprocessar:
+        assert mensagens == []
+        assert os.listdir(base / "_Lixo") == []
+        assert "remessa_0.txt" in os.listdir(base / "100000")
+    else:
+        assert "REPROCESSAR_REMESSAS" in mensagens[0]
+        assert sorted(os.listdir(base / "_Lixo")) == sorted(reenviados)
+        assert not (base / "100000").exists()
+        # Só os PDFs idênticos aos da operação acompanham o .txt
+        assert (base / "NF 0 avulsa.pdf").exists()
+
+
+def test_monitoramento_nao_repete_alertas(base):
+    gerar_operacao(str(base), 0)
+    grande = base / "NF grande.pdf"
+    with open(grande, "wb") as f:
+        f.truncate(11 * 1024 * 1024)
+    _gerar_pdf(str(base / "NF avulsa.pdf"), [TEXTO_NF])
+    shutil.copy(base / "NF avulsa.pdf", base / "NF avulsa (1).pdf")
+
+    mensagens = organizar_arquivos(str(base), [])
+
+    assert len(mensagens) == 2
+    assert "NF grande.pdf" in mensagens[0]
+    assert "NF avulsa (1).pdf" in mensagens[1]
+    inventario = dict(_organizar_arquivos.inventario_atual(str(base)))
+    assert str(base / "remessa_0.txt") not in inventario
+    assert str(grande) in inventario
+
+    # Lote seguinte: só a operação nova foi alterada
+    gerar_operacao(str(base), 1)
+    novos = {str(base / nome) for nome in os.listdir(base)} - set(inventario)
+
+    assert organizar_arquivos(str(base), [], novos) == []
+    assert "100001" in _pastas(base)
+    inventario_lote = _organizar_arquivos._inventarios[str(base)]
+    assert inventario_lote[str(grande)] is inventario[str(grande)]
+
+    # O PDF grande foi substituído: o alerta volta
+    gerar_operacao(str(base), 2)
+    with open(grande, "ab") as f:
+        f.write(b"0")
+    novos = {str(base / "remessa_2.txt"), str(base / "NF 2.pdf"),
+             str(base / "Via Negociável 100002.pdf"), str(grande)}
+
+    mensagens = organizar_arquivos(str(base), [], novos)
+
+    assert len(mensagens) == 1 and "NF grande.pdf" in mensagens[0]
@@ -0,0 +1,175 @@
+"""Testes do plano de movimentações e do seu diário."""
+
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from models import _plano_organizacao
+from models._plano_organizacao import (
+    NOME_DIARIO,
+    FalhaMovimento,
+    PlanoOrganizacao,
+)
+
+
+@pytest.fixture
+def base(tmp_path):
+    for nome in ("a.txt", "a.pdf", "b.txt", "b.pdf"):
+        (tmp_path / nome).write_text(nome)
+    return tmp_path
+
+
+def _plano(base):
+    return PlanoOrganizacao(str(base / "_Lixo"), str(base / "_Cache"))
+
+
+def _planejar(plano, base, nome):
+    pasta = str(base / nome)
+    plano.mover(str(base / f"{nome}.pdf"), pasta, grupo=nome)
+    plano.mover(str(base / f"{nome}.txt"), pasta, grupo=nome)
+    plano.gravar_json({"operacao": nome}, os.path.join(pasta, "dados.json"),
+                      grupo=nome)
+
+
+def test_erro_inesperado_vira_falha_do_grupo(base):
+    plano = _plano(base)
+    _planejar(plano, base, "a")
+    plano.gravar_json({"invalido": object()}, str(base / "b" / "dados.json"),
+                      grupo="b")
+
+    falhas = plano.executar()
+
+    assert [(f.grupo, type(f)) for f in falhas] == [("b", FalhaMovimento)]
+    assert "TypeError" in falhas[0].erro
+    assert sorted(os.listdir(base / "a")) == ["a.pdf", "a.txt", "dados.json"]
+    assert not (base / "_Cache" / NOME_DIARIO).exists()
+
+
+def test_erro_depois_do_diario_mantem_o_diario(base, monkeypatch):
+    executar_grupo = _plano_organizacao._executar_grupo
+
+    def quebrar_b(diario, id_plano, passos, movimentos, *args, **kwargs):
+        if movimentos[0].grupo == "b":
+            raise RuntimeError("falha inesperada")
+        return executar_grupo(diario, id_plano, passos, movimentos, *args,
+                              **kwargs)
+
+    monkeypatch.setattr(_plano_organizacao, "_executar_grupo", quebrar_b)
+    plano = _plano(base)
+    _planejar(plano, base, "a")
+    _planejar(plano, base, "b")
+
+    falhas = plano.executar()
+
+    assert [f.grupo for f in falhas] == ["b"]
+    assert os.path.exists(base / "a" / "dados.json")
+    with open(base / "_Cache" / NOME_DIARIO, encoding="utf-8") as diario:
+        registros = [json.loads(linha) for linha in diario]
+    assert any(r.get("grupo") == "b" for r in registros)
+
+
+def test_arquivo_tem_um_destino_so(base):
+    plano = _plano(base)
+    _planejar(plano, base, "a")
+
+    with pytest.raises(ValueError):
+        plano.mover(str(base / "a.pdf"), str(base / "b"), grupo="b")
+    plano.liberar("a")
+    with pytest.raises(ValueError):
+        plano.mover(str(base / "b.pdf"), str(base / "a"), grupo="a")
+    plano.executar()
+
+
+def test_grupos_em_paralelo_e_falhas_na_ordem_do_plano(base, monkeypatch):
+    # Os dois grupos só passam da barreira se rodarem ao mesmo tempo
+    barreira = threading.Barrier(2, timeout=5)
+
+    def paralelo(diario, id_plano, passos, movimentos, *args, **kwargs):
+        barreira.wait()
+        if movimentos[0].grupo == "a":
+            time.sleep(0.1)
+        raise RuntimeError(f"falha em {movimentos[0].grupo}")
+
+    monkeypatch.setattr(_plano_organizacao, "_executar_grupo", paralelo)
+    plano = _plano(base)
+    _planejar(plano, base, "a")
+    _planejar(plano, base, "b")
+
+    falhas = plano.executar()
+
+    assert [(f.grupo, f.erro) for f in falhas] == [
+        ("a", "RuntimeError: falha em a"),
+        ("b", "RuntimeError: falha em b"),
+    ]
+
+
+def test_origem_sumida_numa_execucao_normal_e_falha(base):
+    plano = _plano(base)
+    _planejar(plano, base, "a")
+    os.remove(base / "a.pdf")
+    os.makedirs(base / "a")
+    (base / "a" / "a.pdf").write_text("outro arquivo")
+
+    falhas = plano.executar()
+
+    assert [f.grupo for f in falhas] == ["a"]
+    assert (base / "a.txt").exists()
+    assert sorted(os.listdir(base / "a")) == ["a.pdf"]
+    assert (base / "a" / "a.pdf").read_text() == "outro arquivo"
+
+
+def _escrever_diario(base, registros):
+    os.makedirs(base / "_Cache", exist_ok=True)
+    with open(base / "_Cache" / NOME_DIARIO, "w", encoding="utf-8") as f:
+        for registro in registros:
+            f.write(json.dumps(registro) + "\n")
+
+
+def _passos(base, nome):
+    return [
+        {"plano": "p1", "passo": passo, "grupo": nome,
+         "origem": str(base / arquivo), "destino": str(base / nome / arquivo)}
+        for passo, arquivo in enumerate([f"{nome}.pdf", f"{nome}.txt"])
+    ]
+
+
+def test_recuperar_diario_termina_o_grupo_interrompido(base):
+    # Queda entre mover o PDF e anotar: origem sumiu, destino existe
+    os.makedirs(base / "a")
+    os.replace(base / "a.pdf", base / "a" / "a.pdf")
+    _escrever_diario(base, [
+        *_passos(base, "a"), {"plano": "p1", "planejado": 2},
+    ])
+
+    assert _plano_organizacao.recuperar_diario(str(base / "_Cache")) == 1
+
+    assert sorted(os.listdir(base / "a")) == ["a.pdf", "a.txt"]
+    assert not (base / "_Cache" / NOME_DIARIO).exists()
+
+
+def test_recuperar_diario_descarta_plano_nao_gravado(base):
+    _escrever_diario(base, _passos(base, "a")[:1])
+
+    assert _plano_organizacao.recuperar_diario(str(base / "_Cache")) == 0
+
+    assert (base / "a.pdf").exists() and not (base / "a").exists()
+    assert not (base / "_Cache" / NOME_DIARIO).exists()
+
+
+def test_recuperar_diario_termina_de_desfazer(base):
+    os.makedirs(base / "a")
+    os.replace(base / "a.pdf", base / "a" / "a.pdf")
+    os.replace(base / "a.txt", base / "a" / "a.txt")
+    _escrever_diario(base, [
+        *_passos(base, "a"), {"plano": "p1", "planejado": 2},
+        {"plano": "p1", "feito": 0}, {"plano": "p1", "feito": 1},
+        {"plano": "p1", "desfeito": 1},
+    ])
+
+    _plano_organizacao.recuperar_diario(str(base / "_Cache"))
+
+    assert (base / "a.pdf").exists()
+    assert os.listdir(base / "a") == ["a.txt"]
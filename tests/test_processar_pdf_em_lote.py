@@ -0,0 +1,92 @@
+"""Testes do motor de extração usado pelo organizador."""
+
+import fitz
+import pytest
+
+from models import _extrair_texto_do_pdf, _processar_pdf_em_lote
+from models._processar_pdf_em_lote import (
+    BACKEND_PROCESSOS,
+    BACKEND_THREADS,
+    MotorExtracao,
+    obter_veredito_pdf,
+)
+
+
+@pytest.fixture(params=[BACKEND_THREADS, BACKEND_PROCESSOS])
+def motor(request, monkeypatch):
+    _extrair_texto_do_pdf.configurar_cache_memoria()
+    _extrair_texto_do_pdf.vereditos_pdf.clear()
+    motor = MotorExtracao(request.param, max_workers=1)
+    monkeypatch.setattr(_processar_pdf_em_lote, "motor_extracao", motor)
+    yield motor
+    motor.fechar()
+    _extrair_texto_do_pdf.vereditos_pdf.clear()
+
+
+def _nao_extrair_aqui(caminho_pdf):
+    raise AssertionError("PDF extraído fora do motor de extração")
+
+
+def test_veredito_que_falta_vem_do_motor(tmp_path, motor, monkeypatch):
+    caminho = str(tmp_path / "nf.pdf")
+    with fitz.open() as pdf:
+        pdf.new_page().insert_text(
+            (72, 72), "Nota fiscal de venda do produto para o cliente"
+        )
+        pdf.save(caminho)
+    monkeypatch.setattr(_extrair_texto_do_pdf, "_extrair_texto",
+                        _nao_extrair_aqui)
+
+    veredito = obter_veredito_pdf(caminho)
+
+    assert veredito.paginas == 1
+    assert not veredito.codificado
+    assert _extrair_texto_do_pdf.vereditos_pdf[caminho] == veredito
+
+
+def test_pdf_ilegivel_e_tratado_como_codificado(tmp_path, motor):
+    caminho = tmp_path / "quebrado.pdf"
+    caminho.write_bytes(b"%PDF-1.4 isto nao e um pdf")
+
+    assert obter_veredito_pdf(str(caminho)).codificado
+
+
+def test_analise_traz_so_o_resumo_nos_dois_backends(tmp_path, motor):
+    caminhos = []
+    for indice in range(3):
+        caminho = str(tmp_path / f"nf_{indice}.pdf")
+        with fitz.open() as pdf:
+            pdf.new_page().insert_text(
+                (72, 72), f"Nota fiscal, chassi 9BWZZZ377VT00000{indice}"
+            )
+            pdf.save(caminho)
+        caminhos.append(caminho)
+    chassis = {"9BWZZZ377VT000001", "9BWZZZ377VT000002"}
+
+    resumos = motor.analisar(caminhos, chassis)
+    completas = motor.analisar(caminhos[:1], chassis, com_tokens=True)
+
+    assert {analise.caminho: analise.chassis for analise in resumos} == {
+        caminhos[0]: {},
+        caminhos[1]: {"9BWZZZ377VT000001": 1},
+        caminhos[2]: {"9BWZZZ377VT000002": 1},
+    }
+    assert all(analise.tokens is None for analise in resumos)
+    assert "9BWZZZ377VT000000" in completas[0].tokens
+    assert _extrair_texto_do_pdf.vereditos_pdf[caminhos[1]].paginas == 1
+
+
+def test_pdf_alterado_recria_o_pool_de_processos(tmp_path):
+    caminho = str(tmp_path / "nf.pdf")
+    with fitz.open() as pdf:
+        pdf.new_page().insert_text((72, 72), "Nota fiscal")
+        pdf.save(caminho)
+    with MotorExtracao(BACKEND_PROCESSOS, max_workers=1) as motor:
+        motor.analisar([caminho], {"9BWZZZ377VT000001"})
+        pool = motor._pool
+
+        motor.esquecer_pdfs([str(tmp_path / "outro.pdf")])
+        assert motor._pool is pool
+
+        motor.esquecer_pdfs([caminho])
+        assert motor._pool is None
@@ -0,0 +1,95 @@
+"""Testes da transferência de arquivos entre sistemas de arquivos."""
+
+import errno
+import os
+
+import pytest
+
+from models import _transferir_arquivos
+from models._cache_persistente import calcular_hash_arquivo
+from models._transferir_arquivos import (
+    SUFIXO_PARCIAL,
+    TransferenciaInvalida,
+    mover_arquivo,
+)
+
+CONTEUDO = os.urandom(3 * 1024 * 1024 + 17)
+
+
+@pytest.fixture
+def outro_dispositivo(monkeypatch):
+    """Faz o os.replace da origem falhar como entre dispositivos (EXDEV)."""
+    substituir = os.replace
+
+    def replace(origem, destino):
+        if not str(origem).endswith(SUFIXO_PARCIAL):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return substituir(origem, destino)
+
+    monkeypatch.setattr(_transferir_arquivos.os, "replace", replace)
+
+
+@pytest.fixture
+def origem(tmp_path):
+    caminho = tmp_path / "origem" / "NF 1.pdf"
+    caminho.parent.mkdir()
+    caminho.write_bytes(CONTEUDO)
+    return caminho
+
+
+def test_mesmo_sistema_de_arquivos(tmp_path, origem):
+    destino = tmp_path / "100001" / "NF 1.pdf"
+
+    assert mover_arquivo(str(origem), str(destino)) is False
+    assert destino.read_bytes() == CONTEUDO
+    assert not origem.exists()
+
+
+@pytest.mark.parametrize("metodos", ["kernel", "python"])
+def test_entre_dispositivos_copia_confere_e_apaga(tmp_path, origem, metodos,
+                                                   outro_dispositivo,
+                                                   monkeypatch):
+    if metodos == "python":
+        monkeypatch.setattr(_transferir_arquivos, "_COPIAS_NO_KERNEL", [])
+    destino = tmp_path / "100001" / "NF 1.pdf"
+    hash_origem = calcular_hash_arquivo(str(origem))
+    consultas = []
+
+    copiou = mover_arquivo(
+        str(origem), str(destino),
+        lambda: consultas.append(1) or hash_origem,
+    )
+
+    assert copiou is True
+    assert consultas == [1]
+    assert destino.read_bytes() == CONTEUDO
+    assert not origem.exists()
+    assert os.listdir(destino.parent) == ["NF 1.pdf"]
+
+
+def test_hash_diferente_mantem_a_origem(tmp_path, origem, outro_dispositivo):
+    destino = tmp_path / "100001" / "NF 1.pdf"
+
+    with pytest.raises(TransferenciaInvalida):
+        mover_arquivo(str(origem), str(destino), lambda: "hash de outro")
+
+    assert origem.read_bytes() == CONTEUDO
+    assert os.listdir(destino.parent) == []
+
+
+def test_copia_truncada_mantem_a_origem(tmp_path, origem, outro_dispositivo,
+                                        monkeypatch):
+    copiar = _transferir_arquivos._copiar
+
+    def copiar_pela_metade(entrada, saida):
+        copiar(entrada, saida)
+        os.truncate(saida, len(CONTEUDO) // 2)
+
+    monkeypatch.setattr(_transferir_arquivos, "_copiar", copiar_pela_metade)
+    destino = tmp_path / "100001" / "NF 1.pdf"
+
+    with pytest.raises(TransferenciaInvalida, match="tamanho"):
+        mover_arquivo(str(origem), str(destino))
+
+    assert origem.read_bytes() == CONTEUDO
+    assert os.listdir(destino.parent) == []
@@ -0,0 +1,132 @@
+"""Testes da triagem dos arquivos do diretório."""
+
+import pytest
+
+from models import _triar_arquivos
+from models._triar_arquivos import (
+    LIMITE_TAMANHO_PDF_MB,
+    IndiceViasNegociaveis,
+    triar_arquivos,
+)
+
+
+@pytest.fixture
+def sem_ler_conteudo(monkeypatch):
+    def _hash(caminho):
+        raise AssertionError(f"conteúdo lido na triagem: {caminho}")
+
+    monkeypatch.setattr(_triar_arquivos, "calcular_hash_arquivo", _hash)
+
+
+def test_tamanho_e_nome_sem_abrir_os_arquivos(tmp_path, sem_ler_conteudo):
+    limite = LIMITE_TAMANHO_PDF_MB * 1024 * 1024
+    with open(tmp_path / "NF grande.PDF", "wb") as f:
+        f.truncate(limite + 1)
+    with open(tmp_path / "NF no limite.pdf", "wb") as f:
+        f.truncate(limite)
+    (tmp_path / "Via Negociável 123.pdf").write_bytes(b"via")
+    (tmp_path / "remessa.txt").write_text("txt")
+    (tmp_path / "planilha.xlsx").write_bytes(b"xlsx")
+    (tmp_path / "pasta.pdf").mkdir()
+
+    triagem = {
+        arquivo.nome: arquivo
+        for arquivo in triar_arquivos(str(tmp_path)).values()
+    }
+
+    assert sorted(triagem) == [
+        "NF grande.PDF", "NF no limite.pdf", "Via Negociável 123.pdf",
+        "planilha.xlsx", "remessa.txt",
+    ]
+    assert triagem["NF grande.PDF"].acima_do_limite
+    assert not triagem["NF no limite.pdf"].acima_do_limite
+    assert not triagem["remessa.txt"].acima_do_limite
+    assert triagem["Via Negociável 123.pdf"].via_negociavel
+    assert triagem["Via Negociável 123.pdf"].nome_normalizado == (
+        "vianegociavel123.pdf"
+    )
+    assert not triagem["NF grande.PDF"].via_negociavel
+    assert triagem["planilha.xlsx"].tamanho is None
+
+
+def test_diretorio_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        triar_arquivos(str(tmp_path / "inexistente"))
+
+
+def _indice_vias(tmp_path, nomes):
+    for nome in nomes:
+        (tmp_path / nome).write_bytes(b"via")
+    triagem = triar_arquivos(str(tmp_path))
+    caminhos = [str(tmp_path / nome) for nome in nomes]
+    return IndiceViasNegociaveis(caminhos, triagem)
+
+
+def test_via_negociavel_e_entregue_uma_vez(tmp_path):
+    indice = _indice_vias(tmp_path, [
+        "Via Negociável 123.pdf", "via_negociavel 123 (1).pdf",
+        "NF 123.pdf",
+    ])
+
+    assert indice.reivindicar("123") == str(
+        tmp_path / "Via Negociável 123.pdf"
+    )
+    assert indice.reivindicar("123") == str(
+        tmp_path / "via_negociavel 123 (1).pdf"
+    )
+    assert indice.reivindicar("123") is None
+    assert indice.reivindicar("") is None
+
+
+def test_numero_exato_antes_de_parte_do_nome(tmp_path):
+    indice = _indice_vias(tmp_path, [
+        "Via Negociável 9123.pdf", "Via Negociável 123.pdf",
+    ])
+
+    # Sem chave exata, vale o número em qualquer parte do nome
+    assert indice.reivindicar("912") == str(
+        tmp_path / "Via Negociável 9123.pdf"
+    )
+    assert indice.reivindicar("123") == str(
+        tmp_path / "Via Negociável 123.pdf"
+    )
+    assert indice.reivindicar("23") is None
+
+
+def test_hash_calculado_so_na_primeira_consulta(tmp_path, monkeypatch):
+    (tmp_path / "NF.pdf").write_bytes(b"nota")
+    calculados = []
+    calcular = _triar_arquivos.calcular_hash_arquivo
+
+    def _contar(caminho):
+        calculados.append(caminho)
+        return calcular(caminho)
+
+    monkeypatch.setattr(_triar_arquivos, "calcular_hash_arquivo", _contar)
+    arquivo = triar_arquivos(str(tmp_path))[str(tmp_path / "NF.pdf")]
+    assert calculados == []
+
+    assert arquivo.hash == arquivo.hash == calcular(arquivo.caminho)
+    assert calculados == [arquivo.caminho]
+
+
+def test_so_os_alterados_sao_examinados_de_novo(tmp_path):
+    (tmp_path / "NF a.pdf").write_bytes(b"nota a")
+    (tmp_path / "NF b.pdf").write_bytes(b"nota b")
+    (tmp_path / "NF c.pdf").write_bytes(b"nota c")
+    anterior = triar_arquivos(str(tmp_path))
+    (tmp_path / "NF b.pdf").write_bytes(b"nota b alterada")
+    (tmp_path / "NF c.pdf").unlink()
+    (tmp_path / "NF d.pdf").write_bytes(b"nota d")
+
+    triagem = triar_arquivos(
+        str(tmp_path), anterior,
+        {str(tmp_path / "NF b.pdf"), str(tmp_path / "NF d.pdf")},
+    )
+
+    assert sorted(triagem) == [
+        str(tmp_path / nome) for nome in ("NF a.pdf", "NF b.pdf", "NF d.pdf")
+    ]
+    a, b = (str(tmp_path / nome) for nome in ("NF a.pdf", "NF b.pdf"))
+    assert triagem[a] is anterior[a]
+    assert triagem[b].tamanho == len(b"nota b alterada")
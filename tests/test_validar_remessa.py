@@ -0,0 +1,103 @@
+"""Testes da validação dos campos das remessas."""
+
+import pytest
+
+from models._layout_remessa import LAYOUT_REMESSA
+from models._validar_remessa import (
+    Violacao,
+    cnpj_valido,
+    cpf_valido,
+    validar_remessa,
+)
+
+from tests.test_leitura_remessa import VALORES
+
+
+def _registro(chassi, **valores):
+    campos = {**VALORES, "CHASSI": chassi, "NUMERO_OPERACAO": "123456",
+              **valores}
+    return LAYOUT_REMESSA.registro(
+        campos.get(campo, "") for campo in LAYOUT_REMESSA.campos
+    )
+
+
+@pytest.mark.parametrize("cpf, valido", [
+    ("52998224725", True),
+    ("11144477735", True),
+    ("52998224726", False),
+    ("52998224715", False),
+    ("11111111111", False),
+    ("5299822472", False),
+])
+def test_cpf(cpf, valido):
+    assert cpf_valido(cpf) is valido
+
+
+@pytest.mark.parametrize("cnpj, valido", [
+    ("11222333000181", True),
+    ("11444777000161", True),
+    ("11222333000182", False),
+    ("11222333000191", False),
+    ("00000000000000", False),
+    ("1122233300018", False),
+])
+def test_cnpj(cnpj, valido):
+    assert cnpj_valido(cnpj) is valido
+
+
+@pytest.mark.parametrize("documento, motivo", [
+    ("11222333000181", None),
+    ("00052998224725", None),  # CPF completado com zeros
+    ("52998224725", None),
+    ("00052998224726", "CNPJ inválido"),
+    ("52998224726", "CPF inválido"),
+    ("1122233300018X", "CPF/CNPJ deve ter apenas dígitos"),
+    ("112223330001", "CPF/CNPJ deve ter 11 ou 14 dígitos"),
+])
+def test_documento_do_recebedor(documento, motivo):
+    relatorio = validar_remessa([
+        _registro("9BWZZZ377VT000001", CPF_CNPJ_RECEBEDOR=documento)
+    ])
+    assert [v.motivo for v in relatorio] == ([motivo] if motivo else [])
+
+
+@pytest.mark.parametrize("data, motivo", [
+    ("20260110", None),  # AAAAMMDD
+    ("10012026", None),  # DDMMAAAA
+    ("29022024", None),  # ano bissexto
+    ("29022023", "data inexistente"),
+    ("20260230", "data inexistente"),
+    ("2026011", "data deve ter 8 dígitos"),
+    ("2026-01-", "data deve ter 8 dígitos"),
+])
+def test_datas(data, motivo):
+    relatorio = validar_remessa([
+        _registro("9BWZZZ377VT000001", DATA_OPERACAO=data)
+    ])
+    assert [v.motivo for v in relatorio] == ([motivo] if motivo else [])
+
+
+def test_relata_todas_as_violacoes_na_ordem_dos_registros():
+    registros = [
+        _registro("9BWZZZ377VT000001"),
+        _registro("9BWZZZ377VT000002", UF_LIBERACAO_OPERACAO="XX",
+                  MULTA=""),
+        _registro("9BWZZZ377VT000003", DATA_LIBERACAO_OPERACAO="31022026",
+                  CPF_CNPJ_RECEBEDOR="52998224726"),
+    ]
+
+    relatorio = validar_remessa(registros)
+
+    assert not relatorio.valido
+    assert sorted(relatorio) == sorted([
+        Violacao(2, "9BWZZZ377VT000002", "MULTA", "",
+                 "campo obrigatório vazio"),
+        Violacao(2, "9BWZZZ377VT000002", "UF_LIBERACAO_OPERACAO", "XX",
+                 "UF inexistente"),
+        Violacao(3, "9BWZZZ377VT000003", "DATA_LIBERACAO_OPERACAO",
+                 "31022026", "data inexistente"),
+        Violacao(3, "9BWZZZ377VT000003", "CPF_CNPJ_RECEBEDOR",
+                 "52998224726", "CPF inválido"),
+    ])
+    assert [v.registro for v in relatorio] == [2, 2, 3, 3]
+    assert validar_remessa(registros[:1]).valido
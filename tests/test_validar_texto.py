@@ -0,0 +1,77 @@
+"""Testes do detector de texto codificado."""
+
+import random
+
+import pytest
+
+from models import _validar_texto
+from models._validar_texto import (
+    MINIMO_TRECHOS_AMOSTRA,
+    PALAVRAS_COMUNS_PT,
+    analisar_texto,
+)
+
+_aleatorio = random.Random(0)
+_COMUNS = sorted(PALAVRAS_COMUNS_PT)
+
+
+def _legivel(palavras):
+    return " ".join(_aleatorio.choice(_COMUNS) for _ in range(palavras))
+
+
+def _codificado(palavras):
+    return " ".join(
+        "".join(_aleatorio.choice("bcdfghjklmnpqrstvwxz") for _ in range(6))
+        for _ in range(palavras)
+    )
+
+
+class _ContadorTrechos:
+    """Conta os trechos limpos pelo detector."""
+
+    def __init__(self, expressao):
+        self._expressao = expressao
+        self.lidos = 0
+
+    def sub(self, *args):
+        self.lidos += 1
+        return self._expressao.sub(*args)
+
+
+@pytest.fixture
+def trechos(monkeypatch):
+    contador = _ContadorTrechos(_validar_texto._RE_NAO_LETRA)
+    monkeypatch.setattr(_validar_texto, "_RE_NAO_LETRA", contador)
+    return contador
+
+
+@pytest.mark.parametrize("texto, codificado", [
+    (_legivel(20000), False),
+    (_codificado(20000), True),
+    (_legivel(20000) + "\ufffd", True),
+    (_legivel(30), False),
+    ("", True),
+], ids=["legivel", "codificado", "substituicao", "curto", "vazio"])
+def test_amostragem_tem_o_veredito_da_leitura_completa(texto, codificado):
+    completa = analisar_texto(texto, amostragem=False)
+    amostra = analisar_texto(texto)
+
+    assert completa.codificado is amostra.codificado is codificado
+
+
+def test_amostragem_para_quando_o_veredito_se_firma(trechos):
+    texto = _legivel(20000)
+
+    analisar_texto(texto, amostragem=False)
+    total = trechos.lidos
+    trechos.lidos = 0
+    analisar_texto(texto)
+
+    assert MINIMO_TRECHOS_AMOSTRA <= trechos.lidos < total
+
+
+def test_ordem_da_amostragem_espalha_os_trechos():
+    ordem = _validar_texto._ordem_amostragem(8)
+
+    assert ordem == [0, 4, 2, 6, 1, 5, 3, 7]
+    assert sorted(_validar_texto._ordem_amostragem(11)) == list(range(11))